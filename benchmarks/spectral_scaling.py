@@ -0,0 +1,37 @@
+"""
+Compares the dense and sparse computation of algebraic connectivity and
+Fiedler vectors for higher-order models of the US flight data. Run from
+the root directory of the repository, e.g. via
+python -m benchmarks.spectral_scaling
+"""
+
+#%%
+import time
+import numpy as np
+import pathpy as pp
+from solutions import sparse_spectral
+
+paths = pp.Paths.read_file('data/US_flights_train.ngram', frequency=False)
+
+def timed(f, *args, **kwargs):
+    start = time.perf_counter()
+    res = f(*args, **kwargs)
+    return res, time.perf_counter() - start
+
+#%%
+for k in [1, 2, 3]:
+    hon, t_build = timed(pp.HigherOrderNetwork, paths, k=k)
+    _, t_lapl = timed(sparse_spectral.laplacian_matrix, hon)
+    lambda_2, t_sparse = timed(sparse_spectral.algebraic_connectivity, hon)
+    _, t_fiedler = timed(sparse_spectral.fiedler_vector, hon)
+    n_comp, labels = sparse_spectral.connected_components(hon)
+    print('k={0}: {1} nodes, {2} links, {3} components (construction {4:.2f}s)'.format(k, hon.ncount(), hon.ecount(), n_comp, t_build))
+    print('\tlargest component:          {0} nodes'.format((labels == 0).sum()))
+    print('\tsparse Laplacian:           {0:.3f}s'.format(t_lapl))
+    print('\tsparse lambda_2 = {0:.6f}: {1:.3f}s'.format(lambda_2, t_sparse))
+    print('\tsparse Fiedler vector:      {0:.3f}s'.format(t_fiedler))
+    if hon.ncount() <= 3000:
+        _, t_dense = timed(pp.algorithms.spectral.fiedler_vector_dense, hon)
+        print('\tdense Fiedler vector:       {0:.3f}s'.format(t_dense))
+    else:
+        print('\tdense Fiedler vector:       skipped ({0} nodes)'.format(hon.ncount()))
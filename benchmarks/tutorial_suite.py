@@ -0,0 +1,263 @@
+"""
+Benchmarks of the tutorial workflows in the style of asv: each class
+prepares its inputs in setup, time_* methods are timed and peakmem_*
+methods are measured by the peak memory they allocate. The suite covers
+n-gram loading (flights, Wikipedia), the expansion of origin-destination
+statistics into paths (tube), causal path extraction (temporal_clusters
+and scaled-up copies of it), higher-order networks for k=1..4,
+estimate_order, pagerank and export_html. Run from the root directory of
+the repository, e.g. via
+
+    python -m benchmarks.tutorial_suite --output results.json
+    python -m benchmarks.tutorial_suite --compare results.json --filter HigherOrder
+
+With --compare, benchmarks that got slower or use more memory than in an
+earlier run by more than --threshold are reported and the exit code is 1.
+"""
+import argparse
+import fnmatch
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pathpy as pp
+
+from solutions import validation_harness
+
+
+NGRAM_FILES = {
+    'flights': ('data/US_flights_train.ngram', {'frequency': False}),
+    'wikipedia': ('data/wikipedia_clickstreams_train.ngram', {'frequency': False, 'max_ngram_length': 100}),
+}
+
+
+def read_ngram(dataset):
+    file, kwargs = NGRAM_FILES[dataset]
+    return pp.Paths.read_file(file, **kwargs)
+
+
+def scaled_temporal_network(tempnet, scale):
+    """
+    Returns a temporal network with scale copies of the events of tempnet,
+    one after the other in time, so that the number of events and causal
+    paths grows linearly while the temporal structure is unchanged.
+    """
+    t_min, t_max = min(tempnet.ordered_times), max(tempnet.ordered_times)
+    shift = t_max - t_min + 1
+    return pp.TemporalNetwork(tedges=[(v, w, t + i * shift) for i in range(scale) for v, w, t in tempnet.tedges])
+
+
+class NgramLoading:
+    params = sorted(NGRAM_FILES)
+    param_names = ['dataset']
+    timeout = 300
+
+    def time_read_file(self, dataset):
+        read_ngram(dataset)
+
+    def peakmem_read_file(self, dataset):
+        read_ngram(dataset)
+
+
+class OriginDestination:
+    # the full OD matrix of the tube takes minutes to expand, so only the first pairs are used
+    params = [100, 1000]
+    param_names = ['pairs']
+    timeout = 300
+
+    def setup(self, pairs):
+        self.network = pp.Network.read_file('data/tube.edges', separator=';')
+        self.od = pp.path_extraction.read_origin_destination('data/tube_od.csv', separator=';')[:pairs]
+
+    def time_paths_from_origin_destination(self, pairs):
+        pp.path_extraction.paths_from_origin_destination(self.od, self.network)
+
+    def peakmem_paths_from_origin_destination(self, pairs):
+        pp.path_extraction.paths_from_origin_destination(self.od, self.network)
+
+
+class CausalPaths:
+    params = [1, 2, 4]
+    param_names = ['scale']
+    timeout = 300
+
+    def setup(self, scale):
+        self.tempnet = scaled_temporal_network(pp.TemporalNetwork.read_file('data/temporal_clusters.tedges'), scale)
+
+    def time_sample_causal_paths(self, scale):
+        validation_harness.sample_causal_paths(self.tempnet, delta=1, num_roots=100 * scale,
+                                               max_subpath_length=4, seed=1)
+
+    def peakmem_sample_causal_paths(self, scale):
+        validation_harness.sample_causal_paths(self.tempnet, delta=1, num_roots=100 * scale,
+                                               max_subpath_length=4, seed=1)
+
+
+class HigherOrderNetworks:
+    params = [1, 2, 3, 4]
+    param_names = ['k']
+    timeout = 300
+
+    def setup(self, k):
+        self.paths = read_ngram('flights')
+
+    def time_higher_order_network(self, k):
+        pp.HigherOrderNetwork(self.paths, k=k)
+
+    def peakmem_higher_order_network(self, k):
+        pp.HigherOrderNetwork(self.paths, k=k)
+
+
+class OptimalOrder:
+    timeout = 300
+
+    def setup(self):
+        paths = read_ngram('flights')
+        self.model = pp.MultiOrderModel(paths, 3)
+
+    def time_estimate_order(self):
+        self.model.estimate_order()
+
+    def peakmem_estimate_order(self):
+        self.model.estimate_order()
+
+
+class PageRank:
+    # pp.algorithms.centralities.pagerank fails with current scipy, see validation_harness.pagerank
+    params = [1, 2, 3]
+    param_names = ['k']
+
+    def setup(self, k):
+        paths = read_ngram('flights')
+        self.network = pp.HigherOrderNetwork(paths, k=k)
+
+    def time_pagerank(self, k):
+        validation_harness.pagerank(self.network)
+
+    def peakmem_pagerank(self, k):
+        validation_harness.pagerank(self.network)
+
+
+class ExportHTML:
+    params = ['tube', 'temporal_clusters']
+    param_names = ['network']
+
+    def setup(self, network):
+        if network == 'tube':
+            self.network = pp.Network.read_file('data/tube.edges', separator=';')
+        else:
+            self.network = pp.TemporalNetwork.read_file('data/temporal_clusters.tedges')
+        self.dir = tempfile.TemporaryDirectory()
+
+    def teardown(self, network):
+        self.dir.cleanup()
+
+    def time_export_html(self, network):
+        pp.visualisation.export_html(self.network, os.path.join(self.dir.name, 'network.html'))
+
+    def peakmem_export_html(self, network):
+        pp.visualisation.export_html(self.network, os.path.join(self.dir.name, 'network.html'))
+
+
+def benchmarks(pattern=None):
+    """
+    Yields (name, class, method name, params) of all benchmarks in this
+    module whose name matches a glob pattern, e.g. 'HigherOrder*'.
+    """
+    for cls in [NgramLoading, OriginDestination, CausalPaths, HigherOrderNetworks, OptimalOrder, PageRank,
+                ExportHTML]:
+        # as in asv, params is a list of values or, for several parameters, a list of lists
+        params = getattr(cls, 'params', [])
+        if not params:
+            grid = [()]
+        elif isinstance(params[0], list):
+            grid = list(itertools.product(*params))
+        else:
+            grid = [(p,) for p in params]
+        for method in sorted(m for m in dir(cls) if m.startswith(('time_', 'peakmem_'))):
+            for values in grid:
+                name = '{0}.{1}({2})'.format(cls.__name__, method, ', '.join(map(str, values)))
+                if pattern is None or fnmatch.fnmatch(name, '*{0}*'.format(pattern)):
+                    yield name, cls, method, values
+
+
+def measure(cls, method, params, repeat=3):
+    """
+    Runs a benchmark and returns its value: the shortest of repeat runs in
+    seconds for time_* methods, the peak memory allocated by Python in MB
+    (see tracemalloc) for peakmem_* methods.
+    """
+    bench = cls()
+    if hasattr(bench, 'setup'):
+        bench.setup(*params)
+    try:
+        func = getattr(bench, method)
+        if method.startswith('peakmem_'):
+            tracemalloc.start()
+            try:
+                func(*params)
+                return tracemalloc.get_traced_memory()[1] / 2 ** 20
+            finally:
+                tracemalloc.stop()
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(*params)
+            times.append(time.perf_counter() - start)
+        return min(times)
+    finally:
+        if hasattr(bench, 'teardown'):
+            bench.teardown(*params)
+
+
+def run(pattern=None, repeat=3):
+    """
+    Runs all (matching) benchmarks and returns a dict with the results by
+    benchmark name and a description of the machine.
+    """
+    results = {}
+    for name, cls, method, params in benchmarks(pattern):
+        value = measure(cls, method, params, repeat)
+        results[name] = {'value': value, 'unit': 'MB' if method.startswith('peakmem_') else 's'}
+        print('{0:<64} {1:>10.3f} {2}'.format(name, value, results[name]['unit']), flush=True)
+    return {'machine': {'python': platform.python_version(), 'pathpy': pp.__version__,
+                        'platform': platform.platform(), 'cpus': os.cpu_count()},
+            'results': results}
+
+
+def compare(results, baseline, threshold=1.2):
+    """
+    Returns the benchmarks whose value exceeds that of a baseline run by
+    more than the factor threshold, as (name, baseline, value) tuples.
+    """
+    regressions = []
+    for name, r in results['results'].items():
+        old = baseline['results'].get(name)
+        if old is not None and r['value'] > threshold * old['value']:
+            regressions.append((name, old['value'], r['value']))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--filter', help='only run benchmarks whose name contains this glob pattern')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed runs, the shortest is reported')
+    parser.add_argument('--output', help='JSON file the results are written to')
+    parser.add_argument('--compare', help='JSON file with the results of an earlier run')
+    parser.add_argument('--threshold', type=float, default=1.2, help='factor by which a benchmark may get worse')
+    args = parser.parse_args()
+    results = run(args.filter, args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for name, old, new in regressions:
+            print('REGRESSION {0}: {1:.3f} -> {2:.3f}'.format(name, old, new))
+        sys.exit(1 if regressions else 0)
@@ -7,6 +7,17 @@ import scipy.stats
 import numpy as np
 import operator
 import json
+import os
+import sys
+
+# path_streams is imported from the solutions package in the root of the repository, which is not on the path
+# when this script is run as python solutions/7_generate_gt.py. In an interactive window, the working directory is
+# the root of the repository (like for the data files below).
+if '__file__' in globals():
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+else:
+    sys.path.insert(0, os.getcwd())
+from solutions import path_streams
 
 
 def write_gt(paths, file):
@@ -14,6 +25,11 @@ def write_gt(paths, file):
     with open(file, 'w') as f:
         json.dump(ground_truth, f)
 
+def write_gt_stream(paths, file):
+    ground_truth = path_streams.visitation_probabilities(paths)
+    with open(file, 'w') as f:
+        json.dump(ground_truth, f)
+
 con = sqlite3.connect('data/temporal_networks.db')
 con.row_factory = sqlite3.Row
 
@@ -25,8 +41,8 @@ paths = pp.path_extraction.paths_from_origin_destination(od_stats, tube_net)
 write_gt(paths, 'data/tube_gt.json')
 
 #%% Flights
-paths = pp.Paths.read_file('data/US_flights.ngram', frequency=False)
-write_gt(paths, 'data/US_flights_gt.json')
+paths = path_streams.read_ngram('data/US_flights.ngram', frequency=False)
+write_gt_stream(paths, 'data/US_flights_gt.json')
 
 #%% Wikipedia
 paths = pp.Paths.read_file('data/wikipedia_clickstreams.ngram', frequency=False, expand_sub_paths=False)
@@ -257,3 +257,17 @@ This plot is interesting for several reasons:
 This concludes our hands-on tutorial on higher-order network analytics and we now move to an open-ended data exploration.
 """)
 
+#%%
+md("""
+Finally, the validation of all data sets above can be repeated in one go. `validation_harness` runs the data sets in parallel, caches extracted paths and fitted models in `.cache/validation` and collects Kendall tau, Spearman correlation and top-k overlap for each order in a single table.
+""")
+
+#%% In [11]
+import os, sys
+sys.path.insert(0, os.path.abspath(''))
+from solutions import validation_harness
+
+# validate all data sets above in parallel, with cached paths and models
+rows = validation_harness.run(validation_harness.TUTORIAL_JOBS)
+print(validation_harness.format_table(rows))
+
@@ -133,3 +133,12 @@ order = mog.estimate_order()
 res = validate(mog, gt)
 plot_results(res, order)
 
+#%% In [11]
+import os, sys
+sys.path.insert(0, os.path.abspath(''))
+from solutions import validation_harness
+
+# validate all data sets above in parallel, with cached paths and models
+rows = validation_harness.run(validation_harness.TUTORIAL_JOBS)
+print(validation_harness.format_table(rows))
+
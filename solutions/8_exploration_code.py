@@ -1,19 +1,20 @@
 #%% In [1]
+import os, sys
+sys.path.insert(0, os.path.abspath(''))
 import pathpy as pp
-import sqlite3
+from solutions import datasets
 
-con = sqlite3.connect('data/temporal_networks.db',)
-con.row_factory = sqlite3.Row
+# descriptors of all data sets, read once from the metadata table
+reg = datasets.registry('data/temporal_networks.db')
 
-for row in con.execute('SELECT * from metadata'):
-    print('{0} \t\t {1}'.format(row['tag'], row['name']))
+for tag in reg.tags():
+    print('{0} \t\t {1}'.format(tag, reg.describe(tag)['name']))
 
 #%% In [2]
 table = 'manufacturing_email'
 
-# Check whether network is directed or not
-directed_network = bool(con.execute("SELECT directed FROM metadata WHERE tag='{0}'".format(table)).fetchone()['directed'])
-t = pp.TemporalNetwork.from_sqlite(con.execute('SELECT source, target, time FROM ' + table), 
-                                   directed=directed_network)
+# the registry knows whether the network is directed. Time stamps are loaded as they are,
+# reg.recommended_time_rescale(table) is the largest time_rescale that would not lose information
+t = reg.temporal_network(table, time_rescale=1)
 print(t)
 
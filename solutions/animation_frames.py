@@ -0,0 +1,195 @@
+"""
+Precomputed frames for animations of temporal networks. In pathpy's
+temporal network template, the browser scans the whole look_behind /
+look_ahead window of every frame to find active and visible edges, which
+does not scale to long windows or networks with millions of events. Here,
+the sliding window is evaluated once in Python and the exported HTML only
+contains, for each frame, the edges that enter or leave the window and the
+edges that are active in that frame.
+"""
+import json
+import os
+
+import numpy as np
+import pathpy as pp
+
+from solutions import compact_html, templates
+
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frames_template.html')
+
+
+def _merge_intervals(edge, start, end, num_frames):
+    # union of the frame intervals of all events of the same edge
+    order = np.lexsort((start, edge))
+    edge, start, end = edge[order], start[order], end[order]
+    offset = edge * (num_frames + 1)
+    reach = np.maximum.accumulate(offset + end) - offset
+    first = np.ones(len(edge), dtype=bool)
+    first[1:] = (edge[1:] != edge[:-1]) | (start[1:] > reach[:-1] + 1)
+    starts = np.flatnonzero(first)
+    ends = np.append(starts[1:], len(edge)) - 1
+    return edge[starts], start[starts], reach[ends]
+
+
+def _per_frame(frames, ids, num_frames):
+    # sort ids by frame and count the number of ids per frame
+    order = np.lexsort((ids, frames))
+    return np.bincount(frames, minlength=num_frames), ids[order]
+
+
+def compute_frames(tempnet, ts_per_frame=1, look_ahead=10, look_behind=10, max_time=None):
+    """
+    Computes the frames of an animated temporal network with the semantics of
+    pathpy's temporal network template. Frame f shows time mintime + f *
+    ts_per_frame; an edge is active in a frame if it occurs within the last
+    ts_per_frame time stamps and within look_behind time stamps before the
+    frame's time, and it is visible (and contributes to the force-directed
+    layout) if it occurs within look_behind time stamps before or look_ahead
+    time stamps after the frame's time.
+
+    Parameters:
+    -----------
+    tempnet: TemporalNetwork
+        the temporal network to animate
+    ts_per_frame: int
+        number of time stamps shown in each frame
+    look_ahead: int
+        number of future time stamps within which edges are visible
+    look_behind: int
+        number of past time stamps within which edges are visible
+    max_time: int
+        maximum time stamp to visualise, default is None
+
+    Returns:
+    --------
+    dict with the node names, the (source, target) index pairs of all edges
+    and, for each frame, the number and ids of edges that enter and leave
+    the visible window as well as of the active edges
+    """
+    nodes = list(tempnet.nodes)
+    node_idx = {v: i for i, v in enumerate(nodes)}
+    tedges = [e for e in tempnet.tedges if max_time is None or e[2] <= max_time]
+    n = len(tedges)
+    src = np.fromiter((node_idx[v] for v, _, _ in tedges), dtype=np.int64, count=n)
+    tgt = np.fromiter((node_idx[w] for _, w, _ in tedges), dtype=np.int64, count=n)
+    ts = np.fromiter((t for _, _, t in tedges), dtype=np.int64, count=n)
+    pairs, edge = np.unique(np.stack([src, tgt], axis=1), axis=0, return_inverse=True)
+    edge = edge.ravel()
+
+    # pathpy's template draws the frames mintime + f * ts_per_frame up to and including the first one after
+    # the last time stamp, since it stops the animation only after that frame
+    mintime = int(ts.min()) if n else 0
+    num_frames = (int(ts.max()) - mintime) // ts_per_frame + 2 if n else 0
+    rel = ts - mintime
+
+    # an event at time t is visible in frames f with f*T - look_behind <= t <= f*T + look_ahead
+    start = np.clip(-((look_ahead - rel) // ts_per_frame), 0, None)
+    end = np.clip((rel + look_behind) // ts_per_frame, None, num_frames - 1)
+    # for short windows, events between frames are not visible at all
+    shown = start <= end
+    e, start, end = _merge_intervals(edge[shown], start[shown], end[shown], num_frames)
+    enter_counts, enter_ids = _per_frame(start, e, num_frames)
+    leaving = end + 1 < num_frames
+    leave_counts, leave_ids = _per_frame(end[leaving] + 1, e[leaving], num_frames)
+
+    # ... and it is active in the first frame f with f*T >= t, if it is still within look_behind of that frame
+    first = -(-rel // ts_per_frame)
+    shown = first * ts_per_frame - rel <= look_behind
+    active = np.unique(np.stack([first[shown], edge[shown]], axis=1), axis=0)
+    active_counts, active_ids = _per_frame(active[:, 0], active[:, 1], num_frames)
+
+    return {
+        'nodes': nodes,
+        'edges': pairs,
+        'mintime': mintime,
+        'ts_per_frame': ts_per_frame,
+        'num_frames': num_frames,
+        'enter': (enter_counts, enter_ids),
+        'leave': (leave_counts, leave_ids),
+        'active': (active_counts, active_ids)
+    }
+
+
+def encode_frames(frames, compress=True):
+    """
+    Encodes frames returned by compute_frames as a JSON-serialisable dict
+    of base64 columns (see compact_html.encode_column).
+
+    Parameters:
+    -----------
+    frames: dict
+        frames returned by compute_frames
+    compress: bool
+        whether or not to use variable-length integer columns (default True)
+    """
+    payload = {
+        'nodes': [compact_html.fix_node_name(v) for v in frames['nodes']],
+        'num_edges': len(frames['edges']),
+        'num_frames': frames['num_frames'],
+        'mintime': frames['mintime'],
+        'ts_per_frame': frames['ts_per_frame'],
+        'edges': compact_html.encode_column(frames['edges'].ravel(), compress)
+    }
+    for key in ['enter', 'leave', 'active']:
+        counts, ids = frames[key]
+        payload[key] = {'num_ids': len(ids),
+                        'counts': compact_html.encode_column(counts, compress),
+                        'ids': compact_html.encode_column(ids, compress)}
+    return payload
+
+
+def generate_html(tempnet, compress=True, **params):
+    """
+    Generates an HTML animation of a temporal network based on precomputed
+    frames. Supports the parameters of pp.visualisation.plot for temporal
+    networks. Custom templates must decode the frame payload passed as
+    $network_data, see frames_template.html and, for a template with custom
+    parameters, data/custom_frames_template.html.
+
+    Parameters:
+    -----------
+    tempnet: TemporalNetwork
+        the temporal network to visualise
+    compress: bool
+        whether or not to use variable-length integer columns (default True)
+    params: dict
+        visualisation parameters, see pp.visualisation.plot
+    """
+    if params.get('ts_per_frame', 1) == 0:
+        fps = 1000.0/float(params.get('ms_per_frame', 50))
+        x = np.mean(tempnet.inter_event_times())/fps
+        params['ts_per_frame'] = int(np.max([1, int(20 * x)]))
+    frames = compute_frames(tempnet,
+                            ts_per_frame=params.get('ts_per_frame', 1),
+                            look_ahead=params.get('look_ahead', 10),
+                            look_behind=params.get('look_behind', 10),
+                            max_time=params.get('max_time'))
+    params['max_time'] = None
+    params['network_data'] = json.dumps(encode_frames(frames, compress), separators=(',', ':'))
+    if 'template' not in params:
+        params['template'] = TEMPLATE
+    return templates.generate_html(pp.TemporalNetwork(), **params)
+
+
+def export_html(tempnet, filename, compress=True, **params):
+    """
+    Exports a stand-alone HTML file with an animation of a temporal network
+    based on precomputed frames. Counterpart of pp.visualisation.export_html.
+
+    Parameters:
+    -----------
+    tempnet: TemporalNetwork
+        the temporal network to visualise
+    filename: str
+        path where the HTML file will be saved
+    compress: bool
+        whether or not to use variable-length integer columns (default True)
+    params: dict
+        visualisation parameters, see pp.visualisation.plot
+    """
+    html = generate_html(tempnet, compress, **params)
+    if 'template' not in params:
+        html = '<!DOCTYPE html>\n<html><body>\n' + html + '</body>\n</html>'
+    with open(filename, 'w+') as f:
+        f.write(html)
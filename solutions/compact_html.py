@@ -0,0 +1,197 @@
+"""
+Compact HTML export of temporal networks. pp.visualisation.export_html
+embeds every time-stamped edge as a JSON object, which makes exports of
+large temporal networks huge and slow to open. Here, edges are stored as
+integer-coded columns (an edge id and a delta-encoded time stamp per event)
+that are base64 encoded and decoded in the browser into the network_data
+object expected by pathpy's default and custom templates, so existing
+templates like data/custom_template.html can be used unchanged.
+"""
+import base64
+import json
+
+import numpy as np
+import pathpy as pp
+
+from solutions import templates
+
+
+# browser-side decoder, which is substituted for $network_data in templates
+_DECODER = """(function(p) {
+    function bytes(s) {
+        var b = atob(s), u = new Uint8Array(b.length);
+        for (var i = 0; i < b.length; i++) u[i] = b.charCodeAt(i);
+        return u;
+    }
+    function column(c, n) {
+        var u = bytes(c.data);
+        if (c.type != 'varint')
+            return new window[c.type](u.buffer);
+        var out = new Float64Array(n), j = 0, x = 0, s = 1;
+        for (var i = 0; i < u.length; i++) {
+            x += (u[i] & 127) * s;
+            if (u[i] < 128) { out[j++] = x; x = 0; s = 1; }
+            else s *= 128;
+        }
+        return out;
+    }
+    var pairs = column(p.edges, 2 * p.num_edges),
+        ids = column(p.edge_ids, p.num_events),
+        dt = column(p.time_deltas, p.num_events),
+        nodes = p.nodes.map(function(v) { return {'id': v, 'group': 1}; }),
+        links = new Array(p.num_events),
+        t = p.t0;
+    for (var i = 0; i < p.num_events; i++) {
+        t += dt[i];
+        links[i] = {'source': p.nodes[pairs[2 * ids[i]]],
+                    'target': p.nodes[pairs[2 * ids[i] + 1]],
+                    'width': 1, 'time': t};
+    }
+    return {'nodes': nodes, 'links': links};
+})($payload)"""
+
+
+def fix_node_name(v):
+    """
+    Turns a node into a valid HTML id, in the same way as
+    pp.visualisation.html does for temporal networks.
+    """
+    new_v = str(v)
+    if str(v)[0].isdigit():
+        new_v = "n_" + str(v)
+    if new_v[0] == '_':
+        new_v = "n_" + str(v)
+    if '-' in new_v:
+        new_v = new_v.replace('-', '_')
+    return new_v
+
+
+def _varint(x):
+    # LEB128 encoding of non-negative integers
+    x = x.astype(np.uint64)
+    n = np.ones(len(x), dtype=np.int64)
+    for k in range(1, 10):
+        n[x >= np.uint64(1 << (7 * k))] = k + 1
+    offsets = np.cumsum(n) - n
+    out = np.zeros(n.sum(), dtype=np.uint8)
+    for k in range(n.max() if len(n) else 0):
+        sel = n > k
+        b = (x[sel] >> np.uint64(7 * k)) & np.uint64(127)
+        out[offsets[sel] + k] = b | np.where(n[sel] > k + 1, 128, 0).astype(np.uint64)
+    return out.tobytes()
+
+
+def encode_column(x, compress=False):
+    """
+    Encodes an array of non-negative integers as a base64 column that can be
+    decoded in the browser, either as variable-length integers (compress=True)
+    or as the smallest typed array that holds all values.
+    """
+    if compress:
+        return {'type': 'varint', 'data': base64.b64encode(_varint(x)).decode('ascii')}
+    for dtype, js_type in [('<u1', 'Uint8Array'), ('<u2', 'Uint16Array'), ('<u4', 'Uint32Array')]:
+        if len(x) == 0 or x.max() <= np.iinfo(dtype).max:
+            return {'type': js_type, 'data': base64.b64encode(x.astype(dtype).tobytes()).decode('ascii')}
+    return {'type': 'Float64Array', 'data': base64.b64encode(x.astype('<f8').tobytes()).decode('ascii')}
+
+
+def encode_tempnet(tempnet, compress=False):
+    """
+    Encodes the time-stamped edges of a temporal network as integer columns.
+    Events are sorted by time, each event refers to the index of its (source,
+    target) pair and stores the time difference to the previous event.
+
+    Parameters:
+    -----------
+    tempnet: TemporalNetwork
+        the temporal network to encode
+    compress: bool
+        if True, columns are stored as variable-length integers, which
+        shrinks time deltas and edge ids to one or two bytes in most cases.
+        If False (default), each column uses the smallest fixed-width integer
+        type that fits its maximum value.
+
+    Returns:
+    --------
+    dict payload that is decoded by the browser-side decoder
+    """
+    nodes = list(tempnet.nodes)
+    node_idx = {v: i for i, v in enumerate(nodes)}
+    n = len(tempnet.tedges)
+    src = np.fromiter((node_idx[v] for v, _, _ in tempnet.tedges), dtype=np.int64, count=n)
+    tgt = np.fromiter((node_idx[w] for _, w, _ in tempnet.tedges), dtype=np.int64, count=n)
+    ts = np.fromiter((t for _, _, t in tempnet.tedges), dtype=np.int64, count=n)
+
+    order = np.argsort(ts, kind='stable')
+    src, tgt, ts = src[order], tgt[order], ts[order]
+    pairs, edge_ids = np.unique(np.stack([src, tgt], axis=1), axis=0, return_inverse=True)
+    t0 = int(ts[0]) if n else 0
+    deltas = np.diff(ts, prepend=t0)
+
+    return {
+        'nodes': [fix_node_name(v) for v in nodes],
+        'num_edges': len(pairs),
+        'num_events': n,
+        't0': t0,
+        'edges': encode_column(pairs.ravel(), compress),
+        'edge_ids': encode_column(edge_ids.ravel(), compress),
+        'time_deltas': encode_column(deltas, compress)
+    }
+
+
+def generate_html(tempnet, compress=False, **params):
+    """
+    Generates the same HTML as pp.visualisation.generate_html for a temporal
+    network, but with a compact, integer-coded representation of the
+    time-stamped edges. Supports all parameters of pp.visualisation.plot,
+    including custom templates.
+
+    Parameters:
+    -----------
+    tempnet: TemporalNetwork
+        the temporal network to visualise
+    compress: bool
+        whether or not to use variable-length integer columns, see encode_tempnet
+    params: dict
+        visualisation parameters, see pp.visualisation.plot
+    """
+    if params.get('max_time') is not None:
+        tempnet = tempnet.filter_edges(lambda u, v, t: t <= params['max_time'])
+    params['max_time'] = None
+
+    # auto-adjust simulation speed as in pathpy, which we cannot do on
+    # the empty network that we pass to pathpy below
+    if params.get('ts_per_frame', 1) == 0:
+        fps = 1000.0/float(params.get('ms_per_frame', 50))
+        x = np.mean(tempnet.inter_event_times())/fps
+        params['ts_per_frame'] = int(np.max([1, int(20 * x)]))
+
+    payload = json.dumps(encode_tempnet(tempnet, compress), separators=(',', ':'))
+    params['network_data'] = _DECODER.replace('$payload', payload)
+
+    # pathpy fills in default parameters and the (cached) template, the network_data
+    # parameter overrides the (empty) JSON data generated by pathpy
+    return templates.generate_html(pp.TemporalNetwork(), **params)
+
+
+def export_html(tempnet, filename, compress=False, **params):
+    """
+    Exports a stand-alone HTML file with a compact visualisation of a
+    temporal network. Counterpart of pp.visualisation.export_html.
+
+    Parameters:
+    -----------
+    tempnet: TemporalNetwork
+        the temporal network to visualise
+    filename: str
+        path where the HTML file will be saved
+    compress: bool
+        whether or not to use variable-length integer columns, see encode_tempnet
+    params: dict
+        visualisation parameters, see pp.visualisation.plot
+    """
+    html = generate_html(tempnet, compress, **params)
+    if 'template' not in params:
+        html = '<!DOCTYPE html>\n<html><body>\n' + html + '</body>\n</html>'
+    with open(filename, 'w+') as f:
+        f.write(html)
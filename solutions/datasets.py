@@ -0,0 +1,133 @@
+"""
+Registry of the temporal networks in temporal_networks.db, based on its
+metadata table. 8_exploration looks up each table with a query built by
+string formatting and then reads it with a second query. Here, all data
+set descriptors are read with a single query and cached, tables can only
+be loaded if they are listed in the metadata, and temporal networks are
+returned with the right directedness and the largest time_rescale that
+does not lose information, i.e. the GCD of all inter-event times.
+
+    reg = datasets.registry('data/temporal_networks.db')
+    t = reg.temporal_network('manufacturing_email')
+"""
+import os
+
+import numpy as np
+
+from solutions import sqlite_source, time_rescale
+
+
+# registries by database path, see registry
+_registries = {}
+
+
+class DatasetRegistry:
+    """
+    Data set descriptors of a database with a metadata table that has one
+    row per data set, with at least the columns tag (the name of the table
+    with the time-stamped links) and directed.
+    """
+
+    def __init__(self, db):
+        """
+        Parameters:
+        -----------
+        db: str
+            path of the database file
+        """
+        self.db = db
+        self.con = sqlite_source.connect_readonly(db)
+        cur = self.con.execute('SELECT * FROM metadata')
+        columns = [c[0] for c in cur.description]
+        self.datasets = {row['tag']: row for row in (dict(zip(columns, r)) for r in cur)}
+        self._lossless_rescales = {}
+
+    def close(self):
+        """
+        Closes the connection to the database.
+        """
+        self.con.close()
+
+    def __contains__(self, tag):
+        return tag in self.datasets
+
+    def tags(self):
+        """
+        Returns the tags of all data sets.
+        """
+        return list(self.datasets)
+
+    def describe(self, tag):
+        """
+        Returns the metadata of a data set as a dict.
+        """
+        if tag not in self.datasets:
+            raise KeyError('Unknown data set {0}'.format(tag))
+        return self.datasets[tag]
+
+    def directed(self, tag):
+        """
+        Whether the links of a data set are directed.
+        """
+        return bool(self.describe(tag)['directed'])
+
+    def recommended_time_rescale(self, tag):
+        """
+        Returns the largest time_rescale of a data set with integer time
+        stamps that does not lose information, i.e. the GCD of all
+        inter-event times, see time_rescale.lossless_rescale. Returns 1 for
+        time stamps that are not integers, e.g. strings.
+        """
+        if tag not in self._lossless_rescales:
+            self.describe(tag)
+            table = sqlite_source.quote_identifier(tag)
+            # the type of the time column, from a single row
+            row = self.con.execute('SELECT typeof(time) FROM {0} LIMIT 1'.format(table)).fetchone()
+            if row is None or row[0] != 'integer':
+                self._lossless_rescales[tag] = 1
+            else:
+                cur = self.con.execute('SELECT DISTINCT time FROM {0} ORDER BY time'.format(table))
+                times = np.fromiter((t for t, in cur), dtype=np.int64)
+                self._lossless_rescales[tag] = time_rescale.lossless_rescale(times)
+        return self._lossless_rescales[tag]
+
+    def source(self, tag):
+        """
+        Returns an SQLiteSource for the links of a data set.
+        """
+        self.describe(tag)
+        return sqlite_source.SQLiteSource(self.con, tag, create_indexes=False)
+
+    def temporal_network(self, tag, time_rescale='auto', start=None, end=None, nodes=None, induced=True):
+        """
+        Loads (part of) a data set into a temporal network, with the
+        directedness given in the metadata.
+
+        Parameters:
+        -----------
+        tag: str
+            tag of the data set
+        time_rescale: int, str
+            factor by which time stamps are divided. Default is 'auto', i.e.
+            recommended_time_rescale.
+        start, end, nodes, induced:
+            time window and nodes to load, see SQLiteSource.query
+        """
+        if time_rescale == 'auto':
+            time_rescale = self.recommended_time_rescale(tag)
+        return self.source(tag).temporal_network(start, end, nodes, induced, directed=self.directed(tag),
+                                                 time_rescale=time_rescale)
+
+
+def registry(db='data/temporal_networks.db'):
+    """
+    Returns the registry of a database, which is only created again if the
+    database file has been modified.
+    """
+    path = os.path.abspath(db)
+    mtime = os.stat(path).st_mtime_ns
+    if path not in _registries or _registries[path][0] != mtime:
+        if path in _registries:
+            _registries[path][1].close()
+        _registries[path] = (mtime, DatasetRegistry(db))
+    return _registries[path][1]
@@ -0,0 +1,215 @@
+"""
+Parallel, incremental generation of ground truth, as in 7_generate_gt.
+Data sets are processed in a pool of processes. Each ground-truth store
+records a key of its inputs (the hash of the data files or of the rows of
+the SQL table, and the extraction settings), so that data sets whose
+inputs have not changed are skipped. The time spent in each stage
+(hashing, loading, path extraction, ground truth and writing) is logged.
+
+Build all tutorial data sets with python -m solutions.gt_builder
+"""
+import concurrent.futures
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import time
+
+import pathpy as pp
+
+from solutions import gt_store, path_streams, sqlite_source, validation_harness
+
+
+log = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, 'data')
+
+# data sets of 7_generate_gt
+TUTORIAL_DATASETS = [
+    {'name': 'tube', 'network': os.path.join(DATA_DIR, 'tube.edges'), 'od': os.path.join(DATA_DIR, 'tube_od.csv'),
+     'separator': ';',
+     'gt': os.path.join(DATA_DIR, 'tube_gt.gt'), 'json': os.path.join(DATA_DIR, 'tube_gt.json')},
+    {'name': 'US_flights', 'ngram': os.path.join(DATA_DIR, 'US_flights.ngram'), 'frequency': False, 'stream': True,
+     'gt': os.path.join(DATA_DIR, 'US_flights_gt.gt'), 'json': os.path.join(DATA_DIR, 'US_flights_gt.json')},
+    {'name': 'wikipedia_clickstreams', 'ngram': os.path.join(DATA_DIR, 'wikipedia_clickstreams.ngram'),
+     'frequency': False, 'expand_sub_paths': False,
+     'gt': os.path.join(DATA_DIR, 'wikipedia_clickstreams_gt.gt'),
+     'json': os.path.join(DATA_DIR, 'wikipedia_clickstreams_gt.json')},
+    {'name': 'haggle', 'db': os.path.join(DATA_DIR, 'temporal_networks.db'), 'table': 'haggle',
+     'time_rescale': 10, 'delta': 6, 'num_roots': 1000,
+     'gt': os.path.join(DATA_DIR, 'haggle_gt.gt'), 'json': os.path.join(DATA_DIR, 'haggle_gt.json')},
+    {'name': 'manufacturing_email', 'db': os.path.join(DATA_DIR, 'temporal_networks.db'),
+     'table': 'manufacturing_email', 'time_rescale': 600, 'delta': 12, 'num_roots': 1000,
+     'gt': os.path.join(DATA_DIR, 'manufacturing_email_gt.gt'),
+     'json': os.path.join(DATA_DIR, 'manufacturing_email_gt.json')},
+    {'name': 'sociopatterns_hospital', 'db': os.path.join(DATA_DIR, 'temporal_networks.db'),
+     'table': 'sociopatterns_hospital', 'time_rescale': 20, 'directed': False, 'delta': 3, 'num_roots': 200,
+     'gt': os.path.join(DATA_DIR, 'sociopatterns_hospital_gt.gt'),
+     'json': os.path.join(DATA_DIR, 'sociopatterns_hospital_gt.json')},
+]
+
+# data set entries that name outputs rather than inputs
+_OUTPUTS = ['name', 'gt', 'json']
+
+
+@contextlib.contextmanager
+def _stage(timings, name):
+    # adds the time spent in a with block to timings[name]
+    start = time.time()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.time() - start
+
+
+def table_hash(db, table):
+    """
+    Returns the SHA-1 hash of the source, target and time columns of an
+    SQLite table, in the order of its rows.
+    """
+    h = hashlib.sha1()
+    con = sqlite_source.connect_readonly(db)
+    try:
+        cur = con.execute('SELECT source, target, time FROM "{0}" ORDER BY rowid'.format(table.replace('"', '""')))
+        for rows in iter(lambda: cur.fetchmany(100000), []):
+            h.update(repr(rows).encode())
+    finally:
+        con.close()
+    return h.hexdigest()
+
+
+def input_key(dataset):
+    """
+    Returns a key of the inputs of a data set, which changes whenever one
+    of its data files, its SQL table or its extraction settings change.
+    """
+    settings = {k: v for k, v in dataset.items() if k not in _OUTPUTS}
+    for k in ['network', 'od', 'ngram']:
+        if k in dataset:
+            settings[k + '_hash'] = validation_harness.file_hash(dataset[k])
+    if 'db' in dataset:
+        settings['table_hash'] = table_hash(dataset['db'], dataset['table'])
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+
+def is_current(dataset, key):
+    """
+    Whether the ground truth of a data set exists and was generated from
+    inputs with the given key.
+    """
+    if not os.path.exists(dataset['gt']) or ('json' in dataset and not os.path.exists(dataset['json'])):
+        return False
+    try:
+        return gt_store.GroundTruth(dataset['gt']).metadata.get('input_key') == key
+    except ValueError:
+        return False
+
+
+def ground_truth(dataset, timings):
+    """
+    Extracts the paths of a data set and returns the visitation
+    probabilities of nodes, adding the time of each stage to timings.
+    """
+    if 'od' in dataset:
+        with _stage(timings, 'load'):
+            network = pp.Network.read_file(dataset['network'], separator=dataset.get('separator', ','))
+            od_stats = pp.path_extraction.read_origin_destination(dataset['od'], separator=dataset.get('separator', ','))
+        with _stage(timings, 'extract'):
+            paths = pp.path_extraction.paths_from_origin_destination(od_stats, network)
+    elif 'ngram' in dataset and dataset.get('stream', False):
+        # paths are only streamed once, so loading and extraction are a single stage
+        with _stage(timings, 'extract'):
+            return path_streams.visitation_probabilities(
+                path_streams.read_ngram(dataset['ngram'], frequency=dataset.get('frequency', False)))
+    elif 'ngram' in dataset:
+        with _stage(timings, 'load'):
+            paths = pp.Paths.read_file(dataset['ngram'], frequency=dataset.get('frequency', False),
+                                       expand_sub_paths=dataset.get('expand_sub_paths', True))
+    else:
+        with _stage(timings, 'load'):
+            source = sqlite_source.SQLiteSource(sqlite_source.connect_readonly(dataset['db']), dataset['table'],
+                                                create_indexes=False)
+            t = source.temporal_network(directed=dataset.get('directed', True),
+                                        time_rescale=dataset.get('time_rescale', 1))
+            source.close()
+        with _stage(timings, 'extract'):
+            paths = validation_harness.sample_causal_paths(t, delta=dataset['delta'], num_roots=dataset['num_roots'],
+                                                           seed=dataset.get('seed', 42))
+    with _stage(timings, 'ground_truth'):
+        return pp.algorithms.centralities.visitation_probabilities(paths)
+
+
+def build(dataset, force=False):
+    """
+    Generates the ground truth of a single data set, unless its inputs have
+    not changed since it was last generated. Returns a dict with the name
+    of the data set, its status (built or skipped) and the time spent in
+    each stage.
+
+    Parameters:
+    -----------
+    dataset: dict
+        data set settings, see TUTORIAL_DATASETS. gt is the path of the
+        binary store, json the optional path of a JSON copy for the
+        notebooks.
+    force: bool
+        if True, the ground truth is generated even if it is up to date
+    """
+    timings = {}
+    with _stage(timings, 'hash'):
+        key = input_key(dataset)
+    if not force and is_current(dataset, key):
+        return {'name': dataset['name'], 'status': 'skipped', 'timings': timings}
+
+    gt = ground_truth(dataset, timings)
+    with _stage(timings, 'write'):
+        settings = {k: v for k, v in dataset.items() if k not in _OUTPUTS}
+        if 'json' in dataset:
+            with open(dataset['json'], 'w') as f:
+                json.dump(gt, f)
+        # the store is written last, so that an interrupted build is repeated
+        gt_store.write_gt(gt, dataset['gt'], dataset=dataset['name'], input_key=key, settings=settings)
+    return {'name': dataset['name'], 'status': 'built', 'timings': timings}
+
+
+def build_all(datasets=TUTORIAL_DATASETS, processes=None, force=False):
+    """
+    Generates the ground truth of several data sets in a pool of processes
+    and logs the time spent in each stage. Data sets that fail are logged
+    and reported with status error, rather than stopping the others.
+
+    Parameters:
+    -----------
+    datasets: list
+        list of data set dicts, see TUTORIAL_DATASETS
+    processes: int
+        number of worker processes, default is the number of CPUs
+    force: bool
+        if True, all ground truth is generated, even if it is up to date
+
+    Returns:
+    --------
+    list with one result dict per data set, see build
+    """
+    results = []
+    with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+        futures = [pool.submit(build, dataset, force) for dataset in datasets]
+        for dataset, future in zip(datasets, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'name': dataset['name'], 'status': 'error',
+                          'error': '{0}: {1}'.format(type(e).__name__, e), 'timings': {}}
+                log.error('%s: %s', dataset['name'], result['error'])
+            else:
+                log.info('%s: %s (%s)', result['name'], result['status'],
+                         ', '.join('{0} {1:.2f}s'.format(k, v) for k, v in result['timings'].items()))
+            results.append(result)
+    return results
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    build_all()
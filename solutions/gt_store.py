@@ -0,0 +1,183 @@
+"""
+Binary store for ground-truth centralities. 7_generate_gt writes one JSON
+dict per data set, which has to be parsed completely before any node can
+be validated. Here, ground truth is stored in a single file with a small
+JSON header (number of nodes and data set metadata), the values as a
+float64 array that is memory-mapped when reading, and the node names as
+one block of UTF-8 text. Files are written to a temporary file first and
+then renamed, so that readers never see a partially written store.
+
+Convert all JSON files in data/ with python -m solutions.gt_store
+"""
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+from solutions import rank_correlation
+
+
+MAGIC = b'GTSTORE1'
+
+# separates node names in the node block
+_SEPARATOR = '\x00'
+
+
+class GroundTruth:
+    """
+    Ground truth stored in a binary file. Values are memory-mapped, node
+    names are only decoded when they are first used.
+    """
+
+    def __init__(self, file):
+        """
+        Parameters:
+        -----------
+        file: str
+            path of a file written with write_gt
+        """
+        with open(file, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError('{0} is not a ground-truth store'.format(file))
+            size = int(np.frombuffer(f.read(8), dtype='<u8')[0])
+            header = json.loads(f.read(size).decode('utf-8'))
+        self.file = file
+        self.metadata = header['metadata']
+        offset = len(MAGIC) + 8 + size
+        self.values = np.memmap(file, dtype='<f8', mode='r', offset=offset, shape=(header['n'],)) \
+            if header['n'] else np.zeros(0)
+        self._nodes_offset = offset + 8 * header['n']
+        self._nodes_size = header['nodes_size']
+        self._nodes = None
+        self._index = None
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def nodes(self):
+        """
+        List of node names, in the order of values.
+        """
+        if self._nodes is None:
+            with open(self.file, 'rb') as f:
+                f.seek(self._nodes_offset)
+                block = f.read(self._nodes_size).decode('utf-8')
+            self._nodes = block.split(_SEPARATOR) if len(self.values) else []
+        return self._nodes
+
+    @property
+    def index(self):
+        """
+        rank_correlation.NodeIndex of the nodes.
+        """
+        if self._index is None:
+            self._index = rank_correlation.NodeIndex(self.nodes)
+        return self._index
+
+    def to_dict(self):
+        """
+        Returns the ground truth as a dict, in the format of the JSON files.
+        """
+        return dict(zip(self.nodes, self.values.tolist()))
+
+
+def write_gt(ground_truth, file, **metadata):
+    """
+    Writes ground truth to a binary store.
+
+    Parameters:
+    -----------
+    ground_truth: dict
+        ground-truth values by node, e.g. the visitation probabilities of
+        pp.algorithms.centralities.visitation_probabilities. Nodes are
+        stored by their names as strings. Nodes with the same name, e.g. 1
+        and '1', are stored once if their values are equal, otherwise a
+        ValueError is raised.
+    file: str
+        path of the store
+    metadata: dict
+        JSON-serialisable information about the data set, e.g. its name,
+        source file or extraction parameters. The time of creation is added
+        as created.
+    """
+    # node names are stored as strings (like in the JSON files), so that e.g. 1 and '1' are the same node
+    by_name = {}
+    for v, x in ground_truth.items():
+        name = str(v)
+        if name in by_name and by_name[name] != float(x):
+            raise ValueError('Nodes with the name {0} have different values {1} and {2}'.format(
+                name, by_name[name], float(x)))
+        by_name[name] = float(x)
+    nodes = list(by_name)
+    if any(_SEPARATOR in v for v in nodes):
+        raise ValueError('Node names must not contain null characters')
+    values = np.fromiter(by_name.values(), dtype='<f8', count=len(nodes))
+    block = _SEPARATOR.join(nodes).encode('utf-8')
+    header = json.dumps({'n': len(nodes), 'nodes_size': len(block),
+                         'metadata': {'created': time.strftime('%Y-%m-%d %H:%M:%S'), **metadata}}).encode('utf-8')
+    # pad the header so that values are aligned to 8 bytes
+    header += b' ' * (-(len(MAGIC) + 8 + len(header)) % 8)
+
+    tmp = '{0}.{1}.tmp'.format(file, os.getpid())
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.array([len(header)], dtype='<u8').tobytes())
+        f.write(header)
+        f.write(values.tobytes())
+        f.write(block)
+    os.replace(tmp, file)
+
+
+def read_gt(file):
+    """
+    Reads ground truth from a binary store or a JSON file and returns its
+    node index and values, which can be passed to rank_correlation.validate.
+    """
+    if file.endswith('.json'):
+        return rank_correlation.read_gt(file)
+    gt = GroundTruth(file)
+    return gt.index, gt.values
+
+
+def migrate(json_file, file=None, **metadata):
+    """
+    Converts a JSON ground-truth file into a binary store and returns the
+    path of the store.
+
+    Parameters:
+    -----------
+    json_file: str
+        path of the JSON file, e.g. data/US_flights_gt.json
+    file: str
+        path of the store. Default is None, i.e. the JSON path with the
+        extension .gt
+    metadata: dict
+        information about the data set. The name of the data set and the
+        JSON file are added by default.
+    """
+    if file is None:
+        file = os.path.splitext(json_file)[0] + '.gt'
+    with open(json_file, 'r') as f:
+        ground_truth = json.load(f)
+    name = os.path.basename(json_file)
+    if name.endswith('_gt.json'):
+        metadata.setdefault('dataset', name[:-len('_gt.json')])
+    metadata.setdefault('source', json_file)
+    write_gt(ground_truth, file, **metadata)
+    return file
+
+
+def migrate_all(directory='data'):
+    """
+    Converts all *_gt.json files in a directory into binary stores and
+    returns their paths.
+    """
+    return [migrate(f) for f in sorted(glob.glob(os.path.join(directory, '*_gt.json')))]
+
+
+if __name__ == '__main__':
+    for f in migrate_all():
+        print(f)
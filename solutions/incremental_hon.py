@@ -0,0 +1,245 @@
+"""
+Higher-order networks that are updated in place when paths are added.
+2_pathpy shows that path statistics can be combined with paths += other
+and scaled with paths *= factor, but a HigherOrderNetwork built from them
+has to be constructed again from scratch afterwards. Here, hon += other
+and hon *= factor update the link weights, node weights, the (possible)
+higher-order nodes and the degrees of freedom of a k-th order network,
+touching only the paths of length k that were added. Weighted adjacency
+and transition matrices are built once and then updated with sparse
+deltas, so that a model of a stream of paths stays current.
+
+    hon = incremental_hon.IncrementalHigherOrderNetwork(paths, k=2)
+    hon += new_paths
+    hon *= 10
+"""
+from collections import defaultdict
+
+import numpy as np
+import pathpy as pp
+import scipy.sparse as sparse
+
+
+def _copy_paths(paths):
+    # Paths.__mul__ returns a new Paths object, but with the default settings
+    copy = paths * 1
+    copy.separator = paths.separator
+    copy.max_subpath_length = paths.max_subpath_length
+    return copy
+
+
+class IncrementalHigherOrderNetwork(pp.HigherOrderNetwork):
+    """
+    A k-th order network that can be updated with additional paths. After
+    each update, it is equal to pp.HigherOrderNetwork(paths, k) of the
+    updated paths, except that new nodes are appended to the node order
+    (see node_to_name_map), so that the indices of existing nodes never
+    change. Null models are not supported, since their expected link
+    weights depend on all paths.
+    """
+
+    def __init__(self, paths, k=1, separator=None):
+        """
+        Parameters:
+        -----------
+        paths: Paths
+            the path statistics of the initial network. The network keeps a
+            copy of them as self.paths, which is updated together with the
+            network (see add_paths), so that paths itself is not changed.
+        k: int
+            order of the network
+        separator: str
+            separator of higher-order node names, default is the separator
+            of paths
+        """
+        # weight matrices of subpaths, longest paths and links, built on first use (for k=1 already by
+        # HigherOrderNetwork.__init__), see _matrices
+        self._weights = None
+        self._pending = []
+        paths = _copy_paths(paths)
+        super().__init__(paths, k, separator=separator)
+        # pathpy stores the weight arrays of paths as link weights, which would be changed by paths += other
+        for attr in self.edges.values():
+            attr['weight'] = np.array(attr['weight'], dtype=np.float64)
+        self._index = self.node_to_name_map()
+        # first-order links, which determine the possible higher-order nodes and the degrees of freedom
+        self._g1_index = {}
+        self._g1_successors = defaultdict(set)
+        self._g1_predecessors = defaultdict(set)
+        self._g1_links = []
+        for v, w in paths.paths[1]:
+            self._add_first_order_link(v, w)
+
+    def _add_first_order_link(self, v, w):
+        if w in self._g1_successors[v]:
+            return False
+        for x in (v, w):
+            self._g1_index.setdefault(x, len(self._g1_index))
+        self._g1_successors[v].add(w)
+        self._g1_predecessors[w].add(v)
+        self._g1_links.append((self._g1_index[v], self._g1_index[w]))
+        return True
+
+    def _add_node(self, v):
+        if v not in self.nodes:
+            self.add_node(v, inweight=np.array([0.0, 0.0]), outweight=np.array([0.0, 0.0]))
+            self._index[v] = len(self._index)
+
+    def _add_weight(self, v, w, weight):
+        # adds weight to link v -> w and to the weights of v and w, like add_edge without summing over all neighbours
+        self._add_node(v)
+        self._add_node(w)
+        new = (v, w) not in self.edges
+        if new:
+            self.edges[(v, w)] = {'weight': np.array(weight, dtype=np.float64)}
+            self.successors[v].add(w)
+            self.predecessors[w].add(v)
+            self.nodes[v]['outdegree'] = len(self.successors[v])
+            self.nodes[w]['indegree'] = len(self.predecessors[w])
+        else:
+            self.edges[(v, w)]['weight'] = self.edges[(v, w)]['weight'] + weight
+        self.nodes[v]['outweight'] = self.nodes[v]['outweight'] + weight
+        self.nodes[w]['inweight'] = self.nodes[w]['inweight'] + weight
+        if self._weights is not None:
+            self._pending.append((self._index[v], self._index[w], weight[0], weight[1], float(new)))
+
+    def _walks(self, v, steps, neighbours):
+        # all sequences of steps further nodes that start in v
+        if steps == 0:
+            return [()]
+        return [(w,) + rest for w in neighbours[v] for rest in self._walks(w, steps - 1, neighbours)]
+
+    def _add_possible_nodes(self, links):
+        # higher-order nodes for all paths of length k-1 in the first-order network that contain a new link
+        k = self.order
+        for v, w in links:
+            for i in range(k - 1):
+                for left in self._walks(v, i, self._g1_predecessors):
+                    for right in self._walks(w, k - 2 - i, self._g1_successors):
+                        self._add_node(self.separator.join(left[::-1] + (v, w) + right))
+
+    def _update_degrees_of_freedom(self):
+        # see HigherOrderNetwork.__init__: the number of paths of length k in the first-order network,
+        # minus the number of nodes at which at least one of them starts
+        k = self.order
+        if k == 0:
+            self.dof_paths = self.dof_ngrams = self.ncount() - 2
+            return
+        s = len(self._g1_index)
+        links = np.array(self._g1_links, dtype=np.int64).reshape(-1, 2)
+        B = sparse.csr_matrix((np.ones(len(links)), (links[:, 0], links[:, 1])), shape=(s, s))
+        r = np.ones(s)
+        for _ in range(k):
+            r = B @ r
+        self.dof_ngrams = (s ** k) * (s - 1)
+        self.dof_paths = r.sum() - np.count_nonzero(r)
+
+    def add_paths(self, other, update_paths=True):
+        """
+        Adds the statistics of paths of length k in other to the network.
+
+        Parameters:
+        -----------
+        other: Paths
+            the additional paths
+        update_paths: bool
+            if True (default), other is also added to the paths of the
+            network, i.e. self.paths += other. Pass False if other has
+            already been added to them.
+        """
+        if other is self.paths:
+            # a copy, since self.paths is changed below
+            other = other * 1
+        if update_paths:
+            self.paths += other
+        new_links = [(v, w) for v, w in other.paths[1] if self._add_first_order_link(v, w)]
+        for key, weight in other.paths[self.order].items():
+            if self.order == 0:
+                v, w = 'start', key[0]
+            else:
+                v, w = self.separator.join(key[:-1]), self.separator.join(key[1:])
+            self._add_weight(v, w, weight)
+        if new_links or self.order == 0:
+            if self.order > 1:
+                self._add_possible_nodes(new_links)
+            self._update_degrees_of_freedom()
+        return self
+
+    def scale(self, factor, update_paths=True):
+        """
+        Multiplies all link and node weights by factor.
+
+        Parameters:
+        -----------
+        factor: float
+            the scaling factor
+        update_paths: bool
+            if True (default), the paths of the network are scaled as well,
+            i.e. self.paths *= factor
+        """
+        if update_paths:
+            self.paths *= factor
+        for attr in self.edges.values():
+            attr['weight'] = attr['weight'] * factor
+        for attr in self.nodes.values():
+            attr['inweight'] = attr['inweight'] * factor
+            attr['outweight'] = attr['outweight'] * factor
+        if self._weights is not None:
+            self._matrices()
+            for W in self._weights[:2]:
+                W.data *= factor
+        return self
+
+    def __iadd__(self, other):
+        return self.add_paths(other)
+
+    def __imul__(self, factor):
+        return self.scale(factor)
+
+    def _matrices(self):
+        # weights of subpaths and longest paths and a matrix with ones for all links, rows are sources
+        n = self.ncount()
+        if self._weights is None:
+            self._index = self.node_to_name_map()
+            entries = [(self._index[v], self._index[w], attr['weight'][0], attr['weight'][1], 1.0)
+                       for (v, w), attr in self.edges.items()]
+            self._weights = [sparse.csr_matrix((n, n)) for _ in range(3)]
+            self._pending = entries
+        if self._pending:
+            rows, cols, *values = np.array(self._pending, dtype=np.float64).reshape(-1, 5).T
+            rows, cols = rows.astype(np.int64), cols.astype(np.int64)
+            for i, W in enumerate(self._weights):
+                W.resize((n, n))
+                self._weights[i] = (W + sparse.csr_matrix((values[i], (rows, cols)), shape=(n, n))).tocsr()
+            self._pending = []
+        else:
+            for W in self._weights:
+                W.resize((n, n))
+        return self._weights
+
+    def adjacency_matrix(self, include_subpaths=True, weighted=True, transposed=False):
+        """
+        Returns the adjacency matrix, like HigherOrderNetwork.adjacency_matrix,
+        from weight matrices that are updated with the network.
+        """
+        subpath, longest, links = self._matrices()
+        if not weighted:
+            A = links.copy()
+            A.data[:] = 1.0
+        elif include_subpaths:
+            A = subpath + longest
+        else:
+            A = longest.copy()
+        return A.T.tocsr() if transposed else A
+
+    def transition_matrix(self, include_subpaths=True):
+        """
+        Returns the transposed transition matrix, like
+        HigherOrderNetwork.transition_matrix, from weight matrices that are
+        updated with the network.
+        """
+        A = self.adjacency_matrix(include_subpaths)
+        A.eliminate_zeros()
+        out = np.asarray(A.sum(axis=1)).ravel()
+        inv = np.divide(1.0, out, out=np.zeros_like(out), where=out > 0)
+        return (sparse.diags(inv) @ A).T.tocsr()
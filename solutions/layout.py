@@ -0,0 +1,349 @@
+"""
+Force-directed layouts computed in Python. pp.visualisation.plot and
+export_html let the browser run a force simulation, which takes seconds
+to settle for networks like the US flights or tube higher-order networks.
+Here, a Fruchterman-Reingold layout with a vectorised Barnes-Hut style
+approximation of repulsive forces is computed once with numpy, cached
+per network, and embedded as fixed node positions in the exported HTML.
+"""
+import hashlib
+import json
+
+import numpy as np
+import pathpy as pp
+import scipy.sparse as sp
+
+from solutions import projection, templates
+
+
+# layouts by content hash of network, see layout
+_cache = {}
+
+
+def layout_edges(network, plot_higher_order_nodes=True):
+    """
+    Returns the nodes and weighted edges that determine the layout of a
+    network. For a HigherOrderNetwork that is plotted as a first-order
+    projection or a MultiOrderModel, the weights of higher-order links are
+    projected onto first-order nodes, as in pp.visualisation.plot.
+
+    Parameters:
+    -----------
+    network: Network, HigherOrderNetwork, MultiOrderModel
+        the network to lay out
+    plot_higher_order_nodes: bool
+        whether higher-order nodes are plotted or projected to first-order nodes
+
+    Returns:
+    --------
+    (nodes, sources, targets, weights) with node names, integer arrays and
+    weights normalised to [0, 1], see projection.force_weights
+    """
+    if hasattr(network, 'layers') or (isinstance(network, pp.HigherOrderNetwork) and not plot_higher_order_nodes):
+        nodes, A = projection.project(network)
+        A = projection.force_weights(A, directed=False).tocoo()
+    else:
+        nodes = list(network.nodes)
+        idx = {v: i for i, v in enumerate(nodes)}
+        m = len(network.edges)
+        A = sp.coo_matrix((np.fromiter((np.sum(a.get('weight', 1.0)) for a in network.edges.values()),
+                                       dtype=np.float64, count=m),
+                           (np.fromiter((idx[v] for v, _ in network.edges), dtype=np.int64, count=m),
+                            np.fromiter((idx[w] for _, w in network.edges), dtype=np.int64, count=m))),
+                          shape=(len(nodes), len(nodes)))
+        A = projection.force_weights(A, directed=network.directed).tocoo()
+    return nodes, A.row.astype(np.int64), A.col.astype(np.int64), A.data
+
+
+# maximum depth of the grid hierarchy, the finest grid has 4^10 cells
+_MAX_LEVELS = 10
+
+# offsets of the 6 x 6 child cells of the 3 x 3 cells around a parent cell
+_OFFSETS = np.array([(a, b) for a in range(6) for b in range(6)])
+
+
+def _repulsion(pos):
+    # Approximates the repulsive forces sum_j (p_i - p_j) / |p_i - p_j|^2 between all
+    # pairs of nodes. Nodes are assigned to grids of 2^L x 2^L cells for L = 2..levels.
+    # On each level, a node interacts with the centres of mass of those cells that are
+    # not adjacent to its own cell, but whose parent cells are adjacent to its parent.
+    # On the finest level, forces between nodes in adjacent cells are computed exactly.
+    n = len(pos)
+    force = np.zeros_like(pos)
+    lo = pos.min(axis=0)
+    extent = max((pos.max(axis=0) - lo).max(), 1e-9) * (1 + 1e-9)
+    unit = (pos - lo) / extent
+
+    # refine the finest grid until nodes in dense regions are separated
+    levels = int(np.clip(np.ceil(np.log(n) / np.log(4)), 2, _MAX_LEVELS))
+    while levels < _MAX_LEVELS:
+        cell = (unit * 2 ** levels).astype(np.int64)
+        _, count = np.unique(cell[:, 0] * 2 ** levels + cell[:, 1], return_counts=True)
+        if (count ** 2).sum() <= 4 * n:
+            break
+        levels += 1
+
+    for level in range(2, levels + 1):
+        size = 2 ** level
+        cell = np.minimum((unit * size).astype(np.int64), size - 1)
+        cell_id = cell[:, 0] * size + cell[:, 1]
+        mass = np.bincount(cell_id, minlength=size * size)
+        center = np.zeros((size * size, 2))
+        center[:, 0] = np.bincount(cell_id, weights=pos[:, 0], minlength=size * size)
+        center[:, 1] = np.bincount(cell_id, weights=pos[:, 1], minlength=size * size)
+        center[mass > 0] /= mass[mass > 0, None]
+        parent = cell // 2
+        x = 2 * parent[:, 0, None] - 2 + _OFFSETS[None, :, 0]
+        y = 2 * parent[:, 1, None] - 2 + _OFFSETS[None, :, 1]
+        ok = (x >= 0) & (x < size) & (y >= 0) & (y < size)
+        ok &= (np.abs(x - cell[:, 0, None]) > 1) | (np.abs(y - cell[:, 1, None]) > 1)
+        i = np.nonzero(ok)[0]
+        c = (x * size + y)[ok]
+        delta = pos[i] - center[c]
+        d2 = (delta ** 2).sum(axis=1) + 1e-9
+        f = delta * (mass[c] / d2)[:, None]
+        force[:, 0] += np.bincount(i, weights=f[:, 0], minlength=n)
+        force[:, 1] += np.bincount(i, weights=f[:, 1], minlength=n)
+
+    # exact forces between nodes in the same or adjacent cells on the finest level
+    size = 2 ** levels
+    cell = np.minimum((unit * size).astype(np.int64), size - 1)
+    cell_id = cell[:, 0] * size + cell[:, 1]
+    order = np.argsort(cell_id, kind='stable')
+    count = np.bincount(cell_id, minlength=size * size)
+    start = np.cumsum(count) - count
+    for a in (-1, 0, 1):
+        for b in (-1, 0, 1):
+            x, y = cell[:, 0] + a, cell[:, 1] + b
+            ok = (x >= 0) & (x < size) & (y >= 0) & (y < size)
+            c = np.where(ok, x * size + y, 0)
+            cnt = np.where(ok, count[c], 0)
+            i = np.repeat(np.arange(n), cnt)
+            within = np.arange(len(i)) - np.repeat(np.cumsum(cnt) - cnt, cnt)
+            j = order[np.repeat(start[c], cnt) + within]
+            keep = i != j
+            i, j = i[keep], j[keep]
+            delta = pos[i] - pos[j]
+            d2 = (delta ** 2).sum(axis=1) + 1e-9
+            f = delta / d2[:, None]
+            force[:, 0] += np.bincount(i, weights=f[:, 0], minlength=n)
+            force[:, 1] += np.bincount(i, weights=f[:, 1], minlength=n)
+    return force
+
+
+def force_layout(n, sources, targets, weights=None, iterations=200, gravity=0.05, seed=None):
+    """
+    Computes a Fruchterman-Reingold layout of n nodes, where repulsive forces
+    are approximated on a hierarchy of grids in O(n log n) per iteration.
+
+    Parameters:
+    -----------
+    n: int
+        number of nodes
+    sources: ndarray
+        source node index of each edge
+    targets: ndarray
+        target node index of each edge
+    weights: ndarray
+        edge weights, which scale attractive forces. Weights are normalised
+        by their mean. Default is None, i.e. all edges have the same weight.
+    iterations: int
+        number of iterations
+    gravity: float
+        strength of a force that pulls nodes to the centre and keeps
+        disconnected components together. The default 0.05 is just strong
+        enough for the latter; with gravity=1.0, larger networks such as
+        the tube network are compressed into a disc with two to three
+        times as many crossing links.
+    seed: int
+        seed of the random number generator for the initial positions
+
+    Returns:
+    --------
+    n x 2 array of node positions
+    """
+    rng = np.random.default_rng(seed)
+    side = np.sqrt(max(n, 1))
+    pos = rng.random((n, 2)) * side
+    if n < 2:
+        return pos
+    if weights is None or len(weights) == 0:
+        weights = np.ones(len(sources))
+    weights = weights / weights.mean()
+
+    temperature = side / 10.0
+    for it in range(iterations):
+        force = _repulsion(pos)
+
+        # attraction d^2 along edges, i.e. a force of magnitude |delta| * delta
+        delta = pos[targets] - pos[sources]
+        dist = np.sqrt((delta ** 2).sum(axis=1))
+        f = delta * (dist * weights)[:, None]
+        for dim in range(2):
+            force[:, dim] += np.bincount(sources, weights=f[:, dim], minlength=n)
+            force[:, dim] -= np.bincount(targets, weights=f[:, dim], minlength=n)
+        force -= gravity * (pos - pos.mean(axis=0))
+
+        # move nodes by at most the current temperature
+        length = np.sqrt((force ** 2).sum(axis=1)) + 1e-9
+        pos += force / length[:, None] * np.minimum(length, temperature)[:, None]
+        temperature = side / 10.0 * (1 - (it + 1) / iterations) + 1e-3
+    return pos
+
+
+def layout(network, plot_higher_order_nodes=True, iterations=200, gravity=0.05, seed=0, use_cache=True):
+    """
+    Returns a force-directed layout of a (higher-order) network, which is
+    computed once and cached based on the nodes, edges and weights of the
+    network and the layout parameters.
+
+    Parameters:
+    -----------
+    network: Network, HigherOrderNetwork, MultiOrderModel
+        the network to lay out
+    plot_higher_order_nodes: bool
+        whether to lay out higher-order nodes or their first-order projection
+    iterations: int
+        number of iterations of the layout algorithm
+    gravity: float
+        strength of the force that keeps disconnected components together,
+        see force_layout
+    seed: int
+        seed of the random number generator
+    use_cache: bool
+        whether or not to use and update the cache
+
+    Returns:
+    --------
+    dict mapping nodes to (x, y) positions
+    """
+    nodes, sources, targets, weights = layout_edges(network, plot_higher_order_nodes)
+    h = hashlib.sha1(json.dumps([nodes, iterations, gravity, seed]).encode())
+    for a in (sources, targets, weights):
+        h.update(a.tobytes())
+    key = h.hexdigest()
+    if not use_cache or key not in _cache:
+        pos = force_layout(len(nodes), sources, targets, weights, iterations=iterations, gravity=gravity, seed=seed)
+        _cache[key] = {v: tuple(pos[i]) for i, v in enumerate(nodes)}
+    return _cache[key]
+
+
+def scale_layout(positions, width, height, margin=20):
+    """
+    Scales and translates a layout to fit into a box of the given width
+    and height, preserving the aspect ratio.
+
+    Parameters:
+    -----------
+    positions: dict
+        mapping from nodes to (x, y) positions
+    width: int
+        width of the box
+    height: int
+        height of the box
+    margin: int
+        distance of nodes from the border of the box
+    """
+    if not positions:
+        return {}
+    pos = np.array(list(positions.values()), dtype=np.float64)
+    lo, hi = pos.min(axis=0), pos.max(axis=0)
+    scale = min((width - 2 * margin) / max(hi[0] - lo[0], 1e-9),
+                (height - 2 * margin) / max(hi[1] - lo[1], 1e-9))
+    offset = np.array([width, height]) / 2 - (lo + hi) / 2 * scale
+    pos = pos * scale + offset
+    return {v: (float(pos[i, 0]), float(pos[i, 1])) for i, v in enumerate(positions)}
+
+
+def network_data(network, positions, **params):
+    """
+    Returns the network data of pp.visualisation.plot for a (higher-order)
+    network, where the position of each node is fixed. Since no node moves,
+    the invisible links that pathpy adds to model higher-order forces are
+    omitted.
+
+    Parameters:
+    -----------
+    network: Network, HigherOrderNetwork, MultiOrderModel
+        the network to visualise
+    positions: dict
+        node positions, which are scaled to the width and height of the plot
+    params: dict
+        visualisation parameters, see pp.visualisation.plot
+    """
+    plot_higher_order_nodes = params.get('plot_higher_order_nodes', True)
+    if hasattr(network, 'layers') or (isinstance(network, pp.HigherOrderNetwork) and not plot_higher_order_nodes):
+        data = projection.network_data(network, max_edges=0, **params)
+    else:
+        data = {'links': [{'source': templates.fix_node_name(v),
+                           'target': templates.fix_node_name(w),
+                           'color': templates.get_attr(params, (v, w), 'edge_color', '#999999'),
+                           'width': templates.get_attr(params, (v, w), 'edge_width', 0.5),
+                           'weight': 0.0} for v, w in network.edges],
+                'nodes': [{'id': templates.fix_node_name(v),
+                           'text': templates.get_attr(params, v, 'node_text', templates.fix_node_name(v)),
+                           'color': templates.get_attr(params, v, 'node_color', '#99ccff'),
+                           'size': templates.get_attr(params, v, 'node_size', 5.0)} for v in network.nodes]}
+
+    width, height = params.get('width', 400), params.get('height', 400)
+    positions = scale_layout(positions, width, height)
+    positions = {templates.fix_node_name(v): p for v, p in positions.items()}
+    for node in data['nodes']:
+        x, y = positions.get(node['id'], (width / 2, height / 2))
+        node['x'], node['y'], node['fx'], node['fy'] = x, y, x, y
+    data['links'] = [l for l in data['links'] if l['width'] > 0]
+    return data
+
+
+def generate_html(network, positions=None, **params):
+    """
+    Generates the same HTML as pp.visualisation.generate_html for a
+    (higher-order) network, but with fixed node positions, so that the
+    browser does not need to run a force simulation.
+
+    Parameters:
+    -----------
+    network: Network, HigherOrderNetwork, MultiOrderModel
+        the network to visualise
+    positions: dict
+        node positions, e.g. returned by layout. If None (default), the
+        cached layout of the network is used.
+    params: dict
+        visualisation parameters, see pp.visualisation.plot
+    """
+    plot_higher_order_nodes = params.get('plot_higher_order_nodes', True)
+    if hasattr(network, 'layers'):
+        plot_higher_order_nodes = False
+    if positions is None:
+        positions = layout(network, plot_higher_order_nodes)
+    params['network_data'] = json.dumps(network_data(network, positions, **params))
+
+    # pathpy fills in default parameters and the (cached) template, the network_data
+    # parameter overrides the (empty) JSON data generated by pathpy
+    directed = network.layers[1].directed if hasattr(network, 'layers') else network.directed
+    return templates.generate_html(pp.Network(directed=directed), **params)
+
+
+def export_html(network, filename, positions=None, **params):
+    """
+    Exports a stand-alone HTML file with a visualisation of a (higher-order)
+    network with precomputed node positions. Counterpart of
+    pp.visualisation.export_html.
+
+    Parameters:
+    -----------
+    network: Network, HigherOrderNetwork, MultiOrderModel
+        the network to visualise
+    filename: str
+        path where the HTML file will be saved
+    positions: dict
+        node positions, e.g. returned by layout. If None (default), a cached
+        layout is computed.
+    params: dict
+        visualisation parameters, see pp.visualisation.plot
+    """
+    html = generate_html(network, positions, **params)
+    if 'template' not in params:
+        html = '<!DOCTYPE html>\n<html><body>\n' + html + '</body>\n</html>'
+    with open(filename, 'w+') as f:
+        f.write(html)
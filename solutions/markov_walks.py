@@ -0,0 +1,184 @@
+"""
+Batched random walks on higher-order networks. Transition probabilities
+of all nodes are turned into alias tables once, so that each step of all
+walkers can be sampled in constant time with two uniform random numbers
+per walker. This allows Monte Carlo estimates of visitation probabilities
+or diffusion speed based on millions of k-th order Markov walks.
+"""
+from collections import defaultdict
+
+import numpy as np
+
+from solutions import sparse_spectral
+
+
+class AliasTable:
+    """
+    Alias tables of the transition probabilities of all nodes of a
+    (higher-order) network, stored in the CSR layout of its weight matrix.
+    For node i, entries ptr[i]:ptr[i+1] hold the acceptance probabilities,
+    the primary targets and the alias targets of its outgoing links.
+    """
+
+    def __init__(self, network, include_subpaths=True):
+        """
+        Parameters:
+        -----------
+        network: HigherOrderNetwork
+            network whose link weights define the transition probabilities
+        include_subpaths: bool
+            whether or not to include subpath statistics in the link weights,
+            as in HigherOrderNetwork.transition_matrix
+        """
+        A = sparse_spectral.weight_matrix(network, include_subpaths)
+        A.sort_indices()
+        self.network = network
+        self.nodes = list(network.node_to_name_map().keys())
+        self.ptr = A.indptr.astype(np.int64)
+        self.degree = np.diff(self.ptr)
+        self.target = A.indices.astype(np.int64)
+        self.prob = np.ones(len(A.data))
+        self.alias = self.target.copy()
+
+        # Vose's alias method for each node
+        for i in np.flatnonzero(self.degree > 1):
+            start, end = self.ptr[i], self.ptr[i + 1]
+            w = A.data[start:end]
+            q = w * (len(w) / w.sum())
+            small = [j for j in range(len(q)) if q[j] < 1.0]
+            large = [j for j in range(len(q)) if q[j] >= 1.0]
+            while small and large:
+                s, l = small.pop(), large.pop()
+                self.prob[start + s] = q[s]
+                self.alias[start + s] = self.target[start + l]
+                q[l] -= 1.0 - q[s]
+                (small if q[l] < 1.0 else large).append(l)
+
+    def sample(self, nodes, rng):
+        """
+        Samples one transition for each of the given node indices. Returns
+        the indices of the next nodes, or -1 for nodes without outgoing links.
+
+        Parameters:
+        -----------
+        nodes: ndarray
+            integer node indices
+        rng: numpy.random.Generator
+            random number generator
+        """
+        deg = self.degree[nodes]
+        nxt = np.full(len(nodes), -1, dtype=np.int64)
+        ok = deg > 0
+        slot = self.ptr[nodes[ok]] + (rng.random(ok.sum()) * deg[ok]).astype(np.int64)
+        accept = rng.random(len(slot)) < self.prob[slot]
+        nxt[ok] = np.where(accept, self.target[slot], self.alias[slot])
+        return nxt
+
+
+def generate_walks(network, num_walks, l=100, start_nodes=None, seed=None,
+                   include_subpaths=True, order=None, as_arrays=False):
+    """
+    Generates many random walks in a higher-order network at once. Each walk
+    is a sequence of higher-order nodes, where transitions are sampled with
+    the probabilities of HigherOrderNetwork.transition_matrix. A walk ends
+    after l steps or in a node without outgoing links.
+
+    Parameters:
+    -----------
+    network: HigherOrderNetwork, MultiOrderModel, AliasTable
+        the model in which walks are generated. For a MultiOrderModel, the
+        layer given by order is used. Pass an AliasTable to reuse the tables
+        for multiple batches.
+    num_walks: int
+        number of walks to generate
+    l: int
+        (maximum) number of steps of each walk
+    start_nodes: list
+        (higher-order) start node of each walk. Default is None, in which
+        case start nodes are chosen uniformly at random.
+    seed: int
+        seed of the random number generator
+    include_subpaths: bool
+        whether or not to include subpath statistics in the link weights
+    order: int
+        layer of a MultiOrderModel to use, default is its maximum order
+    as_arrays: bool
+        if False (default), walks are returned as lists of first-order nodes
+        in the same format as pp.algorithms.random_walk.generate_walk. If
+        True, an integer array of shape num_walks x (l+1) with the indices
+        (see AliasTable.nodes) of the visited higher-order nodes is
+        returned, padded with -1 after the end of a walk.
+    """
+    if isinstance(network, AliasTable):
+        table = network
+    else:
+        if hasattr(network, 'layers'):
+            network = network.layers[network.max_order if order is None else order]
+        table = AliasTable(network, include_subpaths)
+    rng = np.random.default_rng(seed)
+
+    walks = np.full((num_walks, l + 1), -1, dtype=np.int64)
+    if start_nodes is None:
+        walks[:, 0] = rng.integers(len(table.nodes), size=num_walks)
+    else:
+        node_idx = {v: i for i, v in enumerate(table.nodes)}
+        walks[:, 0] = [node_idx[v] for v in start_nodes]
+
+    active = np.arange(num_walks)
+    for step in range(1, l + 1):
+        nxt = table.sample(walks[active, step - 1], rng)
+        moving = nxt >= 0
+        active = active[moving]
+        if len(active) == 0:
+            break
+        walks[active, step] = nxt[moving]
+
+    if as_arrays:
+        return walks
+    return [to_path(table, w) for w in walks]
+
+
+def to_path(table, walk):
+    """
+    Converts an integer walk array into the corresponding path of
+    first-order nodes, i.e. the path of the first higher-order node,
+    followed by the last first-order node of each subsequent node.
+
+    Parameters:
+    -----------
+    table: AliasTable
+        the alias table used to generate the walk
+    walk: ndarray
+        one row of the array returned by generate_walks
+    """
+    walk = walk[walk >= 0]
+    hon = table.network
+    path = list(hon.higher_order_node_to_path(table.nodes[walk[0]]))
+    for i in walk[1:]:
+        path.append(hon.higher_order_node_to_path(table.nodes[i])[-1])
+    return path
+
+
+def visitation_frequencies(table, walks, burn_in=0):
+    """
+    Monte Carlo estimate of the visitation probabilities of first-order
+    nodes, based on the fraction of steps in which walkers are in a
+    higher-order node ending in a given first-order node.
+
+    Parameters:
+    -----------
+    table: AliasTable
+        the alias table used to generate the walks
+    walks: ndarray
+        array returned by generate_walks with as_arrays=True
+    burn_in: int
+        number of initial steps of each walk that are ignored
+    """
+    visits = walks[:, burn_in:]
+    counts = np.bincount(visits[visits >= 0], minlength=len(table.nodes))
+    total = counts.sum()
+    freq = defaultdict(float)
+    for i, v in enumerate(table.nodes):
+        if counts[i] > 0:
+            freq[table.network.higher_order_node_to_path(v)[-1]] += counts[i] / total
+    return dict(freq)
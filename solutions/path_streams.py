@@ -0,0 +1,143 @@
+"""
+Single-pass node statistics for path data that is too large to be
+held in a pathpy.Paths object. Paths are streamed from n-gram files
+or any iterable of (path, frequency) tuples, e.g. a generator of
+causal paths, and node counts are accumulated in a numpy array.
+"""
+import numpy as np
+
+
+def read_ngram(file, separator=',', frequency=False, max_ngram_length=None):
+    """
+    Lazily reads an n-gram file line by line and yields one path at a
+    time, using the same parsing rules as pp.Paths.read_file.
+
+    Parameters:
+    -----------
+    file: str
+        filename of the n-gram file
+    separator: str
+        character used to separate nodes on a path
+    frequency: bool
+        if True, the last field of each line is interpreted as the
+        frequency of the path. If False (default), each line counts once.
+    max_ngram_length: int
+        if given, longer n-grams are cut after this number of nodes
+
+    Yields:
+    -------
+    (tuple, float) pairs of node tuples and path frequencies
+    """
+    with open(file, 'r') as f:
+        for line in f:
+            fields = line.rstrip().split(separator)
+            freq = 1
+            if frequency:
+                freq = float(fields[-1])
+                fields = fields[:-1]
+                if freq <= 0:
+                    continue
+            path = tuple(v.strip() for v in fields if v.strip())
+            if not path:
+                continue
+            if max_ngram_length is not None:
+                path = path[:max_ngram_length]
+            yield path, freq
+
+
+def _as_weighted(paths, weighted):
+    # (path, frequency) pairs, or plain node sequences that count once
+    if weighted:
+        for path, freq in paths:
+            yield tuple(path), freq
+    else:
+        for path in paths:
+            yield tuple(path), 1
+
+
+def node_traversals(paths, node_index=None, weighted=True, dtype=np.float64, chunk_size=1000000):
+    """
+    Counts the number of times paths traverse each node in a single pass
+    over a stream of paths. For paths read with subpath expansion, the
+    result is identical to pp.algorithms.centralities.node_traversals, but
+    no Paths object needs to be built.
+
+    Parameters:
+    -----------
+    paths: iterable
+        stream of paths, either as (path, frequency) tuples, e.g. the
+        generator returned by read_ngram, or as node sequences
+    node_index: dict
+        optional mapping from node names to integer indices. Nodes that are
+        not in the mapping are appended, i.e. the dict is updated in place.
+    weighted: bool
+        if True (default), paths are (path, frequency) tuples, otherwise
+        node sequences that count once each
+    dtype: numpy dtype
+        type of the count array. The default float64 keeps fractional
+        frequencies, e.g. of n-gram files read with frequency=True or of
+        scaled paths. With an integer type, frequencies are truncated.
+    chunk_size: int
+        number of node visits that are buffered before they are added to
+        the count array
+
+    Returns:
+    --------
+    (counts, node_index) where counts[node_index[v]] is the number of
+    traversals of node v
+    """
+    if node_index is None:
+        node_index = {}
+    counts = np.zeros(len(node_index), dtype=dtype)
+    ids = []
+    weights = []
+
+    def flush(counts):
+        if not ids:
+            return counts
+        if len(node_index) > len(counts):
+            counts = np.concatenate([counts, np.zeros(len(node_index) - len(counts), dtype=dtype)])
+        counts += np.bincount(ids, weights=weights, minlength=len(counts)).astype(dtype)
+        del ids[:]
+        del weights[:]
+        return counts
+
+    for path, freq in _as_weighted(paths, weighted):
+        for v in path:
+            i = node_index.get(v)
+            if i is None:
+                i = len(node_index)
+                node_index[v] = i
+            ids.append(i)
+            weights.append(freq)
+        if len(ids) >= chunk_size:
+            counts = flush(counts)
+    counts = flush(counts)
+    return counts, node_index
+
+
+def visitation_probabilities(paths, node_index=None, weighted=True):
+    """
+    Streaming counterpart of pp.algorithms.centralities.visitation_probabilities,
+    which returns the fraction of all node traversals that fall on each node.
+
+    Parameters:
+    -----------
+    paths: iterable
+        stream of paths, either as (path, frequency) tuples or as node
+        sequences
+    node_index: dict
+        optional mapping from node names to integer indices
+    weighted: bool
+        if True (default), paths are (path, frequency) tuples, otherwise
+        node sequences that count once each
+
+    Returns:
+    --------
+    dict mapping node names to visitation probabilities
+    """
+    counts, node_index = node_traversals(paths, node_index, weighted)
+    total = counts.sum()
+    if total > 0:
+        counts = counts / total
+    return {v: float(counts[i]) for v, i in node_index.items()}
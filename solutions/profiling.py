@@ -0,0 +1,269 @@
+"""
+Profiling hooks for the path-analysis pipeline of 7_optimal_analysis.
+Stages are timed with the stage context manager, events are counted with
+count, and the peak memory allocated by Python during each stage is
+tracked with tracemalloc. All hooks do nothing until profiling is switched
+on with enable, which also wraps the pathpy functions of the pipeline
+(SQLite loading, filter_edges, causal path extraction, MultiOrderModel
+construction, estimate_order and pagerank) in stages. At the end of a run,
+a report is written as JSON and printed as a text summary.
+
+    from solutions import profiling
+    profiling.enable(report='profile.json')
+
+Setting the environment variable PATHPY_PROFILE to a file name enables
+profiling when this module is imported.
+"""
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import pathpy as pp
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+ENABLED = False
+
+# statistics by stage name, see stage
+_stages = {}
+
+# counters by name, see count
+_counters = {}
+
+# running peak memory of the enclosing stages
+_stack = []
+
+# (owner, attribute, stage name) of the functions wrapped by instrument
+_patched = []
+
+# whether tracemalloc was started by enable, rather than by the caller
+_started_tracing = False
+
+
+def _targets():
+    # functions of the pipeline that are wrapped in stages, as (owner, attribute, stage name)
+    from solutions import sqlite_source, validation_harness
+    from pathpy.path_extraction import temporal_paths
+    return [
+        (pp.TemporalNetwork, 'from_sqlite', 'load.from_sqlite'),
+        (sqlite_source.SQLiteSource, 'tedges', 'load.sqlite_source'),
+        (pp.Paths, 'read_file', 'load.read_file'),
+        (pp.TemporalNetwork, 'filter_edges', 'filter_edges'),
+        (pp.path_extraction, 'sample_paths_from_temporal_network_dag', 'extract.sample_paths'),
+        (temporal_paths, 'sample_paths_from_temporal_network_dag', 'extract.sample_paths'),
+        (pp.path_extraction, 'paths_from_temporal_network_dag', 'extract.paths_from_dag'),
+        (validation_harness, 'sample_causal_paths', 'extract.sample_paths'),
+        (pp.MultiOrderModel, '__init__', 'model.multi_order'),
+        (pp.MultiOrderModel, 'estimate_order', 'model.estimate_order'),
+        (pp.algorithms.centralities, 'pagerank', 'centrality.pagerank'),
+        (validation_harness, 'pagerank', 'centrality.pagerank'),
+    ]
+
+
+@contextlib.contextmanager
+def stage(name):
+    """
+    Context manager that adds the wall-clock time, the number of calls and
+    the peak memory allocated by Python to the statistics of a stage.
+    Nested stages are included in the statistics of their enclosing stage.
+    """
+    if not ENABLED:
+        yield
+        return
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        current, peak = tracemalloc.get_traced_memory()
+        if _stack:
+            _stack[-1][1] = max(_stack[-1][1], peak)
+        tracemalloc.reset_peak()
+    _stack.append([current if tracing else 0, 0])
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        base, running = _stack.pop()
+        s = _stages.setdefault(name, {'calls': 0, 'total_s': 0.0, 'max_s': 0.0, 'peak_mb': 0.0})
+        s['calls'] += 1
+        s['total_s'] += elapsed
+        s['max_s'] = max(s['max_s'], elapsed)
+        if tracing:
+            peak = max(running, tracemalloc.get_traced_memory()[1])
+            s['peak_mb'] = max(s['peak_mb'], (peak - base) / 2 ** 20)
+            if _stack:
+                _stack[-1][1] = max(_stack[-1][1], peak)
+            tracemalloc.reset_peak()
+
+
+def count(name, n=1):
+    """
+    Adds n to a counter, e.g. the number of links loaded or paths extracted.
+    """
+    if ENABLED:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def timed(name):
+    """
+    Decorator that runs a function in a stage with the given name.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        wrapper.__wrapped_stage__ = func
+        return wrapper
+    return decorator
+
+
+def _count_result(name, result):
+    # counters for the results of wrapped pathpy functions
+    if isinstance(result, pp.TemporalNetwork):
+        count(name + '.links', len(result.tedges))
+    elif isinstance(result, list):
+        count(name + '.links', len(result))
+    elif isinstance(result, pp.Paths):
+        count(name + '.paths', int(result.observation_count))
+
+
+def instrument():
+    """
+    Wraps the functions of the pipeline in stages, see _targets. Calling
+    instrument more than once has no further effect.
+    """
+    if _patched:
+        return
+    for owner, attr, name in _targets():
+        raw = owner.__dict__.get(attr) if isinstance(owner, type) else getattr(owner, attr)
+        func = raw.__func__ if isinstance(raw, (classmethod, staticmethod)) else raw
+
+        def wrapper(*args, _func=func, _name=name, **kwargs):
+            with stage(_name):
+                result = _func(*args, **kwargs)
+            _count_result(_name, result)
+            return result
+        functools.update_wrapper(wrapper, func)
+        setattr(owner, attr, type(raw)(wrapper) if isinstance(raw, (classmethod, staticmethod)) else wrapper)
+        _patched.append((owner, attr, raw))
+
+
+def uninstrument():
+    """
+    Restores the functions wrapped by instrument.
+    """
+    while _patched:
+        owner, attr, raw = _patched.pop()
+        setattr(owner, attr, raw)
+
+
+def enable(memory=True, report=None, patch=True):
+    """
+    Switches profiling on.
+
+    Parameters:
+    -----------
+    memory: bool
+        if True (default), the peak memory of each stage is tracked with
+        tracemalloc, which slows down Python code considerably
+    report: str
+        if given, the report is written to this JSON file and printed as a
+        text summary when the interpreter exits
+    patch: bool
+        if True (default), the pathpy functions of the pipeline are wrapped
+        in stages, see instrument
+    """
+    global ENABLED, _started_tracing
+    ENABLED = True
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracing = True
+    if patch:
+        instrument()
+    if report is not None:
+        atexit.register(_dump, report)
+
+
+def disable():
+    """
+    Switches profiling off and restores the wrapped pathpy functions.
+    tracemalloc is only stopped if it was started by enable. Statistics
+    collected so far are kept, see reset.
+    """
+    global ENABLED, _started_tracing
+    ENABLED = False
+    uninstrument()
+    if _started_tracing:
+        tracemalloc.stop()
+        _started_tracing = False
+
+
+def reset():
+    """
+    Clears all statistics and counters.
+    """
+    _stages.clear()
+    _counters.clear()
+
+
+def report():
+    """
+    Returns the statistics of all stages, the counters and the maximum
+    resident memory of the process as a dict.
+    """
+    stages = {}
+    for name, s in _stages.items():
+        stages[name] = dict(s, mean_s=s['total_s'] / s['calls'])
+        if not tracemalloc.is_tracing() and s['peak_mb'] == 0:
+            stages[name]['peak_mb'] = None
+    rss = None
+    if resource is not None:
+        # kilobytes on Linux, bytes on macOS
+        scale = 2 ** 20 if sys.platform == 'darwin' else 2 ** 10
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    return {'stages': stages, 'counters': dict(_counters), 'max_rss_mb': rss}
+
+
+def summary(rep=None):
+    """
+    Formats a report as a plain text table, with stages sorted by total time.
+    """
+    rep = report() if rep is None else rep
+    lines = ['{0:<32} {1:>6} {2:>10} {3:>10} {4:>10} {5:>10}'.format(
+        'stage', 'calls', 'total_s', 'mean_s', 'max_s', 'peak_mb')]
+    for name, s in sorted(rep['stages'].items(), key=lambda x: -x[1]['total_s']):
+        peak = '' if s['peak_mb'] is None else '{0:.1f}'.format(s['peak_mb'])
+        lines.append('{0:<32} {1:>6} {2:>10.3f} {3:>10.3f} {4:>10.3f} {5:>10}'.format(
+            name, s['calls'], s['total_s'], s['mean_s'], s['max_s'], peak))
+    for name, n in sorted(rep['counters'].items()):
+        lines.append('{0:<32} {1:>6}'.format(name, n))
+    if rep['max_rss_mb'] is not None:
+        lines.append('max resident memory: {0:.1f} MB'.format(rep['max_rss_mb']))
+    return '\n'.join(lines)
+
+
+def write_report(file):
+    """
+    Writes the report to a JSON file and returns it.
+    """
+    rep = report()
+    with open(file, 'w') as f:
+        json.dump(rep, f, indent=2)
+    return rep
+
+
+def _dump(file):
+    print(summary(write_report(file)))
+
+
+if os.environ.get('PATHPY_PROFILE'):
+    enable(report=os.environ['PATHPY_PROFILE'])
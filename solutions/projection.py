@@ -0,0 +1,223 @@
+"""
+Level-of-detail projections of higher-order networks onto first-order
+nodes. With plot_higher_order_nodes=False, pp.visualisation.plot adds one
+invisible link per pair of first-order nodes that are connected by a
+higher-order link, which it aggregates edge by edge in a Network object.
+For third-order models of real data, this yields HTML with tens of
+thousands of links that the browser has to simulate. Here, the projection
+is aggregated once into a sparse matrix and can be pruned to the strongest
+links within a given edge budget.
+"""
+import json
+
+import numpy as np
+import pathpy as pp
+import scipy.sparse as sp
+
+from solutions import templates
+
+
+def _layers(network):
+    # higher-order layers whose links are projected, as in pp.visualisation.plot
+    if hasattr(network, 'layers'):
+        return [network.layers[l] for l in range(1, network.max_order + 1)]
+    return [network]
+
+
+def project(network, nodes=None):
+    """
+    Aggregates the weights of all higher-order links (a-...-b, b-...-c)
+    onto the first-order pairs (a, c), i.e. the first node of the source and
+    the last node of the target of each link. For a MultiOrderModel, links of
+    all layers are aggregated.
+
+    Parameters:
+    -----------
+    network: HigherOrderNetwork, MultiOrderModel
+        the model to project
+    nodes: list
+        first-order nodes that define the rows and columns of the matrix.
+        Default is None, i.e. all first-order nodes of the model in sorted order.
+
+    Returns:
+    --------
+    (nodes, A), where A is a sparse CSR matrix with the total weight of
+    higher-order links projected onto each pair of first-order nodes
+    """
+    layers = _layers(network)
+    if nodes is None:
+        nodes = sorted(set().union(*(hon.first_order_nodes() for hon in layers)))
+    idx = {v: i for i, v in enumerate(nodes)}
+    rows, cols, weights = [], [], []
+    for hon in layers:
+        names = list(hon.nodes)
+        ho_idx = {v: i for i, v in enumerate(names)}
+        first = np.array([idx[hon.higher_order_node_to_path(v)[0]] for v in names], dtype=np.int64)
+        last = np.array([idx[hon.higher_order_node_to_path(v)[-1]] for v in names], dtype=np.int64)
+        m = len(hon.edges)
+        src = np.fromiter((ho_idx[v] for v, _ in hon.edges), dtype=np.int64, count=m)
+        tgt = np.fromiter((ho_idx[w] for _, w in hon.edges), dtype=np.int64, count=m)
+        rows.append(first[src])
+        cols.append(last[tgt])
+        weights.append(np.fromiter((np.sum(a['weight']) for a in hon.edges.values()), dtype=np.float64, count=m))
+    A = sp.coo_matrix((np.concatenate(weights), (np.concatenate(rows), np.concatenate(cols))),
+                      shape=(len(nodes), len(nodes)))
+    return nodes, A.tocsr()
+
+
+def force_weights(A, directed=True):
+    """
+    Normalises the weight of each link (v, w) by the smaller total
+    (in + out) weight of v and w, like the force weights computed by
+    pp.visualisation.plot.
+
+    Parameters:
+    -----------
+    A: sparse matrix
+        weighted adjacency matrix
+    directed: bool
+        if False, links (v, w) and (w, v) are merged into a single link
+        stored in the upper triangle, as in the undirected network of
+        higher-order forces that pathpy uses for plot_higher_order_nodes=False
+    """
+    A = sp.csr_matrix(A)
+    if directed:
+        A = A.tocoo()
+        strength = np.asarray(A.sum(axis=0)).ravel() + np.asarray(A.sum(axis=1)).ravel()
+    else:
+        A = sp.triu(A + A.T - sp.diags(A.diagonal())).tocoo()
+        strength = 2 * (np.bincount(A.row, A.data, A.shape[0]) + np.bincount(A.col, A.data, A.shape[0])
+                        - np.bincount(A.row[A.row == A.col], A.data[A.row == A.col], A.shape[0]))
+    s = np.minimum(strength[A.row], strength[A.col])
+    data = np.divide(A.data, s, out=np.zeros_like(A.data, dtype=np.float64), where=s > 0)
+    return sp.csr_matrix((data, (A.row, A.col)), shape=A.shape)
+
+
+def prune(A, max_edges, keep_strongest=True):
+    """
+    Keeps the max_edges links with the largest weights.
+
+    Parameters:
+    -----------
+    A: sparse matrix
+        weighted adjacency matrix
+    max_edges: int
+        maximum number of links to keep
+    keep_strongest: bool
+        if True (default), the strongest outgoing link of each node is kept
+        first, so that pruning does not detach nodes from the layout (as long
+        as max_edges is at least the number of nodes with outgoing links)
+    """
+    A = A.tocoo()
+    if A.nnz <= max_edges:
+        return A.tocsr()
+    # sort links by decreasing weight, with the strongest link of each node first
+    order = np.argsort(-A.data, kind='stable')
+    if keep_strongest:
+        by_row = np.lexsort((-A.data, A.row))
+        first = np.ones(A.nnz, dtype=bool)
+        first[1:] = A.row[by_row][1:] != A.row[by_row][:-1]
+        rank = np.zeros(A.nnz, dtype=np.int64)
+        rank[by_row[first]] = -1
+        order = np.lexsort((-A.data, rank))
+    keep = order[:max_edges]
+    return sp.csr_matrix((A.data[keep], (A.row[keep], A.col[keep])), shape=A.shape)
+
+
+def network_data(network, max_edges=None, **params):
+    """
+    Returns the network data of pp.visualisation.plot for a higher-order
+    network or multi-order model with plot_higher_order_nodes=False. Visible
+    links are those of the first-order network, the projected higher-order
+    links determine the forces between nodes. Forces are attached to the
+    visible link between two nodes where possible, and to invisible links
+    otherwise.
+
+    Parameters:
+    -----------
+    network: HigherOrderNetwork, MultiOrderModel
+        the model to visualise
+    max_edges: int
+        maximum number of projected links that exert forces, see prune.
+        Visible first-order links are always shown. Default is None, i.e.
+        all projected links are kept.
+    params: dict
+        visualisation parameters, see pp.visualisation.plot
+    """
+    if hasattr(network, 'layers'):
+        first_order = network.layers[1]
+    else:
+        first_order = pp.Network.from_paths(network.paths)
+    nodes = list(first_order.nodes)
+    nodes, A = project(network, nodes)
+    A = force_weights(A, directed=False)
+    if max_edges is not None:
+        A = prune(A, max_edges)
+    A = A.tocoo()
+
+    idx = {v: i for i, v in enumerate(nodes)}
+    forces = {(int(i), int(j)): w for i, j, w in zip(A.row, A.col, A.data)}
+    data = {'links': [], 'nodes': []}
+    for v, w in first_order.edges:
+        data['links'].append({'source': templates.fix_node_name(v),
+                              'target': templates.fix_node_name(w),
+                              'color': templates.get_attr(params, (v, w), 'edge_color', '#999999'),
+                              'width': templates.get_attr(params, (v, w), 'edge_width', 0.5),
+                              'weight': forces.pop((min(idx[v], idx[w]), max(idx[v], idx[w])), 0.0)})
+    # invisible links for the remaining forces
+    for (i, j), w in forces.items():
+        data['links'].append({'source': templates.fix_node_name(nodes[i]),
+                              'target': templates.fix_node_name(nodes[j]),
+                              'color': '#999999', 'width': 0.0, 'weight': w})
+
+    for v in nodes:
+        data['nodes'].append({'id': templates.fix_node_name(v),
+                              'text': templates.get_attr(params, v, 'node_text', templates.fix_node_name(v)),
+                              'color': templates.get_attr(params, v, 'node_color', '#99ccff'),
+                              'size': templates.get_attr(params, v, 'node_size', 5.0)})
+    return data
+
+
+def generate_html(network, max_edges=None, **params):
+    """
+    Generates the HTML of pp.visualisation.plot for a higher-order network
+    or multi-order model with plot_higher_order_nodes=False, based on a
+    projection that is computed once and optionally pruned. For fixed node
+    positions, see layout.generate_html.
+
+    Parameters:
+    -----------
+    network: HigherOrderNetwork, MultiOrderModel
+        the model to visualise
+    max_edges: int
+        maximum number of projected links, see prune
+    params: dict
+        visualisation parameters, see pp.visualisation.plot
+    """
+    params['network_data'] = json.dumps(network_data(network, max_edges, **params))
+    params['plot_higher_order_nodes'] = True
+    return templates.generate_html(pp.Network(directed=_layers(network)[0].directed), **params)
+
+
+def export_html(network, filename, max_edges=None, **params):
+    """
+    Exports a stand-alone HTML file with a projection of a higher-order
+    network or multi-order model. Counterpart of pp.visualisation.export_html
+    with plot_higher_order_nodes=False.
+
+    Parameters:
+    -----------
+    network: HigherOrderNetwork, MultiOrderModel
+        the model to visualise
+    filename: str
+        path where the HTML file will be saved
+    max_edges: int
+        maximum number of projected links, see prune
+    params: dict
+        visualisation parameters, see pp.visualisation.plot
+    """
+    html = generate_html(network, max_edges, **params)
+    if 'template' not in params:
+        html = '<!DOCTYPE html>\n<html><body>\n' + html + '</body>\n</html>'
+    with open(filename, 'w+') as f:
+        f.write(html)
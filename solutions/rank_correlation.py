@@ -0,0 +1,189 @@
+"""
+Fast rank correlations between centralities and ground truth. The helper
+kendalltau in 7_optimal_analysis intersects the keys of two dicts and
+builds lists of their values for every order and data set. Here, nodes are
+mapped to a shared integer index once, score dicts become rows of a matrix
+aligned to that index, and Kendall's tau, Spearman's rho and the overlap of
+the top-k nodes are computed for each row of the aligned matrix, with
+scipy.stats for the rank correlations.
+"""
+import json
+
+import numpy as np
+import scipy.stats
+
+
+class NodeIndex:
+    """
+    Maps nodes to integer indices 0..n-1, so that centralities of the same
+    nodes can be stored and compared as aligned numpy arrays.
+    """
+
+    def __init__(self, nodes):
+        """
+        Parameters:
+        -----------
+        nodes: iterable
+            nodes of the index, e.g. the keys of a ground-truth dict
+        """
+        self.nodes = list(nodes)
+        self.index = dict(zip(self.nodes, range(len(self.nodes))))
+        if len(self.index) < len(self.nodes):
+            # drop duplicate nodes
+            self.nodes = list(dict.fromkeys(self.nodes))
+            self.index = dict(zip(self.nodes, range(len(self.nodes))))
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def vector(self, scores):
+        """
+        Returns the scores in a dict as an array aligned to the index, with
+        NaN for nodes that have no score. Nodes that are not in the index are
+        ignored.
+        """
+        x = np.full(len(self.nodes), np.nan)
+        for v, s in scores.items():
+            i = self.index.get(v)
+            if i is not None:
+                x[i] = s
+        return x
+
+    def matrix(self, scores):
+        """
+        Returns a matrix with one row per score dict, see vector.
+        """
+        return np.array([self.vector(s) for s in scores]).reshape(-1, len(self.nodes))
+
+
+def read_gt(file):
+    """
+    Reads a ground-truth JSON file and returns its node index and the
+    array of ground-truth values.
+    """
+    with open(file, 'r') as f:
+        gt = json.load(f)
+    index = NodeIndex(gt.keys())
+    return index, index.vector(gt)
+
+
+def _rows(x, Y):
+    # values of x and of each row of Y on the nodes where both are defined
+    x = np.asarray(x, dtype=np.float64)
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    for y in Y:
+        valid = ~np.isnan(x) & ~np.isnan(y)
+        yield x[valid], y[valid]
+
+
+def kendalltau(x, Y):
+    """
+    Kendall's tau-b between x and each row of Y, on the entries where both
+    are defined (not NaN), computed with scipy.stats.kendalltau.
+
+    Parameters:
+    -----------
+    x: ndarray
+        values of length n, e.g. ground-truth centralities
+    Y: ndarray
+        matrix of shape m x n (or vector of length n) with one score vector
+        per row, aligned to x
+
+    Returns:
+    --------
+    (tau, pvalue), arrays of length m with the correlation coefficients and
+    two-sided p-values of the asymptotic normal approximation. Rows with
+    fewer than two common entries or constant values yield NaN.
+    """
+    res = []
+    for xv, yv in _rows(x, Y):
+        if len(xv) < 2 or np.all(xv == xv[0]) or np.all(yv == yv[0]):
+            res.append((np.nan, np.nan))
+        else:
+            res.append(tuple(scipy.stats.kendalltau(xv, yv, method='asymptotic')))
+    return tuple(np.array(res, dtype=np.float64).reshape(-1, 2).T)
+
+
+def spearman(x, Y):
+    """
+    Spearman's rank correlation between x and each row of Y, on the
+    entries where both are defined, with average ranks for ties.
+
+    Parameters:
+    -----------
+    x: ndarray
+        values of length n, e.g. ground-truth centralities
+    Y: ndarray
+        matrix of shape m x n (or vector of length n), aligned to x
+
+    Returns:
+    --------
+    array of length m with the correlation coefficients
+    """
+    res = []
+    for xv, yv in _rows(x, Y):
+        rx = scipy.stats.rankdata(xv)
+        ry = scipy.stats.rankdata(yv)
+        rx -= rx.mean() if len(rx) else 0
+        ry -= ry.mean() if len(ry) else 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            res.append(np.dot(rx, ry) / np.sqrt(np.dot(rx, rx) * np.dot(ry, ry)))
+    return np.array(res, dtype=np.float64)
+
+
+def top_k_overlap(x, Y, k=10):
+    """
+    Fraction of the k nodes with the largest values of x that are also
+    among the k nodes with the largest values in each row of Y, considering
+    only entries where both are defined. Ties are broken by node index.
+
+    Parameters:
+    -----------
+    x: ndarray
+        values of length n, e.g. ground-truth centralities
+    Y: ndarray
+        matrix of shape m x n (or vector of length n), aligned to x
+    k: int
+        number of top nodes
+
+    Returns:
+    --------
+    array of length m with overlaps between 0 and 1
+    """
+    res = []
+    for xv, yv in _rows(x, Y):
+        top_x = np.argsort(-xv, kind='stable')[:k]
+        top_y = np.argsort(-yv, kind='stable')[:k]
+        res.append(len(np.intersect1d(top_x, top_y)) / min(k, len(xv)) if len(xv) else np.nan)
+    return np.array(res, dtype=np.float64)
+
+
+def validate(gt, scores, k=10):
+    """
+    Compares many centralities with the ground truth in one batched call.
+
+    Parameters:
+    -----------
+    gt: dict, tuple
+        ground-truth values by node, or a (NodeIndex, array) pair as
+        returned by read_gt
+    scores: list
+        dicts with the centralities of nodes, e.g. the PageRank of each
+        layer of a multi-order model. Only nodes in the ground truth are
+        considered.
+    k: int
+        number of top nodes for top_k_overlap
+
+    Returns:
+    --------
+    dict with arrays kendall_tau, p_value, spearman and top_k, with one
+    entry per score dict
+    """
+    if isinstance(gt, dict):
+        index = NodeIndex(gt.keys())
+        x = index.vector(gt)
+    else:
+        index, x = gt
+    Y = index.matrix(scores)
+    tau, pvalue = kendalltau(x, Y)
+    return {'kendall_tau': tau, 'p_value': pvalue, 'spearman': spearman(x, Y), 'top_k': top_k_overlap(x, Y, k)}
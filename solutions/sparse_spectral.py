@@ -0,0 +1,218 @@
+"""
+Sparse spectral analysis of higher-order networks. Laplacians are built
+directly in CSR format and the smallest eigenpairs are computed with
+ARPACK in shift-invert mode, so that algebraic connectivity and Fiedler
+vectors can be computed for models with hundreds of thousands of
+higher-order nodes, where pp.algorithms.spectral.fiedler_vector_dense
+is not an option.
+"""
+import numpy as np
+import scipy.sparse as sparse
+import scipy.sparse.linalg as sla
+from scipy.sparse import csgraph
+
+
+def weight_matrix(network, include_subpaths=True):
+    """
+    Returns the weighted adjacency matrix of a (higher-order) network in CSR
+    format, where A[s,t] is the weight of link s -> t. Rows and columns are
+    ordered according to network.node_to_name_map().
+
+    Parameters:
+    -----------
+    network: Network
+        pp.Network or pp.HigherOrderNetwork instance
+    include_subpaths: bool
+        for higher-order networks, whether or not to include subpath
+        statistics in the link weights (default True)
+    """
+    idx = network.node_to_name_map()
+    n = len(idx)
+    m = len(network.edges)
+    row = np.empty(m, dtype=np.int64)
+    col = np.empty(m, dtype=np.int64)
+    data = np.empty(m, dtype=np.float64)
+    for i, ((s, t), attr) in enumerate(network.edges.items()):
+        row[i] = idx[s]
+        col[i] = idx[t]
+        w = attr.get('weight', 1.0)
+        if np.ndim(w) > 0:
+            w = w.sum() if include_subpaths else w[1]
+        data[i] = w
+    A = sparse.csr_matrix((data, (row, col)), shape=(n, n))
+    A.eliminate_zeros()
+    if not getattr(network, 'directed', True):
+        A = A.maximum(A.T)
+    return A
+
+
+def laplacian_matrix(network, kind='symmetric', include_subpaths=True):
+    """
+    Returns a sparse Laplacian matrix of a (higher-order) network in CSR format.
+
+    Parameters:
+    -----------
+    network: Network
+        pp.Network or pp.HigherOrderNetwork instance
+    kind: str
+        'symmetric' (default) returns the normalized Laplacian
+        I - D^-1/2 W D^-1/2 of the symmetrised weight matrix W = A + A^T, which
+        has a real spectrum and can be handled by Lanczos iterations.
+        'random_walk' returns I - T with the random walk transition matrix
+        T = D^-1 A, which is the Laplacian used by pp.algorithms.spectral.
+    include_subpaths: bool
+        whether or not to include subpath statistics in the link weights
+    """
+    A = weight_matrix(network, include_subpaths)
+    n = A.shape[0]
+    if kind == 'symmetric':
+        W = (A + A.T).tocsr()
+        d = np.asarray(W.sum(axis=1)).ravel()
+        d_inv_sqrt = np.zeros(n)
+        d_inv_sqrt[d > 0] = 1.0 / np.sqrt(d[d > 0])
+        D = sparse.diags(d_inv_sqrt)
+        return (sparse.identity(n, format='csr') - D @ W @ D).tocsr()
+    elif kind == 'random_walk':
+        d = np.asarray(A.sum(axis=1)).ravel()
+        d_inv = np.zeros(n)
+        d_inv[d > 0] = 1.0 / d[d > 0]
+        return (sparse.identity(n, format='csr') - sparse.diags(d_inv) @ A).tocsr()
+    raise ValueError('Unknown Laplacian kind "{0}"'.format(kind))
+
+
+def smallest_eigenpairs(L, k=2, sigma=-1e-3, tol=0, maxiter=None, symmetric=True):
+    """
+    Computes the k eigenpairs of a sparse Laplacian with the smallest
+    eigenvalues. Instead of asking ARPACK for the smallest eigenvalues directly
+    (which converges very slowly), L - sigma I is factorised once and the
+    largest eigenvalues of its inverse are computed with Lanczos iterations
+    (Arnoldi iterations if symmetric is False). sigma is slightly negative, as
+    the Laplacian itself is singular.
+
+    Parameters:
+    -----------
+    L: sparse matrix
+        Laplacian matrix, e.g. returned by laplacian_matrix
+    k: int
+        number of eigenpairs to compute
+    sigma: float
+        shift used in shift-invert mode
+    symmetric: bool
+        whether L is symmetric
+
+    Returns:
+    --------
+    (eigenvalues, eigenvectors) sorted by increasing real part of the
+    eigenvalue, where eigenvectors[:, i] belongs to eigenvalues[i]
+    """
+    n = L.shape[0]
+    if k >= n - 1:
+        # ARPACK needs k < n-1, the matrix is tiny anyway
+        w, v = np.linalg.eig(L.toarray())
+    else:
+        # scipy's default column ordering for the LU decomposition (COLAMD)
+        # produces an enormous fill-in for Laplacians of higher-order networks
+        # (65M non-zeros for the 3rd-order flight network vs. 1.5M with a
+        # minimum degree ordering on A+A^T), so we factorise ourselves.
+        M = (L - sigma * sparse.identity(n)).tocsc()
+        lu = sla.splu(M, permc_spec='MMD_AT_PLUS_A', options=dict(SymmetricMode=symmetric))
+        OPinv = sla.LinearOperator((n, n), matvec=lu.solve, dtype=M.dtype)
+        if symmetric:
+            w, v = sla.eigsh(L, k=k, sigma=sigma, which='LM', tol=tol, maxiter=maxiter, OPinv=OPinv)
+        else:
+            w, v = sla.eigs(L, k=k, sigma=sigma, which='LM', tol=tol, maxiter=maxiter, OPinv=OPinv)
+    order = np.argsort(np.real(w))[:k]
+    w, v = w[order], v[:, order]
+    if symmetric:
+        w, v = np.real(w), np.real(v)
+    return w, v
+
+
+def connected_components(network, include_subpaths=True):
+    """
+    Returns the number of (weakly) connected components of a (higher-order)
+    network and an array that assigns each node the index of its component,
+    in the order of network.node_to_name_map(). Nodes without links are
+    ignored, i.e. they are assigned the component index -1.
+
+    Parameters:
+    -----------
+    network: Network
+        pp.Network or pp.HigherOrderNetwork instance
+    include_subpaths: bool
+        whether or not to include subpath statistics in the link weights
+    """
+    A = weight_matrix(network, include_subpaths)
+    _, labels = csgraph.connected_components(A, directed=True, connection='weak')
+    degree = np.asarray((A + A.T).sum(axis=1)).ravel()
+    labels[degree == 0] = -1
+    # relabel components such that the largest component has index 0
+    sizes = np.bincount(labels[labels >= 0])
+    ranks = np.empty(len(sizes), dtype=np.int64)
+    ranks[np.argsort(-sizes, kind='stable')] = np.arange(len(sizes))
+    labels[labels >= 0] = ranks[labels[labels >= 0]]
+    return len(sizes), labels
+
+
+def algebraic_connectivity(network, kind='symmetric', include_subpaths=True):
+    """
+    Returns the second-smallest eigenvalue of the Laplacian of a (higher-order)
+    network. In contrast to pp.algorithms.spectral.algebraic_connectivity, the
+    result does not depend on a warm start of ARPACK. For the symmetric
+    Laplacian, the algebraic connectivity of a network with more than one
+    connected component is zero, which is returned without any eigenvalue
+    computation. This is the common case for higher-order models of
+    real data, where ARPACK converges very slowly due to the large number
+    of zero eigenvalues.
+
+    Parameters:
+    -----------
+    network: Network
+        pp.Network or pp.HigherOrderNetwork instance
+    kind: str
+        Laplacian to use, see laplacian_matrix. Use 'random_walk' to reproduce
+        the values of pp.algorithms.spectral.algebraic_connectivity.
+    include_subpaths: bool
+        whether or not to include subpath statistics in the link weights
+    """
+    if kind == 'symmetric' and connected_components(network, include_subpaths)[0] > 1:
+        return 0.0
+    L = laplacian_matrix(network, kind, include_subpaths)
+    w, _ = smallest_eigenpairs(L, k=2, symmetric=(kind == 'symmetric'))
+    return float(np.abs(w[1]))
+
+
+def fiedler_vector(network, kind='symmetric', include_subpaths=True, largest_component=True):
+    """
+    Returns the Fiedler vector, i.e. the eigenvector corresponding to the
+    second-smallest eigenvalue of the Laplacian, normalised to unit length.
+    Entries are ordered according to network.node_to_name_map(). Note that
+    the sign of the vector is arbitrary.
+
+    Parameters:
+    -----------
+    network: Network
+        pp.Network or pp.HigherOrderNetwork instance
+    kind: str
+        Laplacian to use, see laplacian_matrix
+    include_subpaths: bool
+        whether or not to include subpath statistics in the link weights
+    largest_component: bool
+        if True (default), the Fiedler vector is computed for the largest
+        connected component only and all other entries are zero. For a
+        disconnected network, the Fiedler vector of the whole network
+        is not unique and merely indicates the components.
+    """
+    L = laplacian_matrix(network, kind, include_subpaths)
+    if kind == 'random_walk':
+        # left eigenvectors, as in pp.algorithms.spectral.fiedler_vector_dense
+        L = L.T.tocsr()
+    nodes = np.arange(L.shape[0])
+    if largest_component:
+        _, labels = connected_components(network, include_subpaths)
+        nodes = np.flatnonzero(labels == 0)
+        L = L[nodes][:, nodes]
+    _, v = smallest_eigenpairs(L, k=2, symmetric=(kind == 'symmetric'))
+    f = np.zeros(network.ncount(), dtype=v.dtype)
+    f[nodes] = v[:, 1]
+    return f / np.linalg.norm(f)
@@ -0,0 +1,237 @@
+"""
+Spectral clustering of higher-order networks. Nodes of a HigherOrderNetwork
+are embedded using the first eigenvectors of its sparse Laplacian (see
+sparse_spectral), clustered with k-means and the resulting labels of
+higher-order nodes can be projected back to first-order nodes, e.g.
+
+    hon_2 = pp.HigherOrderNetwork(paths, k=2)
+    labels = cluster(hon_2, n_clusters=3, seed=42)
+    clusters = project_labels(hon_2, labels)
+
+    # temporal_clusters.state lists the ten nodes of each ground-truth cluster in turn
+    truth = {v: i // 10 for i, v in enumerate(read_state_vertices('data/temporal_clusters.state'))}
+    print(evaluate(clusters, truth))
+"""
+from collections import defaultdict
+
+import numpy as np
+
+from solutions import sparse_spectral
+
+
+def spectral_embedding(network, dim, kind='symmetric', include_subpaths=True):
+    """
+    Returns the coordinates of all nodes in the space spanned by the
+    eigenvectors of the Laplacian with the dim smallest eigenvalues. Rows
+    are ordered according to network.node_to_name_map(). For the symmetric
+    Laplacian, rows are normalised to unit length as proposed by Ng, Jordan
+    and Weiss.
+
+    Parameters:
+    -----------
+    network: Network
+        pp.Network or pp.HigherOrderNetwork instance
+    dim: int
+        number of eigenvectors to use
+    kind: str
+        Laplacian to use, see sparse_spectral.laplacian_matrix
+    include_subpaths: bool
+        whether or not to include subpath statistics in the link weights
+    """
+    L = sparse_spectral.laplacian_matrix(network, kind, include_subpaths)
+    symmetric = kind == 'symmetric'
+    if not symmetric:
+        L = L.T.tocsr()
+    _, v = sparse_spectral.smallest_eigenpairs(L, k=dim, symmetric=symmetric)
+    X = np.real(v)
+    if symmetric:
+        norm = np.linalg.norm(X, axis=1)
+        norm[norm == 0] = 1.0
+        X = X / norm[:, None]
+    return X
+
+
+def kmeans(X, n_clusters, n_init=10, max_iter=300, seed=None):
+    """
+    Lloyd's k-means algorithm with k-means++ initialisation. Returns
+    the cluster index of each row of X for the best of n_init runs.
+
+    Parameters:
+    -----------
+    X: ndarray
+        n x d array of points
+    n_clusters: int
+        number of clusters
+    n_init: int
+        number of runs with different initial centroids
+    max_iter: int
+        maximum number of iterations per run
+    seed: int
+        seed of the random number generator
+    """
+    rng = np.random.default_rng(seed)
+    n = X.shape[0]
+    sq_norms = (X ** 2).sum(axis=1)
+    best_labels, best_inertia = None, np.inf
+    for _ in range(n_init):
+        # k-means++ seeding
+        centroids = np.empty((n_clusters, X.shape[1]))
+        centroids[0] = X[rng.integers(n)]
+        d = ((X - centroids[0]) ** 2).sum(axis=1)
+        for c in range(1, n_clusters):
+            p = d / d.sum() if d.sum() > 0 else None
+            centroids[c] = X[rng.choice(n, p=p)]
+            d = np.minimum(d, ((X - centroids[c]) ** 2).sum(axis=1))
+        labels = None
+        for _ in range(max_iter):
+            dist = sq_norms[:, None] - 2 * X @ centroids.T + (centroids ** 2).sum(axis=1)[None, :]
+            new_labels = dist.argmin(axis=1)
+            if labels is not None and np.array_equal(labels, new_labels):
+                break
+            labels = new_labels
+            counts = np.bincount(labels, minlength=n_clusters)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, X)
+            nonempty = counts > 0
+            centroids[nonempty] = sums[nonempty] / counts[nonempty, None]
+        inertia = dist[np.arange(n), labels].sum()
+        if inertia < best_inertia:
+            best_labels, best_inertia = labels, inertia
+    return best_labels
+
+
+def cluster(network, n_clusters, dim=None, kind='symmetric', include_subpaths=True, seed=None):
+    """
+    Spectral clustering of the nodes of a (higher-order) network.
+
+    Parameters:
+    -----------
+    network: Network
+        pp.Network or pp.HigherOrderNetwork instance
+    n_clusters: int
+        number of clusters
+    dim: int
+        number of eigenvectors to use for the embedding. Defaults to n_clusters.
+    kind: str
+        Laplacian to use, see sparse_spectral.laplacian_matrix
+    include_subpaths: bool
+        whether or not to include subpath statistics in the link weights
+    seed: int
+        seed of the random number generator used by k-means
+
+    Returns:
+    --------
+    dict mapping (higher-order) nodes to cluster indices
+    """
+    if dim is None:
+        dim = n_clusters
+    X = spectral_embedding(network, dim, kind, include_subpaths)
+    labels = kmeans(X, n_clusters, seed=seed)
+    return {v: int(labels[i]) for v, i in network.node_to_name_map().items()}
+
+
+def project_labels(network, labels, position=-1):
+    """
+    Projects cluster labels of higher-order nodes to first-order nodes.
+    Higher-order nodes are weighted by the total weight of their incoming
+    links, and each first-order node v is assigned the label with the
+    largest share of its weight among the higher-order nodes with v at the
+    given position. Shares are relative to the total weight of each label,
+    so that a large cluster of higher-order nodes that connect different
+    first-order clusters does not outvote the smaller clusters, which
+    consist of the higher-order nodes within a single first-order cluster.
+
+    Parameters:
+    -----------
+    network: HigherOrderNetwork
+        the network whose nodes have been clustered
+    labels: dict
+        cluster labels of higher-order nodes, e.g. returned by cluster
+    position: int
+        position of the first-order node in the path of a higher-order node.
+        The default -1 maps higher-order nodes to their last first-order node,
+        as pp.visualisation.plot does for plot_higher_order_nodes=False.
+    """
+    votes = defaultdict(lambda: defaultdict(float))
+    totals = defaultdict(float)
+    for v, label in labels.items():
+        path = network.higher_order_node_to_path(v) if hasattr(network, 'higher_order_node_to_path') else (v,)
+        weight = network.nodes[v].get('inweight', 1.0)
+        if np.ndim(weight) > 0:
+            weight = weight.sum()
+        weight = max(float(weight), 1e-12)
+        votes[path[position]][label] += weight
+        totals[label] += weight
+    return {v: max(c.items(), key=lambda x: x[1] / totals[x[0]])[0] for v, c in votes.items()}
+
+
+def read_state_vertices(filename):
+    """
+    Returns the labels of the first-order nodes in the *Vertices section of
+    a state network file, as written by MultiOrderModel.save_state_file,
+    in the order of their indices.
+
+    Parameters:
+    -----------
+    filename: str
+        path of the state network file
+    """
+    vertices = {}
+    section = None
+    with open(filename) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('*'):
+                section = line.split()[0].lower()
+            elif section == '*vertices':
+                idx, label = line.split(None, 1)
+                vertices[int(idx)] = label.strip('"')
+    return [vertices[i] for i in sorted(vertices)]
+
+
+def evaluate(labels, truth):
+    """
+    Compares a clustering to ground-truth labels for the nodes that
+    occur in both dictionaries.
+
+    Parameters:
+    -----------
+    labels: dict
+        mapping from nodes to cluster labels
+    truth: dict
+        mapping from nodes to ground-truth labels
+
+    Returns:
+    --------
+    dict with the adjusted Rand index, normalised mutual information and
+    purity of the clustering
+    """
+    nodes = [v for v in labels if v in truth]
+    _, a = np.unique([labels[v] for v in nodes], return_inverse=True)
+    _, b = np.unique([truth[v] for v in nodes], return_inverse=True)
+    n = len(nodes)
+    contingency = np.zeros((a.max() + 1, b.max() + 1))
+    np.add.at(contingency, (a, b), 1)
+
+    def pairs(x):
+        return (x * (x - 1) / 2).sum()
+
+    sum_ij = pairs(contingency)
+    sum_a = pairs(contingency.sum(axis=1))
+    sum_b = pairs(contingency.sum(axis=0))
+    expected = sum_a * sum_b / pairs(np.array([n]))
+    max_index = (sum_a + sum_b) / 2
+    ari = 1.0 if max_index == expected else (sum_ij - expected) / (max_index - expected)
+
+    p = contingency / n
+    pa, pb = p.sum(axis=1), p.sum(axis=0)
+    nz = p > 0
+    mi = (p[nz] * np.log(p[nz] / np.outer(pa, pb)[nz])).sum()
+    ha = -(pa[pa > 0] * np.log(pa[pa > 0])).sum()
+    hb = -(pb[pb > 0] * np.log(pb[pb > 0])).sum()
+    nmi = 1.0 if ha + hb == 0 else 2 * mi / (ha + hb)
+
+    purity = contingency.max(axis=1).sum() / n
+    return {'ari': float(ari), 'nmi': float(nmi), 'purity': float(purity)}
@@ -0,0 +1,167 @@
+"""
+Stores extracted paths, higher-order networks and multi-order models in
+SQLite, next to the temporal networks in temporal_networks.db. Results are
+written with one executemany per table inside a single transaction, and
+tables are indexed by name, order and node, so that later queries (e.g.
+the strongest links of a node in a second-order model) do not have to
+load the whole result. The database uses write-ahead logging, so that
+several processes can read results while another one writes.
+"""
+import sqlite3
+
+import numpy as np
+import pathpy as pp
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS path_sets (name TEXT PRIMARY KEY, separator TEXT, max_subpath_length INTEGER);
+CREATE TABLE IF NOT EXISTS paths (name TEXT, length INTEGER, path TEXT, subpath REAL, longest REAL);
+CREATE INDEX IF NOT EXISTS paths_name_idx ON paths (name, length);
+CREATE TABLE IF NOT EXISTS hon_edges (name TEXT, k INTEGER, source TEXT, target TEXT, subpath REAL, longest REAL);
+CREATE INDEX IF NOT EXISTS hon_edges_source_idx ON hon_edges (name, k, source);
+CREATE INDEX IF NOT EXISTS hon_edges_target_idx ON hon_edges (name, k, target);
+CREATE TABLE IF NOT EXISTS models (name TEXT PRIMARY KEY, max_order INTEGER, optimal_order INTEGER);
+CREATE TABLE IF NOT EXISTS model_layers (name TEXT, k INTEGER, nodes INTEGER, edges INTEGER,
+                                         degrees_of_freedom INTEGER, log_likelihood REAL, PRIMARY KEY (name, k));
+"""
+
+
+def connect(db):
+    """
+    Opens a database for results, switches it to write-ahead logging and
+    creates the result tables if needed.
+    """
+    con = sqlite3.connect(db)
+    con.execute('PRAGMA journal_mode=WAL')
+    create_tables(con)
+    return con
+
+
+def create_tables(con):
+    """
+    Creates the result tables and their indexes, unless they exist.
+    """
+    con.executescript(SCHEMA)
+
+
+def _path_rows(paths, name):
+    for l in paths.paths:
+        for p, w in paths.paths[l].items():
+            yield name, l, paths.separator.join(p), float(w[0]), float(w[1])
+
+
+def _edge_rows(network, name, k):
+    for (v, w), attr in network.edges.items():
+        weight = np.atleast_1d(attr['weight'])
+        if len(weight) == 2:
+            yield name, k, v, w, float(weight[0]), float(weight[1])
+        else:
+            yield name, k, v, w, None, float(weight.sum())
+
+
+def write_paths(con, paths, name):
+    """
+    Stores the statistics of a Paths object under a name, replacing paths
+    previously stored under that name.
+
+    Parameters:
+    -----------
+    con: sqlite3.Connection
+        connection to a database with result tables, see connect
+    paths: Paths
+        the paths to store
+    name: str
+        name of the paths, e.g. the data set and extraction settings
+    """
+    with con:
+        con.execute('DELETE FROM paths WHERE name=?', (name,))
+        con.execute('INSERT OR REPLACE INTO path_sets VALUES (?, ?, ?)',
+                    (name, paths.separator, int(min(paths.max_subpath_length, np.iinfo(np.int64).max))))
+        con.executemany('INSERT INTO paths VALUES (?, ?, ?, ?, ?)', _path_rows(paths, name))
+
+
+def read_paths(con, name, min_length=0, max_length=None):
+    """
+    Reads paths stored with write_paths into a Paths object.
+
+    Parameters:
+    -----------
+    con: sqlite3.Connection
+        connection to a database with result tables
+    name: str
+        name of the paths
+    min_length: int
+        only paths with at least this length are read, default is 0
+    max_length: int
+        if given, only paths with at most this length are read
+    """
+    row = con.execute('SELECT separator, max_subpath_length FROM path_sets WHERE name=?', (name,)).fetchone()
+    if row is None:
+        raise KeyError(name)
+    paths = pp.Paths(separator=row[0])
+    paths.max_subpath_length = row[1]
+    sql = 'SELECT length, path, subpath, longest FROM paths WHERE name=? AND length>=?'
+    params = [name, min_length]
+    if max_length is not None:
+        sql += ' AND length<=?'
+        params.append(max_length)
+    for l, p, subpath, longest in con.execute(sql, params):
+        paths.paths[l][tuple(p.split(row[0])) if p else ()] = np.array([subpath, longest])
+    return paths
+
+
+def write_network(con, network, name):
+    """
+    Stores the link weights of a (higher-order) network under a name and
+    its order, replacing links previously stored for that name and order.
+    For higher-order networks, subpath and longest path weights are stored
+    separately.
+
+    Parameters:
+    -----------
+    con: sqlite3.Connection
+        connection to a database with result tables
+    network: HigherOrderNetwork, Network
+        the network to store
+    name: str
+        name of the network or model
+    """
+    k = getattr(network, 'order', 1)
+    with con:
+        con.execute('DELETE FROM hon_edges WHERE name=? AND k=?', (name, k))
+        con.executemany('INSERT INTO hon_edges VALUES (?, ?, ?, ?, ?, ?)', _edge_rows(network, name, k))
+
+
+def write_model(con, model, name, optimal_order=None, edges=True):
+    """
+    Stores a summary of each layer of a multi-order model (number of nodes
+    and links, degrees of freedom and log-likelihood of the model up to
+    that layer) and, optionally, the link weights of all layers.
+
+    Parameters:
+    -----------
+    con: sqlite3.Connection
+        connection to a database with result tables
+    model: MultiOrderModel
+        the model to store
+    name: str
+        name of the model
+    optimal_order: int
+        optimal order, e.g. the result of model.estimate_order(). Default is
+        None, i.e. unknown.
+    edges: bool
+        if True (default), the links of all layers are stored in hon_edges
+    """
+    layers = []
+    for k in range(model.max_order + 1):
+        hon = model.layers[k]
+        layers.append((name, k, hon.ncount(), hon.ecount(),
+                       int(model.degrees_of_freedom(k)), float(model.likelihood(max_order=k, log=True))))
+    with con:
+        for table in ['models', 'model_layers'] + (['hon_edges'] if edges else []):
+            con.execute('DELETE FROM {0} WHERE name=?'.format(table), (name,))
+        con.execute('INSERT INTO models VALUES (?, ?, ?)', (name, model.max_order, optimal_order))
+        con.executemany('INSERT INTO model_layers VALUES (?, ?, ?, ?, ?, ?)', layers)
+        if edges:
+            for k in range(model.max_order + 1):
+                con.executemany('INSERT INTO hon_edges VALUES (?, ?, ?, ?, ?, ?)', _edge_rows(model.layers[k], name, k))
@@ -0,0 +1,300 @@
+"""
+SQLite-backed source of temporal networks, as used in 8_exploration.
+TemporalNetwork.from_sqlite reads whatever a cursor returns, so loading
+the events of a single week or of a few nodes means reading the whole
+table. Here, time windows and node subsets are turned into parameterised
+WHERE clauses that SQLite answers with indexes on time, source and target,
+and the matching rows are streamed directly into the temporal network.
+Several tables can be loaded concurrently by a pool of processes, each of
+which holds its own read-only connection.
+"""
+import concurrent.futures
+import datetime
+import json
+import os
+import sqlite3
+import time
+import warnings
+
+import pathpy as pp
+
+
+def quote_identifier(name):
+    """
+    Quotes an SQL identifier like a table name, which cannot be passed as
+    a query parameter.
+    """
+    return '"{0}"'.format(name.replace('"', '""'))
+
+
+def _node_values(nodes):
+    # node names as strings and, for numeric names, integers, since pathpy turns all node ids into strings
+    values = []
+    for v in nodes:
+        values.append(str(v))
+        if str(v).lstrip('-').isdigit():
+            values.append(int(v))
+    return json.dumps(values)
+
+
+def connect_readonly(db):
+    """
+    Opens a read-only connection to a database file. Read-only connections
+    never take write locks, so that many of them can read concurrently,
+    also while another process writes to a database in WAL mode.
+    """
+    return sqlite3.connect('file:{0}?mode=ro'.format(os.path.abspath(db).replace('?', '%3f')), uri=True)
+
+
+def indexed_columns(con, table):
+    """
+    Returns the columns of a table that are the first column of an index.
+    """
+    columns = set()
+    for index in con.execute('PRAGMA index_list({0})'.format(quote_identifier(table))).fetchall():
+        info = con.execute('PRAGMA index_info({0})'.format(quote_identifier(index[1]))).fetchall()
+        if info:
+            columns.add(min(info)[2])
+    return columns
+
+
+def ensure_indexes(con, table, columns=('time', 'source', 'target')):
+    """
+    Creates indexes on the given columns of a table, unless they already
+    exist. If the database is read-only, a warning is issued instead.
+    Returns the columns for which indexes were created.
+
+    Parameters:
+    -----------
+    con: sqlite3.Connection
+        connection to the database
+    table: str
+        name of the table
+    columns: tuple
+        columns that need an index, default is time, source and target
+    """
+    missing = [c for c in columns if c not in indexed_columns(con, table)]
+    try:
+        for c in missing:
+            con.execute('CREATE INDEX IF NOT EXISTS {0} ON {1}({2})'.format(
+                quote_identifier('{0}_{1}_idx'.format(table, c)), quote_identifier(table), quote_identifier(c)))
+        con.commit()
+    except sqlite3.OperationalError as e:
+        warnings.warn('Cannot create indexes on {0}: {1}'.format(table, e))
+        return []
+    return missing
+
+
+class SQLiteSource:
+    """
+    A table of time-stamped links with columns source, target and time in
+    an SQLite database, from which (parts of) temporal networks are loaded.
+    """
+
+    def __init__(self, db, table, create_indexes=True):
+        """
+        Parameters:
+        -----------
+        db: str, sqlite3.Connection
+            path of the database file or an open connection
+        table: str
+            name of the table, e.g. manufacturing_email
+        create_indexes: bool
+            if True (default), indexes on time, source and target are created
+            if they do not exist
+        """
+        self.con = sqlite3.connect(db) if isinstance(db, str) else db
+        self.table = table
+        if self.con.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone() is None:
+            raise ValueError('No table {0} in database'.format(table))
+        if create_indexes:
+            ensure_indexes(self.con, table)
+
+    def close(self):
+        self.con.close()
+
+    def time_range(self):
+        """
+        Returns the smallest and largest time stamp in the table.
+        """
+        return self.con.execute('SELECT MIN(time), MAX(time) FROM {0}'.format(quote_identifier(self.table))).fetchone()
+
+    def query(self, start=None, end=None, nodes=None, induced=True, time_rescale=1):
+        """
+        Returns the SQL query and parameters that select the links in a
+        time window and/or between a subset of nodes.
+
+        Parameters:
+        -----------
+        start: int, str
+            links with time stamps before start are excluded. Integers are in
+            the units of the rescaled network, i.e. multiplied by time_rescale,
+            strings are compared with the time stamps in the table.
+        end: int, str
+            links with time stamps at or after end are excluded
+        nodes: iterable
+            if given, only links between these nodes are selected
+        induced: bool
+            if True (default), both the source and the target of a link must be
+            in nodes, if False, links with either of them in nodes are selected
+        time_rescale: int
+            factor by which time stamps are divided, see
+            TemporalNetwork.from_sqlite
+        """
+        where, params = [], []
+        for bound, op in [(start, '>='), (end, '<')]:
+            if bound is not None:
+                where.append('time {0} ?'.format(op))
+                params.append(bound if isinstance(bound, str) else bound * time_rescale)
+        if nodes is not None:
+            values = _node_values(nodes)
+            where.append('(source IN (SELECT value FROM json_each(?)) {0} target IN (SELECT value FROM json_each(?)))'
+                         .format('AND' if induced else 'OR'))
+            params.extend([values, values])
+        sql = 'SELECT source, target, time FROM {0}'.format(quote_identifier(self.table))
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        return sql, params
+
+    def rows(self, start=None, end=None, nodes=None, induced=True, time_rescale=1, chunk_size=100000):
+        """
+        Yields (source, target, time) tuples of the selected links, see query,
+        fetching chunk_size rows at a time.
+        """
+        cur = self.con.execute(*self.query(start, end, nodes, induced, time_rescale))
+        for rows in iter(lambda: cur.fetchmany(chunk_size), []):
+            yield from rows
+
+    def tedges(self, start=None, end=None, nodes=None, induced=True, directed=True,
+               time_rescale=1, timestamp_format='%Y-%m-%d %H:%M:%S'):
+        """
+        Yields the selected links as (source, target, time) tuples, with
+        the same conversion of node names and time stamps as
+        TemporalNetwork.from_sqlite, while rows are fetched from the
+        database in chunks. See query for the parameters.
+
+        Parameters:
+        -----------
+        directed: bool
+            if False, each link is added in both directions
+        time_rescale: int
+            factor by which integer time stamps are divided
+        timestamp_format: str
+            format of string time stamps
+        """
+        for v, w, t in self.rows(start, end, nodes, induced, time_rescale):
+            if isinstance(t, str):
+                t = int(time.mktime(datetime.datetime.strptime(t, timestamp_format).timetuple()))
+            t = int(t / time_rescale)
+            yield str(v), str(w), t
+            if not directed:
+                yield str(w), str(v), t
+
+    def temporal_network(self, start=None, end=None, nodes=None, induced=True, directed=True,
+                         time_rescale=1, timestamp_format='%Y-%m-%d %H:%M:%S'):
+        """
+        Loads the selected links into a temporal network, see tedges.
+        """
+        # pathpy keeps the list of links that it is given
+        return pp.TemporalNetwork(tedges=list(self.tedges(start, end, nodes, induced, directed,
+                                                          time_rescale, timestamp_format)))
+
+
+def load(db, table, start=None, end=None, nodes=None, induced=True, directed=True, time_rescale=1):
+    """
+    Loads (part of) a temporal network from a table in an SQLite database,
+    see SQLiteSource.temporal_network.
+    """
+    source = SQLiteSource(db, table)
+    try:
+        return source.temporal_network(start, end, nodes, induced, directed, time_rescale)
+    finally:
+        if isinstance(db, str):
+            source.close()
+
+
+# read-only connection of a worker process, see _init_worker
+_worker_con = None
+
+
+def _init_worker(db):
+    global _worker_con
+    _worker_con = connect_readonly(db)
+
+
+def _tedges(table, params):
+    # loads a table in a worker and returns its time-stamped links, which (unlike a TemporalNetwork) can be pickled
+    return list(SQLiteSource(_worker_con, table, create_indexes=False).tedges(**params))
+
+
+def _apply(table, params, func, args):
+    # loads a table in a worker and passes the temporal network on to func
+    return func(SQLiteSource(_worker_con, table, create_indexes=False).temporal_network(**params), *args)
+
+
+def _pool(db, tables, processes, create_indexes):
+    if create_indexes:
+        con = sqlite3.connect(db)
+        for table in tables:
+            ensure_indexes(con, table)
+        con.close()
+    return concurrent.futures.ProcessPoolExecutor(processes or min(len(tables), os.cpu_count()) or 1,
+                                                  initializer=_init_worker, initargs=(db,))
+
+
+def load_tables(db, tables, processes=None, create_indexes=True):
+    """
+    Loads several tables of a database into temporal networks concurrently,
+    in a pool of processes with one read-only connection each.
+
+    Parameters:
+    -----------
+    db: str
+        path of the database file
+    tables: dict
+        parameters of SQLiteSource.temporal_network (e.g. directed and
+        time_rescale) by table name
+    processes: int
+        number of worker processes, default is one per table (at most the
+        number of CPUs)
+    create_indexes: bool
+        if True (default), missing indexes are created before loading
+
+    Returns:
+    --------
+    dict of temporal networks by table name
+    """
+    with _pool(db, tables, processes, create_indexes) as pool:
+        futures = {table: pool.submit(_tedges, table, params) for table, params in tables.items()}
+        return {table: pp.TemporalNetwork(tedges=future.result()) for table, future in futures.items()}
+
+
+def map_tables(db, tables, func, *args, processes=None, create_indexes=True):
+    """
+    Loads several tables of a database concurrently and applies a function
+    to each temporal network in the worker that loaded it, e.g. to extract
+    causal paths. Temporal networks cannot be pickled, so only the results
+    of func are passed back.
+
+    Parameters:
+    -----------
+    db: str
+        path of the database file
+    tables: dict
+        parameters of SQLiteSource.temporal_network by table name
+    func: function
+        module-level function that is called with the temporal network and
+        args and returns a picklable result
+    processes: int
+        number of worker processes, default is one per table (at most the
+        number of CPUs)
+    create_indexes: bool
+        if True (default), missing indexes are created before loading
+
+    Returns:
+    --------
+    dict of the results of func by table name
+    """
+    with _pool(db, tables, processes, create_indexes) as pool:
+        futures = {table: pool.submit(_apply, table, params, func, args) for table, params in tables.items()}
+        return {table: future.result() for table, future in futures.items()}
@@ -0,0 +1,300 @@
+"""
+Content-addressed disk cache for expensive pipeline stages, like reading
+n-gram files, expanding origin-destination statistics or extracting causal
+paths. A cached stage is keyed on the name of the function, the content of
+its input files or objects and its parameters, so that repeated calls (for
+example after restarting a notebook kernel) return the stored result
+instead of recomputing it. Results are stored in compact binary form, and
+the least recently used entries are evicted when the cache exceeds a
+given total size.
+
+    read_paths = stage_cache.cached(files=['filename'])(pp.Paths.read_file)
+    paths = read_paths('data/US_flights_train.ngram', frequency=False)
+"""
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import re
+import warnings
+from collections import defaultdict
+
+import numpy as np
+import pathpy as pp
+
+from solutions import validation_harness
+
+
+# in the root of the repository, independent of the working directory
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'stages')
+
+# default maximum total size of cached results in bytes
+MAX_SIZE = 1 << 30
+
+# file hashes by (path, size, modification time), so that unchanged files are only hashed once
+_file_hashes = {}
+
+
+def _tempnet_arrays(tempnet):
+    nodes = list(tempnet.nodes)
+    idx = {v: i for i, v in enumerate(nodes)}
+    return {'nodes': np.array(json.dumps(nodes)),
+            'source': np.array([idx[v] for v, _, _ in tempnet.tedges], dtype=np.int64),
+            'target': np.array([idx[w] for _, w, _ in tempnet.tedges], dtype=np.int64),
+            'time': np.array([t for _, _, t in tempnet.tedges])}
+
+
+def _load_tempnet(file):
+    data = np.load(file)
+    nodes = json.loads(str(data['nodes']))
+    return pp.TemporalNetwork(tedges=list(zip((nodes[i] for i in data['source']),
+                                              (nodes[i] for i in data['target']),
+                                              data['time'].tolist())))
+
+
+def _network_arrays(network):
+    nodes = list(network.nodes)
+    idx = {v: i for i, v in enumerate(nodes)}
+    return {'nodes': np.array(json.dumps(nodes)),
+            'directed': np.array(network.directed),
+            'source': np.array([idx[v] for v, _ in network.edges], dtype=np.int64),
+            'target': np.array([idx[w] for _, w in network.edges], dtype=np.int64),
+            'weight': np.array([a['weight'] for a in network.edges.values()], dtype=np.float64)}
+
+
+def _load_network(file):
+    data = np.load(file)
+    nodes = json.loads(str(data['nodes']))
+    network = pp.Network(directed=bool(data['directed']))
+    for v in nodes:
+        network.add_node(v)
+    for i, j, w in zip(data['source'], data['target'], data['weight'].tolist()):
+        network.add_edge(nodes[i], nodes[j], weight=w)
+    return network
+
+
+def _save_array(x, file):
+    with open(file, 'wb') as f:
+        np.save(f, x, allow_pickle=False)
+
+
+def _load_array(file):
+    return np.load(file, allow_pickle=False)
+
+
+def _save_pickle(value, file):
+    # pathpy returns defaultdicts with lambda functions, which cannot be pickled
+    if isinstance(value, defaultdict):
+        value = dict(value)
+    with open(file, 'wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _load_pickle(file):
+    with open(file, 'rb') as f:
+        return pickle.load(f)
+
+
+def _npz(arrays):
+    # saves the arrays returned by a function in a compressed numpy file
+    return lambda x, file: np.savez_compressed(file, **arrays(x))
+
+
+# arrays that represent paths, temporal networks and networks, which cannot be pickled
+_ARRAYS = [
+    (lambda x: isinstance(x, pp.Paths), validation_harness.path_arrays),
+    (lambda x: isinstance(x, pp.TemporalNetwork), _tempnet_arrays),
+    (lambda x: type(x) is pp.Network, _network_arrays),
+]
+
+# (test, file extension, save, load) of each type of cached results, the first match is used
+CODECS = [
+    (_ARRAYS[0][0], 'paths.npz', _npz(_ARRAYS[0][1]), validation_harness.load_paths),
+    (_ARRAYS[1][0], 'tempnet.npz', _npz(_ARRAYS[1][1]), _load_tempnet),
+    (_ARRAYS[2][0], 'network.npz', _npz(_ARRAYS[2][1]), _load_network),
+    (lambda x: isinstance(x, np.ndarray) and x.dtype != object, 'npy', _save_array, _load_array),
+    (lambda x: True, 'pickle', _save_pickle, _load_pickle),
+]
+
+
+def file_hash(file):
+    """
+    Returns the SHA-1 hash of the content of a file, which is only computed
+    again if the size or modification time of the file have changed.
+    """
+    stat = os.stat(file)
+    key = (os.path.abspath(file), stat.st_size, stat.st_mtime_ns)
+    if key not in _file_hashes:
+        _file_hashes[key] = validation_harness.file_hash(file)
+    return _file_hashes[key]
+
+
+# default repr of objects, which contains a memory address that may be reused by other objects
+_ADDRESS = re.compile(r' at 0x[0-9a-fA-F]+>')
+
+
+def fingerprint(value):
+    """
+    Returns a string that identifies the content of a parameter value.
+    Arrays, paths, networks and temporal networks are identified by the
+    hash of their binary form, higher-order networks and multi-order models
+    by their paths and order, other values by their repr. A TypeError is
+    raised for values that only have the default repr of objects, which
+    identifies the memory address rather than the content of a value.
+    """
+    if isinstance(value, pp.MultiOrderModel):
+        return 'MultiOrderModel:{0}:{1}'.format(value.max_order, fingerprint(value.paths))
+    if isinstance(value, pp.HigherOrderNetwork):
+        return 'HigherOrderNetwork:{0}:{1}:{2}:{3}'.format(value.order, value.is_null_model,
+                                                           repr(value.separator), fingerprint(value.paths))
+    for test, arrays in _ARRAYS:
+        if test(value):
+            return '{' + ', '.join('{0}: {1}'.format(k, fingerprint(x)) for k, x in arrays(value).items()) + '}'
+    if isinstance(value, np.ndarray):
+        return 'ndarray:{0}:{1}:{2}'.format(value.dtype, value.shape,
+                                            hashlib.sha1(np.ascontiguousarray(value).tobytes()).hexdigest())
+    if isinstance(value, dict):
+        return '{' + ', '.join('{0}: {1}'.format(fingerprint(k), fingerprint(v)) for k, v in value.items()) + '}'
+    if isinstance(value, (list, tuple)):
+        return '[' + ', '.join(fingerprint(v) for v in value) + ']'
+    r = repr(value)
+    if _ADDRESS.search(r):
+        raise TypeError('Cannot fingerprint {0}, its repr {1} identifies a memory address'.format(
+            type(value).__name__, r))
+    return r
+
+
+def stage_key(func, args, kwargs, files=()):
+    """
+    Returns the cache key of a call of func, based on its qualified name,
+    the content of the arguments named in files and the fingerprints of all
+    other arguments, including default values.
+    """
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    h = hashlib.sha1('{0}.{1}'.format(func.__module__, func.__qualname__).encode())
+    for name, value in bound.arguments.items():
+        h.update(name.encode())
+        h.update((file_hash(value) if name in files else fingerprint(value)).encode())
+    return h.hexdigest()
+
+
+def lookup(key, cache_dir=CACHE_DIR):
+    """
+    Returns the path of the cached result with the given key, or None.
+    """
+    if os.path.isdir(cache_dir):
+        for _, ext, _, _ in CODECS:
+            file = os.path.join(cache_dir, '{0}.{1}'.format(key, ext))
+            if os.path.exists(file):
+                return file
+    return None
+
+
+def load(file):
+    """
+    Loads a cached result and marks it as recently used.
+    """
+    for _, ext, _, load in CODECS:
+        if file.endswith('.' + ext):
+            value = load(file)
+            os.utime(file)
+            return value
+    raise ValueError('Unknown cache entry {0}'.format(file))
+
+
+def store(key, value, cache_dir=CACHE_DIR, max_size=MAX_SIZE):
+    """
+    Stores a result in the cache and evicts the least recently used entries
+    if the total size of the cache exceeds max_size.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    for test, ext, save, _ in CODECS:
+        if test(value):
+            file = os.path.join(cache_dir, '{0}.{1}'.format(key, ext))
+            tmp = os.path.join(cache_dir, '{0}.{1}.tmp.{2}'.format(key, os.getpid(), ext))
+            try:
+                save(value, tmp)
+            except Exception:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+            os.replace(tmp, file)
+            evict(cache_dir, max_size)
+            return file
+
+
+def evict(cache_dir=CACHE_DIR, max_size=MAX_SIZE):
+    """
+    Removes the least recently used results until the total size of the
+    cache is at most max_size bytes. Returns the removed files.
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        if '.tmp.' in name:
+            continue
+        stat = os.stat(os.path.join(cache_dir, name))
+        entries.append((stat.st_mtime_ns, stat.st_size, os.path.join(cache_dir, name)))
+    total = sum(size for _, size, _ in entries)
+    removed = []
+    for _, size, file in sorted(entries):
+        if total <= max_size:
+            break
+        os.remove(file)
+        total -= size
+        removed.append(file)
+    return removed
+
+
+def clear(cache_dir=CACHE_DIR):
+    """
+    Removes all cached results.
+    """
+    return evict(cache_dir, 0) if os.path.isdir(cache_dir) else []
+
+
+def cached(files=(), cache_dir=CACHE_DIR, max_size=MAX_SIZE):
+    """
+    Decorator that caches the results of a pipeline stage on disk.
+
+    Parameters:
+    -----------
+    files: list
+        names of the arguments of the stage that are paths of input files,
+        which are identified by the hash of their content
+    cache_dir: str
+        directory of cached results, default is .cache/stages in the root of
+        the repository
+    max_size: int
+        maximum total size of cached results in bytes, default is 1 GB
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                key = stage_key(func, args, kwargs, files)
+            except TypeError as e:
+                warnings.warn('{0} is not cached: {1}'.format(func.__qualname__, e))
+                return func(*args, **kwargs)
+            file = lookup(key, cache_dir)
+            if file is not None:
+                return load(file)
+            value = func(*args, **kwargs)
+            try:
+                store(key, value, cache_dir, max_size)
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                warnings.warn('Result of {0} is not cached: {1}'.format(func.__qualname__, e))
+            return value
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+# cached versions of the expensive stages of the tutorial
+read_paths = cached(files=['filename'])(pp.Paths.read_file)
+read_temporal_network = cached(files=['filename'])(pp.TemporalNetwork.read_file)
+paths_from_origin_destination = cached()(pp.path_extraction.paths_from_origin_destination)
+paths_from_temporal_network_dag = cached()(pp.path_extraction.paths_from_temporal_network_dag)
+sample_causal_paths = cached()(validation_harness.sample_causal_paths)
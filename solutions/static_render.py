@@ -0,0 +1,389 @@
+"""
+Static images of networks without a browser. Networks, first-order
+projections of higher-order networks and snapshots of temporal networks
+are drawn with precomputed layouts (see layout.layout) into SVG files or
+into PNG files that are rasterised with numpy and encoded with zlib, so
+that reports with hundreds of figures or animation frames can be
+generated in batch jobs.
+"""
+import re
+import struct
+import zlib
+
+import numpy as np
+import pathpy as pp
+
+from solutions import animation_frames, layout, templates
+
+
+# named colours of CSS (and SVG), which can be used in PNG images in addition to #rgb, #rrggbb and rgb(r, g, b)
+COLORS = {
+    'aliceblue': '#f0f8ff', 'antiquewhite': '#faebd7', 'aqua': '#00ffff', 'aquamarine': '#7fffd4',
+    'azure': '#f0ffff', 'beige': '#f5f5dc', 'bisque': '#ffe4c4', 'black': '#000000', 'blanchedalmond': '#ffebcd',
+    'blue': '#0000ff', 'blueviolet': '#8a2be2', 'brown': '#a52a2a', 'burlywood': '#deb887',
+    'cadetblue': '#5f9ea0', 'chartreuse': '#7fff00', 'chocolate': '#d2691e', 'coral': '#ff7f50',
+    'cornflowerblue': '#6495ed', 'cornsilk': '#fff8dc', 'crimson': '#dc143c', 'cyan': '#00ffff',
+    'darkblue': '#00008b', 'darkcyan': '#008b8b', 'darkgoldenrod': '#b8860b', 'darkgray': '#a9a9a9',
+    'darkgreen': '#006400', 'darkgrey': '#a9a9a9', 'darkkhaki': '#bdb76b', 'darkmagenta': '#8b008b',
+    'darkolivegreen': '#556b2f', 'darkorange': '#ff8c00', 'darkorchid': '#9932cc', 'darkred': '#8b0000',
+    'darksalmon': '#e9967a', 'darkseagreen': '#8fbc8f', 'darkslateblue': '#483d8b', 'darkslategray': '#2f4f4f',
+    'darkslategrey': '#2f4f4f', 'darkturquoise': '#00ced1', 'darkviolet': '#9400d3', 'deeppink': '#ff1493',
+    'deepskyblue': '#00bfff', 'dimgray': '#696969', 'dimgrey': '#696969', 'dodgerblue': '#1e90ff',
+    'firebrick': '#b22222', 'floralwhite': '#fffaf0', 'forestgreen': '#228b22', 'fuchsia': '#ff00ff',
+    'gainsboro': '#dcdcdc', 'ghostwhite': '#f8f8ff', 'gold': '#ffd700', 'goldenrod': '#daa520',
+    'gray': '#808080', 'green': '#008000', 'greenyellow': '#adff2f', 'grey': '#808080', 'honeydew': '#f0fff0',
+    'hotpink': '#ff69b4', 'indianred': '#cd5c5c', 'indigo': '#4b0082', 'ivory': '#fffff0', 'khaki': '#f0e68c',
+    'lavender': '#e6e6fa', 'lavenderblush': '#fff0f5', 'lawngreen': '#7cfc00', 'lemonchiffon': '#fffacd',
+    'lightblue': '#add8e6', 'lightcoral': '#f08080', 'lightcyan': '#e0ffff', 'lightgoldenrodyellow': '#fafad2',
+    'lightgray': '#d3d3d3', 'lightgreen': '#90ee90', 'lightgrey': '#d3d3d3', 'lightpink': '#ffb6c1',
+    'lightsalmon': '#ffa07a', 'lightseagreen': '#20b2aa', 'lightskyblue': '#87cefa', 'lightslategray': '#778899',
+    'lightslategrey': '#778899', 'lightsteelblue': '#b0c4de', 'lightyellow': '#ffffe0', 'lime': '#00ff00',
+    'limegreen': '#32cd32', 'linen': '#faf0e6', 'magenta': '#ff00ff', 'maroon': '#800000',
+    'mediumaquamarine': '#66cdaa', 'mediumblue': '#0000cd', 'mediumorchid': '#ba55d3', 'mediumpurple': '#9370db',
+    'mediumseagreen': '#3cb371', 'mediumslateblue': '#7b68ee', 'mediumspringgreen': '#00fa9a',
+    'mediumturquoise': '#48d1cc', 'mediumvioletred': '#c71585', 'midnightblue': '#191970',
+    'mintcream': '#f5fffa', 'mistyrose': '#ffe4e1', 'moccasin': '#ffe4b5', 'navajowhite': '#ffdead',
+    'navy': '#000080', 'oldlace': '#fdf5e6', 'olive': '#808000', 'olivedrab': '#6b8e23', 'orange': '#ffa500',
+    'orangered': '#ff4500', 'orchid': '#da70d6', 'palegoldenrod': '#eee8aa', 'palegreen': '#98fb98',
+    'paleturquoise': '#afeeee', 'palevioletred': '#db7093', 'papayawhip': '#ffefd5', 'peachpuff': '#ffdab9',
+    'peru': '#cd853f', 'pink': '#ffc0cb', 'plum': '#dda0dd', 'powderblue': '#b0e0e6', 'purple': '#800080',
+    'rebeccapurple': '#663399', 'red': '#ff0000', 'rosybrown': '#bc8f8f', 'royalblue': '#4169e1',
+    'saddlebrown': '#8b4513', 'salmon': '#fa8072', 'sandybrown': '#f4a460', 'seagreen': '#2e8b57',
+    'seashell': '#fff5ee', 'sienna': '#a0522d', 'silver': '#c0c0c0', 'skyblue': '#87ceeb',
+    'slateblue': '#6a5acd', 'slategray': '#708090', 'slategrey': '#708090', 'snow': '#fffafa',
+    'springgreen': '#00ff7f', 'steelblue': '#4682b4', 'tan': '#d2b48c', 'teal': '#008080', 'thistle': '#d8bfd8',
+    'tomato': '#ff6347', 'turquoise': '#40e0d0', 'violet': '#ee82ee', 'wheat': '#f5deb3', 'white': '#ffffff',
+    'whitesmoke': '#f5f5f5', 'yellow': '#ffff00', 'yellowgreen': '#9acd32'
+}
+
+
+def to_rgb(color):
+    """
+    Converts a CSS colour given as #rgb, #rrggbb, rgb(r, g, b) or one of the
+    names in COLORS into an (r, g, b) tuple.
+    """
+    c = color.strip().lower()
+    c = COLORS.get(c, c)
+    if re.fullmatch('#[0-9a-f]{3}', c):
+        return tuple(int(h * 2, 16) for h in c[1:])
+    if re.fullmatch('#[0-9a-f]{6}', c):
+        return tuple(int(c[i:i + 2], 16) for i in (1, 3, 5))
+    m = re.fullmatch(r'rgb\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*\)', c)
+    if m:
+        return tuple(int(x) for x in m.groups())
+    raise ValueError('Unsupported colour: {0}'.format(color))
+
+
+def network_scene(network, positions=None, **params):
+    """
+    Returns the nodes and links of a (higher-order) network as drawn by
+    pp.visualisation.plot. For a HigherOrderNetwork with
+    plot_higher_order_nodes=False and for a MultiOrderModel, the links of
+    the first-order network are drawn, see projection.network_data.
+
+    Parameters:
+    -----------
+    network: Network, HigherOrderNetwork, MultiOrderModel
+        the network to draw
+    positions: dict
+        node positions. If None (default), the cached layout of the network
+        is used, see layout.layout.
+    params: dict
+        visualisation parameters, see pp.visualisation.plot. Supported are
+        width, height, node_color, node_size, node_text, edge_color,
+        edge_width, label_color, label_size and label_offset.
+
+    Returns:
+    --------
+    dict with the node names, positions, colours, sizes and labels as well
+    as the node index pairs, colours and widths of links
+    """
+    plot_higher_order_nodes = params.get('plot_higher_order_nodes', True) and not hasattr(network, 'layers')
+    if positions is None:
+        positions = layout.layout(network, plot_higher_order_nodes)
+    if hasattr(network, 'layers'):
+        network = network.layers[1]
+    elif isinstance(network, pp.HigherOrderNetwork) and not plot_higher_order_nodes:
+        network = pp.Network.from_paths(network.paths)
+    edges = list(network.edges)
+    return _scene(list(network.nodes), positions, edges,
+                  [templates.get_attr(params, e, 'edge_color', '#999999') for e in edges],
+                  [templates.get_attr(params, e, 'edge_width', 0.5) for e in edges],
+                  **params)
+
+
+def _scene(nodes, positions, edges, edge_color, edge_width, **params):
+    width, height = params.get('width', 400), params.get('height', 400)
+    scaled = layout.scale_layout(positions, width, height)
+    xy = np.array([scaled.get(v, (width / 2, height / 2)) for v in nodes], dtype=np.float64).reshape(-1, 2)
+    idx = {v: i for i, v in enumerate(nodes)}
+    return {
+        'width': width,
+        'height': height,
+        'nodes': nodes,
+        'xy': xy,
+        'node_color': [templates.get_attr(params, v, 'node_color', '#99ccff') for v in nodes],
+        'node_size': np.array([templates.get_attr(params, v, 'node_size', 5.0) for v in nodes], dtype=np.float64),
+        'node_text': [str(templates.get_attr(params, v, 'node_text', v)) for v in nodes],
+        'edges': np.array([(idx[v], idx[w]) for v, w in edges], dtype=np.int64).reshape(-1, 2),
+        'edge_color': edge_color,
+        'edge_width': np.array(edge_width, dtype=np.float64),
+        'label_color': params.get('label_color', '#999999'),
+        'label_size': params.get('label_size', '8px'),
+        'label_offset': params.get('label_offset', [0, -10])
+    }
+
+
+def temporal_scene(tempnet, start, end, positions=None, **params):
+    """
+    Returns a snapshot of a temporal network, which shows the links that
+    are active between time start and end (inclusive) with the colours of
+    active nodes and edges in pathpy's temporal network visualisation.
+
+    Parameters:
+    -----------
+    tempnet: TemporalNetwork
+        the temporal network to draw
+    start: int
+        first time stamp of the snapshot
+    end: int
+        last time stamp of the snapshot
+    positions: dict
+        node positions. If None (default), the cached layout of the
+        time-aggregated network is used.
+    params: dict
+        visualisation parameters, see pp.visualisation.plot. Supported are
+        width, height, node_size, active_node_color, inactive_node_color,
+        active_edge_color, active_edge_width and the label parameters.
+    """
+    if positions is None:
+        positions = layout.layout(pp.Network.from_temporal_network(tempnet))
+    edges = sorted({(v, w) for v, w, t in tempnet.tedges if start <= t <= end})
+    active = {v for e in edges for v in e}
+    node_color = {v: params.get('active_node_color', '#ff0000') if v in active
+                  else params.get('inactive_node_color', '#cccccc') for v in tempnet.nodes}
+    return _scene(list(tempnet.nodes), positions, edges,
+                  [params.get('active_edge_color', '#ff0000')] * len(edges),
+                  [params.get('active_edge_width', 4.0)] * len(edges),
+                  **{**params, 'node_color': node_color})
+
+
+def to_svg(scene, labels=True):
+    """
+    Returns an SVG image of a scene.
+
+    Parameters:
+    -----------
+    scene: dict
+        scene returned by network_scene or temporal_scene
+    labels: bool
+        whether or not to draw node labels (default True)
+    """
+    xy, edges = scene['xy'], scene['edges']
+    out = ['<svg xmlns="http://www.w3.org/2000/svg" width="{0}" height="{1}">\n'.format(
+        scene['width'], scene['height'])]
+    out.append('<rect width="100%" height="100%" fill="#ffffff"/>\n<g stroke-linecap="round">\n')
+    for (i, j), color, w in zip(edges, scene['edge_color'], scene['edge_width']):
+        out.append('<line x1="%.2f" y1="%.2f" x2="%.2f" y2="%.2f" stroke="%s" stroke-width="%g"/>\n'
+                   % (xy[i, 0], xy[i, 1], xy[j, 0], xy[j, 1], color, w))
+    out.append('</g>\n<g stroke="#ffffff" stroke-width="0.5">\n')
+    for (x, y), color, r in zip(xy, scene['node_color'], scene['node_size']):
+        out.append('<circle cx="%.2f" cy="%.2f" r="%g" fill="%s"/>\n' % (x, y, r, color))
+    out.append('</g>\n')
+    if labels:
+        dx, dy = scene['label_offset']
+        out.append('<g text-anchor="middle" font-family="Arial, Helvetica, sans-serif" '
+                   'font-size="{0}" fill="{1}">\n'.format(scene['label_size'], scene['label_color']))
+        for (x, y), text in zip(xy, scene['node_text']):
+            text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            out.append('<text x="%.2f" y="%.2f">%s</text>\n' % (x + dx, y + dy, text))
+        out.append('</g>\n')
+    out.append('</svg>\n')
+    return ''.join(out)
+
+
+def _stamp(pixels, x, y, colors, offsets):
+    # sets the pixels at (x, y) + offset for all points and offsets
+    h, w = pixels.shape[:2]
+    for dx, dy in offsets:
+        px, py = x + dx, y + dy
+        ok = (px >= 0) & (px < w) & (py >= 0) & (py < h)
+        pixels[py[ok], px[ok]] = colors[ok]
+
+
+def rasterise(scene):
+    """
+    Rasterises a scene into an RGB image, i.e. an array of shape
+    height x width x 3. Links are drawn with square brushes and nodes as
+    filled discs; node labels are not drawn.
+
+    Parameters:
+    -----------
+    scene: dict
+        scene returned by network_scene or temporal_scene
+    """
+    pixels = np.full((int(scene['height']), int(scene['width']), 3), 255, dtype=np.uint8)
+    xy, edges = scene['xy'], scene['edges']
+
+    if len(edges):
+        colors = np.array([to_rgb(c) for c in scene['edge_color']], dtype=np.uint8)
+        p0, p1 = xy[edges[:, 0]], xy[edges[:, 1]]
+        # sample each link at (at least) one point per pixel
+        n = np.ceil(np.abs(p1 - p0).max(axis=1)).astype(np.int64) + 1
+        link = np.repeat(np.arange(len(edges)), n)
+        t = (np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)) / np.maximum(np.repeat(n, n) - 1, 1)
+        points = np.rint(p0[link] + t[:, None] * (p1 - p0)[link]).astype(np.int64)
+        half = np.maximum(np.rint(scene['edge_width'] / 2 - 0.5), 0).astype(np.int64)[link]
+        for h in np.unique(half):
+            sel = half == h
+            offsets = [(dx, dy) for dx in range(-h, h + 1) for dy in range(-h, h + 1)]
+            _stamp(pixels, points[sel, 0], points[sel, 1], colors[link[sel]], offsets)
+
+    if len(xy):
+        colors = np.array([to_rgb(c) for c in scene['node_color']], dtype=np.uint8)
+        centers = np.rint(xy).astype(np.int64)
+        radius = np.rint(scene['node_size']).astype(np.int64)
+        for r in np.unique(radius):
+            sel = radius == r
+            offsets = [(dx, dy) for dx in range(-r, r + 1) for dy in range(-r, r + 1) if dx * dx + dy * dy <= r * r]
+            _stamp(pixels, centers[sel, 0], centers[sel, 1], colors[sel], offsets)
+    return pixels
+
+
+def to_png(pixels, level=6):
+    """
+    Encodes an RGB image returned by rasterise as PNG.
+
+    Parameters:
+    -----------
+    pixels: ndarray
+        array of shape height x width x 3 with dtype uint8
+    level: int
+        zlib compression level
+    """
+    h, w = pixels.shape[:2]
+    raw = np.zeros((h, 1 + 3 * w), dtype=np.uint8)
+    raw[:, 1:] = pixels.reshape(h, 3 * w)
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', w, h, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw.tobytes(), level))
+            + chunk(b'IEND', b''))
+
+
+def write(scene, filename, labels=True):
+    """
+    Writes a scene to an SVG or PNG file, depending on the file extension.
+
+    Parameters:
+    -----------
+    scene: dict
+        scene returned by network_scene or temporal_scene
+    filename: str
+        path of the .svg or .png file
+    labels: bool
+        whether or not to draw node labels in SVG images
+    """
+    if filename.lower().endswith('.svg'):
+        with open(filename, 'w') as f:
+            f.write(to_svg(scene, labels))
+    elif filename.lower().endswith('.png'):
+        with open(filename, 'wb') as f:
+            f.write(to_png(rasterise(scene)))
+    else:
+        raise ValueError('File name must end with .svg or .png: {0}'.format(filename))
+
+
+def render(network, filename, positions=None, **params):
+    """
+    Draws a (higher-order) network into an SVG or PNG file. Static
+    counterpart of pp.visualisation.export_html.
+
+    Parameters:
+    -----------
+    network: Network, HigherOrderNetwork, MultiOrderModel
+        the network to draw
+    filename: str
+        path of the .svg or .png file
+    positions: dict
+        node positions, default is the cached layout of the network
+    params: dict
+        visualisation parameters, see network_scene
+    """
+    write(network_scene(network, positions, **params), filename)
+
+
+def render_frames(tempnet, filename, positions=None, **params):
+    """
+    Draws the frames of an animated temporal network with the semantics of
+    pathpy's temporal network visualisation (see animation_frames) into
+    one image per frame. Edges within the look_behind / look_ahead window
+    are drawn in the inactive colour, edges that are active in a frame and
+    their nodes in the active colour.
+
+    Parameters:
+    -----------
+    tempnet: TemporalNetwork
+        the temporal network to draw
+    filename: str
+        pattern of the .svg or .png file names, which is formatted with the
+        frame number, e.g. 'frames/frame_{0:05d}.png'
+    positions: dict
+        node positions. If None (default), the cached layout of the
+        time-aggregated network is used.
+    params: dict
+        visualisation parameters, see temporal_scene, as well as
+        ts_per_frame, look_ahead, look_behind, max_time, inactive_edge_color
+        and inactive_edge_width
+
+    Returns:
+    --------
+    list of the written file names
+    """
+    if positions is None:
+        positions = layout.layout(pp.Network.from_temporal_network(tempnet))
+    frames = animation_frames.compute_frames(tempnet,
+                                             ts_per_frame=params.get('ts_per_frame', 1),
+                                             look_ahead=params.get('look_ahead', 10),
+                                             look_behind=params.get('look_behind', 10),
+                                             max_time=params.get('max_time'))
+    nodes, pairs = frames['nodes'], frames['edges']
+    base = _scene(nodes, positions, [], [], [], **params)
+    inactive = [params.get('inactive_node_color', '#cccccc')] * len(nodes)
+    colors = {'inactive_edge': params.get('inactive_edge_color', '#cccccc'),
+              'active_edge': params.get('active_edge_color', '#ff0000'),
+              'active_node': params.get('active_node_color', '#ff0000')}
+    widths = {'inactive_edge': params.get('inactive_edge_width', 0.5),
+              'active_edge': params.get('active_edge_width', 4.0)}
+
+    pointers = {}
+    for key in ['enter', 'leave', 'active']:
+        counts, ids = frames[key]
+        pointers[key] = (np.append(0, np.cumsum(counts)), ids)
+
+    visible = np.zeros(len(pairs), dtype=bool)
+    filenames = []
+    for f in range(frames['num_frames']):
+        ptr, ids = pointers['leave']
+        visible[ids[ptr[f]:ptr[f + 1]]] = False
+        ptr, ids = pointers['enter']
+        visible[ids[ptr[f]:ptr[f + 1]]] = True
+        ptr, ids = pointers['active']
+        active = ids[ptr[f]:ptr[f + 1]]
+        shown = np.flatnonzero(visible)
+
+        node_color = list(inactive)
+        for i in np.unique(pairs[active].ravel()):
+            node_color[i] = colors['active_node']
+        scene = dict(base,
+                     edges=np.concatenate([pairs[shown], pairs[active]]),
+                     edge_color=[colors['inactive_edge']] * len(shown) + [colors['active_edge']] * len(active),
+                     edge_width=np.array([widths['inactive_edge']] * len(shown) + [widths['active_edge']] * len(active),
+                                         dtype=np.float64),
+                     node_color=node_color)
+        filenames.append(filename.format(f))
+        write(scene, filenames[-1])
+    return filenames
@@ -0,0 +1,289 @@
+"""
+Synthetic temporal networks and path data with a known cluster structure
+and a known causal order, for scale tests of the methods in
+7_optimal_analysis. temporal_clusters.tedges has 60,000 events between 30
+nodes in three clusters. Here, walkers move through a random network in
+which every node has the same number of links into every cluster, and the
+cluster of each next node is, with probability p, that of the node visited
+order steps earlier. First-order statistics therefore carry no information
+about the clusters for order > 1, while a model of the given order
+recovers them. All walkers are advanced together with numpy, so that
+networks with millions of events are generated in seconds and written to
+.tedges and .ngram files or to numpy files that are read much faster.
+
+    python -m solutions.synthetic --nodes 300 --clusters 10 --events 6000000 --tedges data/synthetic.tedges --gt data/synthetic_gt.json
+"""
+import argparse
+import json
+
+import numpy as np
+import pathpy as pp
+
+
+class PlantedModel:
+    """
+    Random network with planted clusters and a memory of a given order.
+    Nodes 0..n-1 are split into clusters of (almost) equal size, and each
+    node links to degree randomly chosen nodes in every cluster.
+    """
+
+    def __init__(self, nodes=30, clusters=3, degree=4, order=2, p=0.9, seed=None):
+        """
+        Parameters:
+        -----------
+        nodes: int
+            number of nodes
+        clusters: int
+            number of clusters
+        degree: int
+            number of links of each node into each cluster
+        order: int
+            memory order: the next node is likely to be in the cluster of
+            the node visited order steps earlier. For order=1, the clusters
+            are visible in the first-order network.
+        p: float
+            probability that the next step follows the planted cluster,
+            otherwise the cluster is chosen uniformly at random
+        seed: int
+            seed of the random number generator
+        """
+        if order < 1:
+            raise ValueError('order must be at least 1')
+        self.order = order
+        self.p = p
+        self.rng = np.random.default_rng(seed)
+        self.labels = np.arange(nodes) * clusters // nodes
+        members = [np.flatnonzero(self.labels == c) for c in range(clusters)]
+        # neighbours[v, c, i] is the i-th neighbour of node v in cluster c
+        self.neighbours = np.stack([m[self.rng.integers(len(m), size=(nodes, degree))] for m in members], axis=1)
+
+    @property
+    def nodes(self):
+        return len(self.labels)
+
+    @property
+    def clusters(self):
+        return self.neighbours.shape[1]
+
+    def step(self, current, memory):
+        """
+        Returns the next node of each walker.
+
+        Parameters:
+        -----------
+        current: ndarray
+            current node of each walker
+        memory: ndarray
+            node visited order-1 steps before the current node, or -1 if the
+            walk is shorter than that
+        """
+        n = len(current)
+        cluster = self.rng.integers(self.clusters, size=n)
+        planted = (memory >= 0) & (self.rng.random(n) < self.p)
+        cluster[planted] = self.labels[memory[planted]]
+        return self.neighbours[current, cluster, self.rng.integers(self.neighbours.shape[2], size=n)]
+
+    def walks(self, num_walks, l=10):
+        """
+        Returns an integer array of shape num_walks x (l+1) with the nodes
+        visited by independent walks with l steps each. l must be at least
+        the order of the model, since shorter walks do not contain the
+        planted dependencies.
+        """
+        self._check_length(l)
+        walks = np.empty((num_walks, l + 1), dtype=np.int64)
+        walks[:, 0] = self.rng.integers(self.nodes, size=num_walks)
+        unknown = np.full(num_walks, -1, dtype=np.int64)
+        for s in range(1, l + 1):
+            walks[:, s] = self.step(walks[:, s - 1], walks[:, s - self.order] if s >= self.order else unknown)
+        return walks
+
+    def _check_length(self, l):
+        if l < self.order:
+            raise ValueError('walks with {0} steps do not contain the planted dependencies of order {1}, '
+                             'the walk length must be at least the order'.format(l, self.order))
+
+    def events(self, num_events, walkers=1, walk_length=2, time_unit=1):
+        """
+        Returns the source, target and time of num_events time-stamped
+        links, sorted by time. Walks with walk_length steps are made by
+        concurrent walkers, each of which makes one step per time stamp and
+        starts a new walk at a random node when the previous one ends. With
+        delta=time_unit, the walks are time-respecting paths, mixed with
+        paths that combine the links of different walks. The defaults match
+        temporal_clusters.tedges, which has one link per time stamp and
+        walks of two steps.
+
+        Parameters:
+        -----------
+        num_events: int
+            number of time-stamped links
+        walkers: int
+            number of concurrent walkers, i.e. links per time stamp. Many
+            walkers in a small network create long chains of causally
+            connected links, which makes path extraction slow.
+        walk_length: int
+            number of steps of each walk, at least the order of the model
+        time_unit: int
+            difference between consecutive time stamps
+        """
+        self._check_length(walk_length)
+        rounds = -(-num_events // (walkers * walk_length))
+        walks = self.walks(rounds * walkers, walk_length).reshape(rounds, walkers, walk_length + 1)
+        # walk (r, w) is made by walker w in round r, step s of it happens at time (r * walk_length + s) * time_unit
+        source = walks[:, :, :-1].transpose(0, 2, 1).ravel()[:num_events]
+        target = walks[:, :, 1:].transpose(0, 2, 1).ravel()[:num_events]
+        time = np.repeat(np.arange(rounds * walk_length, dtype=np.int64) * time_unit, walkers)[:num_events]
+        return source, target, time
+
+    def ground_truth(self):
+        """
+        Returns the cluster of each node by node name and the parameters of
+        the model as a dict.
+        """
+        return {'order': self.order, 'p': self.p, 'degree': int(self.neighbours.shape[2]),
+                'clusters': {str(v): int(c) for v, c in enumerate(self.labels)}}
+
+
+def _names(n):
+    return np.array([str(v) for v in range(n)])
+
+
+def _count_rows(walks):
+    # distinct walks and the number of times each of them occurs
+    return np.unique(walks, axis=0, return_counts=True)
+
+
+def to_paths(walks, max_subpath_length=None):
+    """
+    Returns the walks of PlantedModel.walks as a Paths object, with node
+    names as strings.
+    """
+    paths = pp.Paths()
+    if max_subpath_length is not None:
+        paths.max_subpath_length = max_subpath_length
+    rows, counts = _count_rows(walks)
+    names = _names(walks.max() + 1 if walks.size else 0)
+    for row, c in zip(names[rows].tolist(), counts.tolist()):
+        paths.add_path(tuple(row), frequency=c)
+    return paths
+
+
+def to_temporal_network(source, target, time):
+    """
+    Returns the links of PlantedModel.events as a TemporalNetwork.
+    """
+    names = _names(max(source.max(), target.max()) + 1 if len(source) else 0)
+    return pp.TemporalNetwork(tedges=list(zip(names[source].tolist(), names[target].tolist(), time.tolist())))
+
+
+def _write_lines(f, columns, chunk_size=1000000):
+    # writes comma-separated string columns, one chunk of rows at a time
+    for start in range(0, len(columns[0]), chunk_size):
+        chunk = [c[start:start + chunk_size].tolist() for c in columns]
+        f.write('\n'.join(map(','.join, zip(*chunk))))
+        f.write('\n')
+
+
+def write_ngram(walks, file, frequency=True):
+    """
+    Writes walks to an n-gram file that can be read with pp.Paths.read_file.
+    If frequency is True (default), each distinct walk is written once,
+    followed by the number of times it occurs (read with frequency=True),
+    otherwise each walk is written on a line of its own.
+    """
+    names = _names(walks.max() + 1 if walks.size else 0)
+    if frequency:
+        walks, counts = _count_rows(walks)
+    columns = [names[walks[:, i]] for i in range(walks.shape[1])]
+    if frequency:
+        columns.append(counts.astype(np.float64).astype(str))
+    with open(file, 'w') as f:
+        _write_lines(f, columns)
+
+
+def write_tedges(source, target, time, file):
+    """
+    Writes time-stamped links to a .tedges file that can be read with
+    pp.TemporalNetwork.read_file.
+    """
+    names = _names(max(source.max(), target.max()) + 1 if len(source) else 0)
+    with open(file, 'w') as f:
+        f.write('source,target,time\n')
+        _write_lines(f, [names[source], names[target], time.astype(str)])
+
+
+def save_walks(walks, file):
+    """
+    Saves walks to a numpy file, see load_walks.
+    """
+    np.save(file, walks)
+
+
+def load_walks(file):
+    """
+    Loads walks saved with save_walks as an integer array, which can be
+    turned into a Paths object with to_paths.
+    """
+    return np.load(file)
+
+
+def save_events(source, target, time, file):
+    """
+    Saves time-stamped links to a compressed numpy file with the arrays
+    source, target and time, see load_events.
+    """
+    np.savez_compressed(file, source=source, target=target, time=time)
+
+
+def load_events(file):
+    """
+    Loads the arrays saved with save_events as (source, target, time),
+    which can be turned into a TemporalNetwork with to_temporal_network.
+    """
+    data = np.load(file)
+    return data['source'], data['target'], data['time']
+
+
+def write_ground_truth(model, file):
+    """
+    Writes the clusters and parameters of a model to a JSON file.
+    """
+    with open(file, 'w') as f:
+        json.dump(model.ground_truth(), f)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generates synthetic temporal networks and paths with '
+                                                 'planted clusters and a known memory order.')
+    parser.add_argument('--nodes', type=int, default=30)
+    parser.add_argument('--clusters', type=int, default=3)
+    parser.add_argument('--degree', type=int, default=4, help='links of each node into each cluster')
+    parser.add_argument('--order', type=int, default=2, help='memory order of the planted dependencies')
+    parser.add_argument('--p', type=float, default=0.9, help='probability of following the planted cluster')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--events', type=int, default=60000, help='number of time-stamped links')
+    parser.add_argument('--walkers', type=int, default=1, help='concurrent walkers in the temporal network')
+    parser.add_argument('--walk-length', type=int, default=2,
+                        help='steps of each walk in the temporal network, at least --order')
+    parser.add_argument('--time-unit', type=int, default=1)
+    parser.add_argument('--paths', type=int, default=0, help='number of walks written to --ngram')
+    parser.add_argument('--path-length', type=int, default=10, help='steps of each walk written to --ngram')
+    parser.add_argument('--tedges', help='.tedges or .npz file for the temporal network')
+    parser.add_argument('--ngram', help='.ngram or .npy file for the walks')
+    parser.add_argument('--gt', help='JSON file for the clusters and parameters')
+    args = parser.parse_args()
+    if args.tedges and args.walk_length < args.order:
+        parser.error('--walk-length must be at least --order, otherwise no dependencies are planted')
+    if args.ngram and args.paths and args.path_length < args.order:
+        parser.error('--path-length must be at least --order, otherwise no dependencies are planted')
+
+    model = PlantedModel(args.nodes, args.clusters, args.degree, args.order, args.p, args.seed)
+    if args.tedges:
+        events = model.events(args.events, args.walkers, args.walk_length, args.time_unit)
+        (save_events if args.tedges.endswith('.npz') else write_tedges)(*events, args.tedges)
+    if args.ngram and args.paths:
+        walks = model.walks(args.paths, args.path_length)
+        (save_walks if args.ngram.endswith('.npy') else write_ngram)(walks, args.ngram)
+    if args.gt:
+        write_ground_truth(model, args.gt)
@@ -0,0 +1,331 @@
+"""
+Cached, precompiled visualisation templates. pathpy reads and parses the
+template file every time it generates HTML, which adds up when hundreds
+of animations are exported with the same (custom) template. Here, each
+template is parsed once into literal text and placeholder slots, cached
+based on its path and modification time, and filled with the same
+parameters that pathpy computes for a network. The network data is only
+computed if the template uses it and it is not given as a parameter.
+"""
+import json
+import os
+import random
+import string
+
+import numpy as np
+import pathpy as pp
+
+
+ASSETS = os.path.join(os.path.dirname(os.path.realpath(pp.visualisation.html.__file__)),
+                      os.path.pardir, 'visualisation_assets')
+
+# default parameters of pathpy's templates, see pp.visualisation.html
+_NETWORK_DEFAULTS = {
+    'plot_higher_order_nodes': True, 'height': 400, 'width': 400, 'label_size': '8px', 'label_offset': [0, -10],
+    'label_color': '#999999', 'label_opacity': 1.0, 'edge_opacity': 1.0, 'force_repel': -200, 'force_charge': -20,
+    'force_alpha': 0.0, 'd3js_path': 'https://d3js.org/d3.v4.min.js'
+}
+_TEMPNET_DEFAULTS = {
+    'ms_per_frame': 50, 'ts_per_frame': 1, 'max_time': None, 'look_ahead': 10, 'look_behind': 10, 'width': 400,
+    'height': 400, 'label_size': '8px', 'label_offset': [0, -10], 'label_color': '#cccccc', 'label_opacity': 1.0,
+    'force_repel': -200, 'force_charge': -20, 'force_alpha': 0.0, 'node_size': 5.0, 'active_edge_color': '#ff0000',
+    'edge_opacity': 1.0, 'inactive_edge_width': 0.5, 'active_edge_width': 4.0, 'inactive_edge_color': '#cccccc',
+    'active_node_color': '#ff0000', 'inactive_node_color': '#cccccc', 'd3js_path': 'https://d3js.org/d3.v4.min.js'
+}
+_PATHS_DEFAULTS = {
+    'width': 400, 'height': 400, 'd3js_path': 'http://d3js.org/d3.v3.min.js'
+}
+
+# compiled templates by absolute path, see load
+_cache = {}
+
+
+class CompiledTemplate:
+    """
+    A template in the format of string.Template that has been split into
+    literal text and placeholders, so that it can be filled without
+    scanning the template text again.
+    """
+
+    def __init__(self, text):
+        """
+        Parameters:
+        -----------
+        text: str
+            template text with $name or ${name} placeholders and $$ escapes
+        """
+        self.parts = []
+        self.slots = []
+        pos = 0
+        for m in string.Template.pattern.finditer(text):
+            literal = text[pos:m.start()]
+            name = m.group('named') or m.group('braced')
+            if m.group('escaped') is not None:
+                literal += '$'
+            elif name is None:
+                lineno = text.count('\n', 0, m.start('invalid')) + 1
+                raise ValueError('Invalid placeholder in template: line {0}'.format(lineno))
+            self.parts.append(literal)
+            if name is not None:
+                self.slots.append((len(self.parts), name))
+                self.parts.append(None)
+            pos = m.end()
+        self.parts.append(text[pos:])
+        self.placeholders = list(dict.fromkeys(name for _, name in self.slots))
+
+    def substitute(self, mapping):
+        """
+        Fills the placeholders with the values in mapping, with the same
+        result as string.Template(text).substitute(mapping).
+        """
+        parts = list(self.parts)
+        for i, name in self.slots:
+            parts[i] = str(mapping[name])
+        return ''.join(parts)
+
+
+def fix_node_name(v):
+    """
+    Turns a node into a valid HTML id, in the same way as
+    pp.visualisation.html does for (higher-order) networks.
+    """
+    if str(v)[0].isdigit():
+        return "n_" + str(v)
+    return str(v)
+
+
+def get_attr(params, key, attr_name, attr_default):
+    """
+    Returns the value of a node or edge attribute like node_color, which
+    is either given as a scalar for all nodes or edges, or as a dict with
+    values for some of them, as in pp.visualisation.plot.
+    """
+    value = params.get(attr_name, attr_default)
+    if isinstance(value, dict):
+        return value.get(key, attr_default)
+    return value
+
+
+def load(template_file):
+    """
+    Returns the compiled template in a file, which is only read and parsed
+    again if the file has been modified since it was last loaded.
+
+    Parameters:
+    -----------
+    template_file: str
+        path of the template file
+    """
+    path = os.path.abspath(template_file)
+    mtime = os.stat(path).st_mtime_ns
+    if path not in _cache or _cache[path][0] != mtime:
+        with open(path) as f:
+            _cache[path] = (mtime, CompiledTemplate(f.read()))
+    return _cache[path][1]
+
+
+def default_template(network):
+    """
+    Returns the path of pathpy's default template for a network, temporal
+    network or paths object.
+    """
+    if isinstance(network, pp.TemporalNetwork):
+        return os.path.join(ASSETS, 'tempnet_template.html')
+    if isinstance(network, pp.Paths):
+        return os.path.join(ASSETS, 'paths_template.html')
+    return os.path.join(ASSETS, 'network_template.html')
+
+
+def _fix_tempnet_node_name(v):
+    # node ids of temporal networks, as in pp.visualisation.html
+    new_v = fix_node_name(v)
+    if new_v[0] == '_':
+        new_v = "n_" + str(v)
+    return new_v.replace('-', '_')
+
+
+def _force_weight(network, e, params):
+    # normalized force weight of an edge, as in pp.visualisation.html
+    if not params.get('force_weighted', True):
+        weight = network.edges[e]['degree']
+        source_weight = network.nodes[e[0]]['indegree'] + network.nodes[e[0]]['outdegree']
+        target_weight = network.nodes[e[1]]['indegree'] + network.nodes[e[1]]['outdegree']
+    else:
+        weight = network.edges[e]['weight']
+        source_weight = network.nodes[e[0]]['inweight'] + network.nodes[e[0]]['outweight']
+        target_weight = network.nodes[e[1]]['inweight'] + network.nodes[e[1]]['outweight']
+    if isinstance(weight, np.ndarray):
+        weight, source_weight, target_weight = weight.sum(), source_weight.sum(), target_weight.sum()
+    s = min(source_weight, target_weight)
+    return weight/s if s > 0.0 else 0.0
+
+
+def _network_data(network, params):
+    # JSON data of a (higher-order) network or multi-order model, as in pp.visualisation.html
+    layers = []
+    if isinstance(network, pp.HigherOrderNetwork):
+        if not params['plot_higher_order_nodes']:
+            layers = [network]
+            network = pp.Network.from_paths(network.paths)
+    elif isinstance(network, pp.MultiOrderModel):
+        layers = [network.layers[k] for k in range(1, network.max_order+1)]
+        network = network.layers[1]
+
+    data = {'links': [{'source': fix_node_name(e[0]),
+                       'target': fix_node_name(e[1]),
+                       'color': get_attr(params, (e[0], e[1]), 'edge_color', '#999999'),
+                       'width': get_attr(params, (e[0], e[1]), 'edge_width', 0.5),
+                       'weight': _force_weight(network, e, params) if not layers else 0.0
+                       } for e in network.edges],
+            'nodes': [{'id': fix_node_name(v),
+                       'text': get_attr(params, v, 'node_text', fix_node_name(v)),
+                       'color': get_attr(params, v, 'node_color', '#99ccff'),
+                       'size': get_attr(params, v, 'node_size', 5.0)} for v in network.nodes]}
+
+    # invisible links for the forces between the first and last node of higher-order edges
+    forces = pp.Network()
+    for layer in layers:
+        for e in layer.edges:
+            v = fix_node_name(layer.higher_order_node_to_path(e[0])[0])
+            w = fix_node_name(layer.higher_order_node_to_path(e[1])[-1])
+            weight = layer.edges[e]['weight']
+            if (v, w) in forces.edges:
+                weight = forces.edges[(v, w)]['weight'] + weight
+            forces.add_edge(v, w, weight=weight)
+    for v, w in forces.edges:
+        data['links'].append({'source': v, 'target': w, 'width': 0.0,
+                              'weight': _force_weight(forces, (v, w), params), 'color': ' #999999'})
+    return data
+
+
+def _tempnet_data(tempnet, params):
+    # JSON data of a temporal network, as in pp.visualisation.html
+    return {'nodes': [{'id': _fix_tempnet_node_name(v), 'group': 1} for v in tempnet.nodes],
+            'links': [{'source': _fix_tempnet_node_name(v), 'target': _fix_tempnet_node_name(w),
+                       'width': 1, 'time': t} for v, w, t in tempnet.tedges]}
+
+
+def _paths_data(paths, params):
+    # JSON data of the alluvial diagram of paths through a node, as in pp.visualisation.html
+    if params.get('markov', False):
+        n = pp.visualisation.alluvial.generate_memory_net_markov(pp.HigherOrderNetwork(paths, k=1), params['node'],
+                                                                 self_loops=params.get('self_loops', True))
+    else:
+        n = pp.visualisation.alluvial.generate_memory_net(paths, params['node'],
+                                                          self_loops=params.get('self_loops', True))
+    node_idx = {v: i for i, v in enumerate(n.nodes)}
+    return {'nodes': [{'name': v, 'id': v} for v in n.nodes],
+            'links': [{'source': node_idx[e[0]], 'target': node_idx[e[1]], 'value': n.edges[e]['weight']}
+                      for e in n.edges]}
+
+
+def template_parameters(network, compiled, **params):
+    """
+    Returns the values that pathpy substitutes for the placeholders of a
+    compiled template, including default parameters, the div id and the
+    network data. The network data is not computed if it is given in
+    params or not used by the template.
+
+    Parameters:
+    -----------
+    network: Network, HigherOrderNetwork, MultiOrderModel, TemporalNetwork, Paths
+        the network to visualise
+    compiled: CompiledTemplate
+        the template whose placeholders are returned
+    params: dict
+        visualisation parameters, see pp.visualisation.plot
+    """
+    if isinstance(network, pp.TemporalNetwork):
+        params = {**_TEMPNET_DEFAULTS, **params}
+        if params['max_time'] is not None:
+            network = network.filter_edges(lambda u, v, t: t <= params['max_time'])
+        if params['ts_per_frame'] == 0:
+            # shows five interactions per frame on average
+            fps = 1000.0/float(params['ms_per_frame'])
+            x = np.mean(network.inter_event_times())/fps
+            params['ts_per_frame'] = np.max([1, int(20 * x)])
+        data_name, data = 'network_data', _tempnet_data
+    elif isinstance(network, pp.Paths):
+        params = {**_PATHS_DEFAULTS, **params}
+        if 'node' not in params:
+            params['node'] = list(network.nodes)[0]
+        data_name, data = 'flow_data', _paths_data
+    else:
+        params = {**_NETWORK_DEFAULTS, **params}
+        directed = (network.layers[1] if isinstance(network, pp.MultiOrderModel) else network).directed
+        params['edge_arrows'] = str(params.get('edge_arrows', True)).lower() if directed else 'false'
+        data_name, data = 'network_data', _network_data
+
+    values = {'div_id': ''.join(random.choice(string.ascii_letters) for x in range(8))}
+    if data_name in compiled.placeholders and data_name not in params:
+        values[data_name] = json.dumps(data(network, params))
+    values.update(params)
+    return {name: values[name] for name in compiled.placeholders}
+
+
+def generate_html(network, **params):
+    """
+    Generates the same HTML as pp.visualisation.generate_html, using a
+    cached, precompiled template.
+
+    Parameters:
+    -----------
+    network: Network, HigherOrderNetwork, MultiOrderModel, TemporalNetwork, Paths
+        the network to visualise
+    params: dict
+        visualisation parameters, see pp.visualisation.plot
+    """
+    compiled = load(params.get('template', default_template(network)))
+    return compiled.substitute(template_parameters(network, compiled, **params))
+
+
+def export_html(network, filename, **params):
+    """
+    Exports a stand-alone HTML file like pp.visualisation.export_html,
+    using a cached, precompiled template.
+
+    Parameters:
+    -----------
+    network: Network, HigherOrderNetwork, MultiOrderModel, TemporalNetwork, Paths
+        the network to visualise
+    filename: str
+        path where the HTML file will be saved
+    params: dict
+        visualisation parameters, see pp.visualisation.plot
+    """
+    export_batch([(network, filename)], **params)
+
+
+def export_batch(items, generate=generate_html, **params):
+    """
+    Exports many networks with the same template and parameters, e.g. one
+    animation per day of a temporal network.
+
+    Parameters:
+    -----------
+    items: iterable
+        (network, filename) pairs or (network, filename, item_params)
+        triples, where item_params is a dict of parameters that override
+        params for this network, e.g. a custom chapter_data per animation
+    generate: function
+        function that generates the HTML of a network with the given
+        parameters, e.g. compact_html.generate_html. Default is
+        generate_html, i.e. pathpy's network data in a cached template.
+    params: dict
+        visualisation parameters, see pp.visualisation.plot
+
+    Returns:
+    --------
+    list of the exported file names
+    """
+    filenames = []
+    for item in items:
+        network, filename = item[0], item[1]
+        item_params = {**params, **(item[2] if len(item) > 2 else {})}
+        html = generate(network, **item_params)
+        if 'template' not in item_params:
+            html = '<!DOCTYPE html>\n<html><body>\n' + html + '</body>\n</html>'
+        with open(filename, 'w+') as f:
+            f.write(html)
+        filenames.append(filename)
+    return filenames
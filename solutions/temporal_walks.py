@@ -0,0 +1,145 @@
+"""
+Batched random walks in temporal networks. Instead of scanning all time
+stamps for every step of every walker like
+pp.algorithms.random_walk.generate_walk, time-stamped edges are sorted
+into a CSR-style index by source node and time once, and all walkers are
+advanced simultaneously by a binary search for the next time at which
+their current node has an outgoing edge.
+"""
+import numpy as np
+
+
+class TemporalEdgeIndex:
+    """
+    Time-sorted index of the outgoing time-stamped edges of all nodes in a
+    temporal network. Edges with the same source and time stamp form a
+    group, groups are sorted by source and time and each group points to a
+    contiguous block of (distinct) targets.
+    """
+
+    def __init__(self, tempnet):
+        """
+        Parameters:
+        -----------
+        tempnet: TemporalNetwork
+            the temporal network to index
+        """
+        self.nodes = np.array(tempnet.nodes)
+        self.times = np.array(tempnet.ordered_times)
+        node_idx = {v: i for i, v in enumerate(tempnet.nodes)}
+        time_idx = {t: i for i, t in enumerate(tempnet.ordered_times)}
+        n = len(tempnet.tedges)
+        src = np.fromiter((node_idx[v] for v, _, _ in tempnet.tedges), dtype=np.int64, count=n)
+        tgt = np.fromiter((node_idx[w] for _, w, _ in tempnet.tedges), dtype=np.int64, count=n)
+        ts = np.fromiter((time_idx[t] for _, _, t in tempnet.tedges), dtype=np.int64, count=n)
+
+        # a walker moves to one of the distinct targets available at a time stamp
+        self.num_times = len(self.times)
+        key = src * self.num_times + ts
+        edges = np.unique(np.stack([key, tgt], axis=1), axis=0)
+        self.targets = edges[:, 1]
+        self.group_key, self.group_start, self.group_size = np.unique(
+            edges[:, 0], return_index=True, return_counts=True)
+        self.group_source = self.group_key // self.num_times
+        self.group_time = self.group_key % self.num_times
+
+    def next_groups(self, nodes, times):
+        """
+        Returns the index of the first edge group of each node that occurs
+        strictly after the given time index, or -1 if there is none.
+
+        Parameters:
+        -----------
+        nodes: ndarray
+            integer node indices
+        times: ndarray
+            integer time indices, -1 refers to the time before the first event
+        """
+        g = np.searchsorted(self.group_key, nodes * self.num_times + times + 1)
+        valid = g < len(self.group_key)
+        valid[valid] = self.group_source[g[valid]] == nodes[valid]
+        g[~valid] = -1
+        return g
+
+
+def generate_walks(tempnet, num_walks, l=100, start_nodes=None, start_time=None,
+                   seed=None, as_arrays=False):
+    """
+    Generates many random walks in a temporal network at once. Like
+    pp.algorithms.random_walk.generate_walk, each walker waits in its current
+    node until this node has outgoing edges, and then moves to one of the
+    targets available at that time stamp uniformly at random. A walk ends
+    after l steps or when there are no more edges to follow.
+
+    Parameters:
+    -----------
+    tempnet: TemporalNetwork, TemporalEdgeIndex
+        the temporal network in which walks are generated. Pass a
+        TemporalEdgeIndex to reuse the index for multiple batches.
+    num_walks: int
+        number of walks to generate
+    l: int
+        (maximum) number of steps of each walk
+    start_nodes: list
+        start node of each walk. Default is None, in which case start
+        nodes are chosen uniformly at random.
+    start_time: int
+        time stamp at which walks start, i.e. the first step uses an edge
+        with a time stamp of at least start_time. Default is None, in which
+        case walks start at the first time stamp.
+    seed: int
+        seed of the random number generator
+    as_arrays: bool
+        if False (default), walks are returned as lists of nodes in the same
+        format as pp.algorithms.random_walk.generate_walk. If True, the
+        function returns two integer arrays (walks, times) of shape
+        num_walks x (l+1) with node and time indices (see
+        TemporalEdgeIndex.nodes and .times) of each step, padded with -1
+        after the end of a walk. Unlike the lists, the arrays also record
+        steps along self-loops.
+    """
+    index = tempnet if isinstance(tempnet, TemporalEdgeIndex) else TemporalEdgeIndex(tempnet)
+    rng = np.random.default_rng(seed)
+
+    walks = np.full((num_walks, l + 1), -1, dtype=np.int64)
+    times = np.full((num_walks, l + 1), -1, dtype=np.int64)
+    if start_nodes is None:
+        walks[:, 0] = rng.integers(len(index.nodes), size=num_walks)
+    else:
+        node_idx = {v: i for i, v in enumerate(index.nodes)}
+        walks[:, 0] = [node_idx[v] for v in start_nodes]
+    if start_time is not None:
+        times[:, 0] = np.searchsorted(index.times, start_time) - 1
+
+    active = np.arange(num_walks)
+    for step in range(1, l + 1):
+        g = index.next_groups(walks[active, step - 1], times[active, step - 1])
+        moving = g >= 0
+        active, g = active[moving], g[moving]
+        if len(active) == 0:
+            break
+        offset = (rng.random(len(g)) * index.group_size[g]).astype(np.int64)
+        walks[active, step] = index.targets[index.group_start[g] + offset]
+        times[active, step] = index.group_time[g]
+
+    if as_arrays:
+        return walks, times
+    return [to_itinerary(index, w) for w in walks]
+
+
+def to_itinerary(index, walk):
+    """
+    Converts an integer walk array into a list of node names, dropping
+    padding and repeated visits of the same node via self-loops.
+
+    Parameters:
+    -----------
+    index: TemporalEdgeIndex
+        the index used to generate the walk
+    walk: ndarray
+        one row of the walks array returned by generate_walks
+    """
+    walk = walk[walk >= 0]
+    keep = np.ones(len(walk), dtype=bool)
+    keep[1:] = walk[1:] != walk[:-1]
+    return index.nodes[walk[keep]].tolist()
@@ -0,0 +1,111 @@
+"""
+Automatic choice of time_rescale. 4_temporal_networks explains that the
+time stamps of the sociopatterns data are multiples of 20 seconds, so that
+they can be divided by 20 without any loss of information, and the
+tutorial hard-codes time_rescale=20, 10 or 600. Dividing by the greatest
+common divisor (GCD) of all inter-event times is the largest rescaling
+that keeps the order and the relative distances of all events. Time
+windows like delta shrink by the same factor, which keeps the
+time-unfolded DAGs of causal path extraction small.
+"""
+import numpy as np
+import pathpy as pp
+
+
+def _times(times):
+    # distinct, sorted time stamps of a temporal network or an array
+    if isinstance(times, pp.TemporalNetwork):
+        times = times.ordered_times
+    return np.unique(np.asarray(times, dtype=np.int64))
+
+
+def inter_event_times(times):
+    """
+    Returns the differences between consecutive distinct time stamps.
+
+    Parameters:
+    -----------
+    times: TemporalNetwork, ndarray
+        temporal network or array of integer time stamps
+    """
+    return np.diff(_times(times))
+
+
+def lossless_rescale(times):
+    """
+    Returns the largest factor by which the time stamps can be divided
+    without loss of information, i.e. the GCD of all inter-event times, or
+    1 if there are fewer than two distinct time stamps.
+
+    Parameters:
+    -----------
+    times: TemporalNetwork, ndarray
+        temporal network or array of integer time stamps
+    """
+    dt = inter_event_times(times)
+    return int(np.gcd.reduce(dt)) if len(dt) else 1
+
+
+def analyse(times, top=10):
+    """
+    Summarises the inter-event times of a temporal network.
+
+    Parameters:
+    -----------
+    times: TemporalNetwork, ndarray
+        temporal network or array of integer time stamps
+    top: int
+        number of most frequent inter-event times to return
+
+    Returns:
+    --------
+    dict with the number of distinct time stamps, the observation length,
+    the GCD, minimum, median and maximum inter-event time, and the most
+    frequent inter-event times with their counts
+    """
+    t = _times(times)
+    dt = np.diff(t)
+    values, counts = np.unique(dt, return_counts=True)
+    order = np.argsort(-counts, kind='stable')[:top]
+    return {'time_stamps': len(t),
+            'observation_length': int(t[-1] - t[0]) if len(t) else 0,
+            'gcd': int(np.gcd.reduce(dt)) if len(dt) else 1,
+            'min': int(dt.min()) if len(dt) else None,
+            'median': float(np.median(dt)) if len(dt) else None,
+            'max': int(dt.max()) if len(dt) else None,
+            'distribution': list(zip(values[order].tolist(), counts[order].tolist()))}
+
+
+def rescale(tempnet, factor):
+    """
+    Returns a copy of a temporal network with all time stamps divided by
+    factor (rounding down), as with time_rescale in
+    TemporalNetwork.from_sqlite.
+    """
+    return pp.TemporalNetwork(tedges=[(v, w, t // factor) for v, w, t in tempnet.tedges])
+
+
+def auto_rescale(tempnet, delta=None):
+    """
+    Rescales a temporal network by the largest lossless factor.
+
+    Parameters:
+    -----------
+    tempnet: TemporalNetwork
+        the temporal network to rescale
+    delta: int
+        maximum time difference for causal paths in the original time
+        units. If given, the equivalent delta in the rescaled time units is
+        returned as well.
+
+    Returns:
+    --------
+    (rescaled network, factor), or (rescaled network, factor, delta) if
+    delta is given
+    """
+    factor = lossless_rescale(tempnet)
+    rescaled = rescale(tempnet, factor) if factor > 1 else tempnet
+    if delta is None:
+        return rescaled, factor
+    # time differences are multiples of factor, so d <= delta iff d/factor <= delta//factor
+    return rescaled, factor, delta // factor
@@ -0,0 +1,341 @@
+"""
+Parallel validation of multi-order models against ground truth, as in
+7_optimal_analysis. Each job describes a data set, how paths are extracted
+from it and the maximum order of the model. Jobs run in a process pool,
+extracted paths and fitted models (the PageRank of nodes in each layer and
+the optimal order) are cached on disk, and the results of all jobs are
+collected in a single table.
+
+Run all tutorial data sets with python -m solutions.validation_harness
+"""
+import concurrent.futures
+import csv
+import hashlib
+import json
+import os
+import random
+import time
+
+import numpy as np
+import pathpy as pp
+import scipy.sparse as sp
+from pathpy.path_extraction import temporal_paths
+
+from solutions import gt_store, rank_correlation, sqlite_source
+
+
+# root of the repository, so that the harness works from any working directory, e.g. from a notebook in solutions
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, 'data')
+CACHE_DIR = os.path.join(ROOT, '.cache', 'validation')
+
+# data sets validated in 7_optimal_analysis
+TUTORIAL_JOBS = [
+    {'name': 'US_flights', 'ngram': os.path.join(DATA_DIR, 'US_flights_train.ngram'), 'frequency': False,
+     'gt': os.path.join(DATA_DIR, 'US_flights_gt.json'), 'max_order': 3},
+    {'name': 'manufacturing_email', 'db': os.path.join(DATA_DIR, 'temporal_networks.db'),
+     'table': 'manufacturing_email', 'time_rescale': 600, 'training_fraction': 0.5, 'delta': 12,
+     'num_roots': 2000, 'gt': os.path.join(DATA_DIR, 'manufacturing_email_gt.json'), 'max_order': 3},
+    {'name': 'haggle', 'db': os.path.join(DATA_DIR, 'temporal_networks.db'), 'table': 'haggle',
+     'time_rescale': 10, 'training_fraction': 0.5, 'delta': 6, 'num_roots': 200,
+     'gt': os.path.join(DATA_DIR, 'haggle_gt.json'), 'max_order': 3},
+    {'name': 'tube', 'ngram': os.path.join(DATA_DIR, 'tube_paths_train.ngram'), 'max_subpath_length': 4,
+     'gt': os.path.join(DATA_DIR, 'tube_gt.json'), 'max_order': 4},
+]
+
+# job settings that determine the extracted paths. The input file is identified by the hash of its content
+# (see job_key) rather than by its path, which differs between checkouts.
+_PATH_SETTINGS = ['frequency', 'max_subpath_length', 'table', 'directed', 'time_rescale',
+                  'training_fraction', 'delta', 'num_roots', 'max_order', 'seed']
+
+
+def file_hash(file):
+    """
+    Returns the SHA-1 hash of the content of a file.
+    """
+    h = hashlib.sha1()
+    with open(file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def job_key(job):
+    """
+    Returns a key for the paths extracted by a job, based on the hash of
+    its input file and the extraction settings.
+    """
+    settings = {k: job[k] for k in _PATH_SETTINGS if k in job}
+    settings['input'] = file_hash(job['ngram'] if 'ngram' in job else job['db'])
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+
+def path_arrays(paths):
+    """
+    Returns the content of a Paths object as a dict of numpy arrays, see
+    save_paths.
+    """
+    nodes = sorted(paths.nodes)
+    idx = {v: i for i, v in enumerate(nodes)}
+    lengths, flat, weights = [], [], []
+    for l in paths.paths:
+        for p, w in paths.paths[l].items():
+            lengths.append(len(p))
+            flat.extend(idx[v] for v in p)
+            weights.append(w)
+    return {'nodes': np.array(json.dumps(nodes)),
+            'separator': np.array(paths.separator),
+            'max_subpath_length': np.array(min(paths.max_subpath_length, np.iinfo(np.int64).max)),
+            'lengths': np.array(lengths, dtype=np.int64),
+            'flat': np.array(flat, dtype=np.int64),
+            'weights': np.array(weights, dtype=np.float64).reshape(-1, 2)}
+
+
+def save_paths(paths, file):
+    """
+    Saves a Paths object to a compressed numpy file. Paths objects cannot
+    be pickled, since they use nested defaultdicts with lambda functions.
+    """
+    np.savez_compressed(file, **path_arrays(paths))
+
+
+def load_paths(file):
+    """
+    Loads a Paths object saved with save_paths.
+    """
+    data = np.load(file)
+    nodes = json.loads(str(data['nodes']))
+    paths = pp.Paths(separator=str(data['separator']))
+    paths.max_subpath_length = int(data['max_subpath_length'])
+    flat, weights = data['flat'], data['weights']
+    start = 0
+    for i, n in enumerate(data['lengths']):
+        p = tuple(nodes[j] for j in flat[start:start + n])
+        paths.paths[n - 1][p] = weights[i].copy()
+        start += n
+    return paths
+
+
+def sample_causal_paths(tempnet, delta=1, num_roots=1, max_subpath_length=None, seed=None):
+    """
+    Samples causal paths from num_roots random roots of the time-unfolded
+    DAG of a temporal network, like
+    pp.path_extraction.sample_paths_from_temporal_network_dag. pathpy
+    samples roots from a set, which random.sample no longer accepts since
+    Python 3.11; here roots are sorted first, so that the sample only
+    depends on the seed.
+
+    Parameters:
+    -----------
+    tempnet: TemporalNetwork
+        temporal network from which causal paths are extracted
+    delta: int
+        maximum time difference between consecutive links on a causal path
+    num_roots: int
+        number of roots from which causal trees are generated
+    max_subpath_length: int
+        maximum length of subpaths that are counted, default is None
+    seed: int
+        seed of the random root selection
+    """
+    dag, node_map = pp.DAG.from_temporal_network(tempnet, delta)
+    paths = pp.Paths()
+    severity = pp.utils.Log.min_severity
+    pp.utils.Log.set_min_severity(pp.utils.Severity.WARNING)
+    try:
+        for root in random.Random(seed).sample(sorted(dag.roots), num_roots):
+            tree, mapping = temporal_paths.generate_causal_tree(dag, root, node_map)
+            paths += temporal_paths.paths_from_dag(tree, mapping, repetitions=False,
+                                                   max_subpath_length=max_subpath_length)
+    finally:
+        pp.utils.Log.set_min_severity(severity)
+    return paths
+
+
+def extract_paths(job):
+    """
+    Extracts the paths of a job, either from an ngram file or by sampling
+    causal paths from the training part of a temporal network stored in an
+    SQLite database.
+    """
+    if 'ngram' in job:
+        return pp.Paths.read_file(job['ngram'], frequency=job.get('frequency', True),
+                                  max_subpath_length=job.get('max_subpath_length', np.iinfo(np.int64).max))
+
+    source = sqlite_source.SQLiteSource(sqlite_source.connect_readonly(job['db']), job['table'], create_indexes=False)
+    t = source.temporal_network(directed=job.get('directed', True), time_rescale=job.get('time_rescale', 1))
+    source.close()
+    if job.get('training_fraction', 1.0) < 1.0:
+        end = min(t.ordered_times) + job['training_fraction'] * t.observation_length()
+        t = t.filter_edges(lambda u, v, time: time < end)
+    return sample_causal_paths(t, delta=job['delta'], num_roots=job['num_roots'],
+                               max_subpath_length=job['max_order'], seed=job.get('seed', 42))
+
+
+def pagerank(network, alpha=0.85, max_iter=100, tol=1.0e-6, weighted=False):
+    """
+    PageRank of first-order nodes in a (higher-order) network, computed
+    with the same power iteration and 'scaled' projection as
+    pp.algorithms.centralities.pagerank, which relies on scipy.array and
+    fails with recent versions of scipy. Unlike pathpy, the last iterate is
+    returned if the power iteration does not converge.
+    """
+    idx = network.node_to_name_map()
+    n = len(idx)
+    m = len(network.edges)
+    row = np.fromiter((idx[v] for v, _ in network.edges), dtype=np.int64, count=m)
+    col = np.fromiter((idx[w] for _, w in network.edges), dtype=np.int64, count=m)
+    if weighted:
+        data = np.fromiter((np.sum(a['weight']) for a in network.edges.values()), dtype=np.float64, count=m)
+    else:
+        data = np.ones(m)
+    if not network.directed:
+        loops = row == col
+        row, col = np.concatenate([row, col[~loops]]), np.concatenate([col, row[~loops]])
+        data = np.concatenate([data, data[~loops]])
+    A = sp.csr_matrix((data, (row, col)), shape=(n, n))
+    out = np.asarray(A.sum(axis=1)).ravel()
+    dangling = out == 0
+    Q = sp.diags(np.divide(1.0, out, out=np.zeros(n), where=~dangling)) @ A
+
+    p = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        last = p
+        p = alpha * (Q.T @ p + p[dangling].sum() / n) + (1 - alpha) / n
+        if np.abs(p - last).sum() < n * tol:
+            break
+
+    names = sorted(idx, key=idx.get)
+    if not isinstance(network, pp.HigherOrderNetwork) or network.order == 1:
+        return dict(zip(names, map(float, p)))
+    pr = {v: 0.0 for v in network.paths.nodes}
+    for v, x in zip(names, p):
+        path = network.higher_order_node_to_path(v)
+        for u in path:
+            pr[u] += float(x) / len(path)
+    return pr
+
+
+def fit(paths, max_order):
+    """
+    Fits a multi-order model and returns its optimal order as well as the
+    PageRank of nodes in each layer.
+    """
+    mog = pp.MultiOrderModel(paths, max_order)
+    pr = {k: pagerank(mog.layers[k]) for k in range(1, max_order + 1)}
+    return {'optimal_order': int(mog.estimate_order()), 'pagerank': pr}
+
+
+def run_job(job, cache_dir=CACHE_DIR):
+    """
+    Runs a single validation job and returns one result row per order.
+
+    Parameters:
+    -----------
+    job: dict
+        job settings, see TUTORIAL_JOBS. The optional setting top_k is the
+        number of top nodes compared with the ground truth, default is 10.
+    cache_dir: str
+        directory of cached paths and models. Default is .cache/validation
+        in the root of the repository, None disables caching.
+    """
+    timings = {}
+    start = time.time()
+    key = job_key(job)
+    paths_file = model_file = None
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        paths_file = os.path.join(cache_dir, key + '.paths.npz')
+        model_file = os.path.join(cache_dir, '{0}.model{1}.json'.format(key, job['max_order']))
+
+    if model_file is not None and os.path.exists(model_file):
+        with open(model_file) as f:
+            model = json.load(f)
+        model['pagerank'] = {int(k): pr for k, pr in model['pagerank'].items()}
+        timings['paths_s'] = timings['model_s'] = 0.0
+    else:
+        if paths_file is not None and os.path.exists(paths_file):
+            paths = load_paths(paths_file)
+        else:
+            paths = extract_paths(job)
+            if paths_file is not None:
+                tmp = '{0}.{1}.tmp.npz'.format(paths_file, os.getpid())
+                save_paths(paths, tmp)
+                os.replace(tmp, paths_file)
+        timings['paths_s'] = time.time() - start
+        model = fit(paths, job['max_order'])
+        timings['model_s'] = time.time() - start - timings['paths_s']
+        if model_file is not None:
+            tmp = '{0}.{1}.tmp'.format(model_file, os.getpid())
+            with open(tmp, 'w') as f:
+                json.dump(model, f)
+            os.replace(tmp, model_file)
+
+    orders = range(1, job['max_order'] + 1)
+    res = rank_correlation.validate(gt_store.read_gt(job['gt']),
+                                    [model['pagerank'][k] for k in orders], k=job.get('top_k', 10))
+    rows = []
+    for i, k in enumerate(orders):
+        rows.append({'dataset': job['name'], 'order': k,
+                     'kendall_tau': float(res['kendall_tau'][i]), 'p_value': float(res['p_value'][i]),
+                     'spearman': float(res['spearman'][i]), 'top_k': float(res['top_k'][i]),
+                     'optimal_order': model['optimal_order'], **timings})
+    for row in rows:
+        row['total_s'] = time.time() - start
+    return rows
+
+
+def run(jobs, processes=None, cache_dir=CACHE_DIR):
+    """
+    Runs validation jobs in a pool of processes and returns a table with
+    one row per data set and order. Jobs that fail are reported in the
+    column error, rather than stopping the other jobs.
+
+    Parameters:
+    -----------
+    jobs: list
+        list of job dicts, see TUTORIAL_JOBS
+    processes: int
+        number of worker processes, default is the number of CPUs
+    cache_dir: str
+        directory of cached paths and models, None disables caching
+    """
+    rows = []
+    with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+        futures = [pool.submit(run_job, job, cache_dir) for job in jobs]
+        for job, future in zip(jobs, futures):
+            try:
+                rows.extend(future.result())
+            except Exception as e:
+                rows.append({'dataset': job['name'], 'error': '{0}: {1}'.format(type(e).__name__, e)})
+    return rows
+
+
+def format_table(rows):
+    """
+    Formats result rows as a plain text table.
+    """
+    columns = ['dataset', 'order', 'kendall_tau', 'p_value', 'spearman', 'top_k', 'optimal_order', 'paths_s', 'model_s', 'total_s', 'error']
+    columns = [c for c in columns if any(c in row for row in rows)]
+
+    def fmt(x):
+        return '{0:.4g}'.format(x) if isinstance(x, float) else str(x)
+
+    cells = [columns] + [[fmt(row[c]) if c in row else '' for c in columns] for row in rows]
+    widths = [max(len(r[i]) for r in cells) for i in range(len(columns))]
+    return '\n'.join('  '.join(c.ljust(w) for c, w in zip(r, widths)).rstrip() for r in cells)
+
+
+def write_csv(rows, file):
+    """
+    Writes result rows to a CSV file.
+    """
+    columns = list(dict.fromkeys(c for row in rows for c in row))
+    with open(file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    print(format_table(run(TUTORIAL_JOBS)))
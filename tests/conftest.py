@@ -0,0 +1,8 @@
+import os
+import sys
+
+# the tests import the modules in solutions like the tutorial scripts, i.e. from the root of the repository
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DATA = os.path.join(ROOT, 'data')
@@ -0,0 +1,48 @@
+import random
+
+import pathpy as pp
+import pytest
+
+from solutions import animation_frames
+
+
+def pathpy_frames(tempnet, ts_per_frame, look_ahead, look_behind):
+    # visible and active edges of each frame, following the animation loop of pathpy's tempnet_template.html
+    times = [t for _, _, t in tempnet.tedges]
+    mintime, maxtime = min(times), max(times)
+    frames = []
+    time = mintime
+    while True:
+        stop = time > maxtime
+        # the template only visits time stamps in the look_behind / look_ahead window of the frame
+        window = [(v, w, t) for v, w, t in tempnet.tedges if max(mintime, time - look_behind) <= t <= time + look_ahead]
+        visible = {(v, w) for v, w, t in window}
+        active = {(v, w) for v, w, t in window if time - ts_per_frame + 1 <= t <= time}
+        frames.append((visible, active))
+        time += ts_per_frame
+        if stop:
+            return frames
+
+
+@pytest.mark.parametrize('ts_per_frame, look_ahead, look_behind', [(1, 10, 10), (5, 0, 20), (3, 2, 1), (4, 0, 0), (7, 3, 5), (6, 1, 2)])
+def test_frames_match_pathpy(ts_per_frame, look_ahead, look_behind):
+    rng = random.Random(ts_per_frame)
+    tempnet = pp.TemporalNetwork(tedges=[(rng.choice('abcd'), rng.choice('abcd'), rng.randrange(60))
+                                         for _ in range(100)] + [('a', 'b', 0), ('c', 'd', 60)])
+    frames = animation_frames.compute_frames(tempnet, ts_per_frame, look_ahead, look_behind)
+    expected = pathpy_frames(tempnet, ts_per_frame, look_ahead, look_behind)
+    assert frames['num_frames'] == len(expected)
+
+    edges = [(frames['nodes'][s], frames['nodes'][t]) for s, t in frames['edges']]
+    lists = {}
+    for key in ['enter', 'leave', 'active']:
+        counts, ids = frames[key]
+        starts = [0]
+        for c in counts:
+            starts.append(starts[-1] + c)
+        lists[key] = [{edges[i] for i in ids[starts[f]:starts[f + 1]]} for f in range(frames['num_frames'])]
+    visible = set()
+    for f, (expected_visible, expected_active) in enumerate(expected):
+        visible = (visible - lists['leave'][f]) | lists['enter'][f]
+        assert visible == expected_visible
+        assert lists['active'][f] == expected_active
@@ -0,0 +1,58 @@
+import os
+import sqlite3
+
+import pytest
+
+from solutions import datasets
+
+
+def make_db(file, tables):
+    con = sqlite3.connect(file)
+    con.execute('CREATE TABLE metadata (tag TEXT, name TEXT, directed INTEGER)')
+    for tag, (directed, tedges) in tables.items():
+        con.execute('INSERT INTO metadata VALUES (?, ?, ?)', (tag, tag.title(), directed))
+        con.execute('CREATE TABLE {0} (source TEXT, target TEXT, time)'.format(tag))
+        con.executemany('INSERT INTO {0} VALUES (?, ?, ?)'.format(tag), tedges)
+    con.commit()
+    con.close()
+
+
+@pytest.fixture
+def db(tmp_path):
+    file = str(tmp_path / 'networks.db')
+    make_db(file, {'email': (1, [('a', 'b', 600), ('b', 'c', 1800), ('c', 'a', 3000)]),
+                   'contacts': (0, [('a', 'b', 20), ('b', 'c', 30), ('a', 'c', 45)]),
+                   'dated': (1, [('a', 'b', '2018-09-05'), ('b', 'c', '2018-09-06')])})
+    return file
+
+
+def test_descriptors(db):
+    reg = datasets.DatasetRegistry(db)
+    assert sorted(reg.tags()) == ['contacts', 'dated', 'email']
+    assert reg.directed('email') and not reg.directed('contacts')
+    with pytest.raises(KeyError):
+        reg.describe('metadata; DROP TABLE email')
+    reg.close()
+
+
+def test_recommended_time_rescale(db):
+    reg = datasets.DatasetRegistry(db)
+    assert reg.recommended_time_rescale('email') == 1200
+    assert reg.recommended_time_rescale('contacts') == 5
+    assert reg.recommended_time_rescale('dated') == 1
+    t = reg.temporal_network('email')
+    assert sorted(t.tedges) == [('a', 'b', 0), ('b', 'c', 1), ('c', 'a', 2)]
+    reg.close()
+
+
+def test_registry_is_replaced_when_the_file_changes(db):
+    reg = datasets.registry(db)
+    assert datasets.registry(db) is reg
+    os.remove(db)
+    make_db(db, {'calls': (1, [('a', 'b', 1)])})
+    os.utime(db, ns=(0, os.stat(db).st_mtime_ns + 10 ** 9))
+    new = datasets.registry(db)
+    assert new is not reg and 'calls' in new
+    with pytest.raises(sqlite3.ProgrammingError):
+        reg.con.execute('SELECT 1')
+    new.close()
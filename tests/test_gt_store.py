@@ -0,0 +1,43 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from conftest import DATA
+from solutions import gt_store
+
+
+def test_round_trip(tmp_path):
+    gt = {'a': 0.5, 'b,c': 0.25, 'Ä': 0.125, '': 0.0}
+    file = str(tmp_path / 'toy.gt')
+    gt_store.write_gt(gt, file, dataset='toy')
+    stored = gt_store.GroundTruth(file)
+    assert stored.to_dict() == gt
+    assert stored.metadata['dataset'] == 'toy'
+    index, values = gt_store.read_gt(file)
+    assert [values[index.index[v]] for v in gt] == list(gt.values())
+    assert not os.path.exists(file + '.{0}.tmp'.format(os.getpid()))
+
+
+def test_migrate_matches_json(tmp_path):
+    json_file = os.path.join(DATA, 'US_flights_gt.json')
+    with open(json_file) as f:
+        gt = json.load(f)
+    stored = gt_store.GroundTruth(gt_store.migrate(json_file, str(tmp_path / 'US_flights_gt.gt')))
+    assert stored.nodes == list(gt)
+    assert np.array_equal(stored.values, list(gt.values()))
+
+
+def test_keys_with_the_same_name(tmp_path):
+    file = str(tmp_path / 'keys.gt')
+    gt_store.write_gt({1: 0.5, '1': 0.5, 2: 0.25}, file)
+    assert gt_store.GroundTruth(file).to_dict() == {'1': 0.5, '2': 0.25}
+    with pytest.raises(ValueError):
+        gt_store.write_gt({1: 0.5, '1': 0.75}, file)
+
+
+def test_empty(tmp_path):
+    file = str(tmp_path / 'empty.gt')
+    gt_store.write_gt({}, file)
+    assert gt_store.GroundTruth(file).to_dict() == {}
@@ -0,0 +1,53 @@
+import numpy as np
+import pathpy as pp
+import pytest
+
+from solutions import incremental_hon, synthetic
+
+
+def walks(nodes, seed):
+    return synthetic.to_paths(synthetic.PlantedModel(nodes=nodes, order=2, seed=seed).walks(300, 4))
+
+
+def assert_same_network(hon, expected):
+    assert set(hon.nodes) == set(expected.nodes)
+    assert set(hon.edges) == set(expected.edges)
+    for e, attr in expected.edges.items():
+        assert np.allclose(hon.edges[e]['weight'], attr['weight'])
+    for v, attr in expected.nodes.items():
+        for key in ['inweight', 'outweight']:
+            assert np.allclose(hon.nodes[v][key], attr[key])
+    assert hon.dof_paths == expected.dof_paths and hon.dof_ngrams == expected.dof_ngrams
+
+    # matrices, with rows and columns in the node order of expected
+    perm = [hon.node_to_name_map()[v] for v in sorted(expected.node_to_name_map(), key=expected.node_to_name_map().get)]
+    for include_subpaths in [True, False]:
+        A = hon.adjacency_matrix(include_subpaths=include_subpaths).toarray()[np.ix_(perm, perm)]
+        assert np.allclose(A, expected.adjacency_matrix(include_subpaths=include_subpaths).toarray())
+    T = hon.transition_matrix().toarray()[np.ix_(perm, perm)]
+    assert np.allclose(T, expected.transition_matrix().toarray())
+
+
+@pytest.mark.parametrize('k', [1, 2, 3])
+def test_updates_match_rebuild(k):
+    first, second = walks(12, 1), walks(16, 2)
+    hon = incremental_hon.IncrementalHigherOrderNetwork(first, k)
+    hon.adjacency_matrix()
+    hon += second
+    assert_same_network(hon, pp.HigherOrderNetwork(first + second, k))
+    hon *= 3
+    assert_same_network(hon, pp.HigherOrderNetwork((first + second) * 3, k))
+
+
+def test_paths_of_the_caller_are_not_changed():
+    first, second = walks(12, 1), walks(16, 2)
+    expected = first * 1
+    hon = incremental_hon.IncrementalHigherOrderNetwork(first, 2)
+    hon += second
+    hon *= 2
+    assert hon.paths is not first
+    assert first.paths.keys() == expected.paths.keys()
+    for l in expected.paths:
+        assert first.paths[l].keys() == expected.paths[l].keys()
+        for p, weight in expected.paths[l].items():
+            assert np.array_equal(first.paths[l][p], weight)
@@ -0,0 +1,66 @@
+import numpy as np
+import pathpy as pp
+import pytest
+
+from solutions import markov_walks
+
+
+def _paths():
+    paths = pp.Paths()
+    paths.add_path('a,c,d,a', frequency=10)
+    paths.add_path('b,c,e,b', frequency=3)
+    paths.add_path('a,c,e,a', frequency=1)
+    paths.add_path('b,c,d,b', frequency=7)
+    paths.add_path('d,a,c', frequency=5)
+    paths.add_path('e,b,c', frequency=2)
+    return paths
+
+
+def _alias_probabilities(table, i):
+    # exact distribution of the next node of i that is encoded in the alias table
+    p = {}
+    start, end = table.ptr[i], table.ptr[i + 1]
+    for s in range(start, end):
+        p[table.target[s]] = p.get(table.target[s], 0.0) + table.prob[s] / table.degree[i]
+        p[table.alias[s]] = p.get(table.alias[s], 0.0) + (1 - table.prob[s]) / table.degree[i]
+    return p
+
+
+@pytest.mark.parametrize('k, include_subpaths', [(1, True), (2, True), (2, False)])
+def test_alias_tables_match_transition_matrix(k, include_subpaths):
+    hon = pp.HigherOrderNetwork(_paths(), k=k)
+    T = hon.transition_matrix(include_subpaths).toarray()
+    table = markov_walks.AliasTable(hon, include_subpaths)
+    idx = hon.node_to_name_map()
+    assert [idx[v] for v in table.nodes] == list(range(len(table.nodes)))
+    for i in range(len(table.nodes)):
+        p = np.zeros(len(table.nodes))
+        for j, q in _alias_probabilities(table, i).items():
+            p[j] += q
+        assert np.allclose(p, T[:, i])
+
+
+@pytest.mark.parametrize('k', [1, 2])
+def test_transition_frequencies(k):
+    hon = pp.HigherOrderNetwork(_paths(), k=k)
+    T = hon.transition_matrix().toarray()
+    walks = markov_walks.generate_walks(hon, 2000, l=50, seed=4, as_arrays=True)
+    counts = np.zeros_like(T)
+    src, tgt = walks[:, :-1].ravel(), walks[:, 1:].ravel()
+    moved = tgt >= 0
+    np.add.at(counts, (tgt[moved], src[moved]), 1)
+    visits = counts.sum(axis=0)
+    for i in np.flatnonzero(visits > 1000):
+        freq = counts[:, i] / visits[i]
+        assert np.all(np.abs(freq - T[:, i]) < 4 * np.sqrt(T[:, i] * (1 - T[:, i]) / visits[i]) + 1e-12)
+    # walks only end in nodes without outgoing links
+    ends = walks[np.arange(len(walks)), (walks >= 0).sum(axis=1) - 1]
+    assert all(T[:, i].sum() == 0 for i in ends[(walks[:, -1] < 0)])
+
+
+def test_paths_follow_first_order_links():
+    hon = pp.HigherOrderNetwork(_paths(), k=2)
+    links = set(pp.Network.from_paths(_paths()).edges)
+    for path in markov_walks.generate_walks(hon, 100, l=10, seed=5):
+        assert len(path) >= 2
+        assert all((v, w) in links for v, w in zip(path[:-1], path[1:]))
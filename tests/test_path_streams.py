@@ -0,0 +1,35 @@
+import os
+
+import numpy as np
+import pathpy as pp
+
+from conftest import DATA
+from solutions import path_streams
+
+
+def test_matches_pathpy_with_fractional_frequencies(tmp_path):
+    file = str(tmp_path / 'paths.ngram')
+    with open(file, 'w') as f:
+        f.write('a,c,d,2.5\nb,c,e,0.25\n')
+    paths = pp.Paths.read_file(file, frequency=True)
+    expected = pp.algorithms.centralities.node_traversals(paths)
+    counts, index = path_streams.node_traversals(path_streams.read_ngram(file, frequency=True))
+    assert {v: counts[i] for v, i in index.items()} == expected
+    assert counts[index['c']] == 2.75
+
+
+def test_matches_pathpy_for_ngram_file():
+    file = os.path.join(DATA, 'US_flights_train.ngram')
+    expected = pp.algorithms.centralities.visitation_probabilities(pp.Paths.read_file(file, frequency=False))
+    result = path_streams.visitation_probabilities(path_streams.read_ngram(file, frequency=False))
+    assert result.keys() == expected.keys()
+    assert np.allclose([result[v] for v in expected], list(expected.values()))
+
+
+def test_node_sequences_with_tuple_nodes():
+    paths = [(('x', 1), ('y', 2)), (('x', 1),)]
+    counts, index = path_streams.node_traversals(paths, weighted=False)
+    assert index == {('x', 1): 0, ('y', 2): 1}
+    assert counts.tolist() == [2.0, 1.0]
+    counts, index = path_streams.node_traversals([(p, 2) for p in paths])
+    assert counts.tolist() == [4.0, 2.0]
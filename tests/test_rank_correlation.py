@@ -0,0 +1,33 @@
+import numpy as np
+import scipy.stats
+
+from solutions import rank_correlation
+
+
+def test_kendalltau_matches_scipy():
+    rng = np.random.default_rng(1)
+    x = rng.integers(20, size=500).astype(float)
+    Y = rng.integers(20, size=(4, 500)).astype(float) + x
+    Y[1, ::7] = np.nan
+    x[::11] = np.nan
+    tau, pvalue = rank_correlation.kendalltau(x, Y)
+    for i, y in enumerate(Y):
+        valid = ~np.isnan(x) & ~np.isnan(y)
+        expected = scipy.stats.kendalltau(x[valid], y[valid], method='asymptotic')
+        assert np.isclose(tau[i], expected.statistic)
+        assert np.isclose(pvalue[i], expected.pvalue)
+        assert np.isclose(rank_correlation.spearman(x, y)[0], scipy.stats.spearmanr(x[valid], y[valid])[0])
+
+
+def test_kendalltau_undefined_rows():
+    x = np.array([1.0, 2.0, 3.0])
+    tau, pvalue = rank_correlation.kendalltau(x, [[1.0, 1.0, 1.0], [np.nan, np.nan, 2.0]])
+    assert np.isnan(tau).all() and np.isnan(pvalue).all()
+
+
+def test_validate_aligns_nodes():
+    gt = {'a': 3.0, 'b': 2.0, 'c': 1.0, 'd': 0.0}
+    res = rank_correlation.validate(gt, [{'a': 1.0, 'b': 0.5, 'c': 0.2, 'x': 9.0}, {'d': 3.0, 'c': 2.0, 'b': 1.0}], k=2)
+    assert np.allclose(res['kendall_tau'], [1.0, -1.0])
+    assert np.allclose(res['spearman'], [1.0, -1.0])
+    assert np.allclose(res['top_k'], [1.0, 0.5])
@@ -0,0 +1,19 @@
+import os
+
+import pathpy as pp
+
+from conftest import DATA
+from solutions import spectral_clustering
+
+
+def test_second_order_clusters_of_temporal_clusters():
+    t = pp.TemporalNetwork.read_file(os.path.join(DATA, 'temporal_clusters.tedges'))
+    paths = pp.path_extraction.paths_from_temporal_network_dag(t)
+    # the state file lists the ten nodes of each cluster in turn
+    vertices = spectral_clustering.read_state_vertices(os.path.join(DATA, 'temporal_clusters.state'))
+    truth = {v: i // 10 for i, v in enumerate(vertices)}
+    assert sorted(truth) == sorted(paths.nodes)
+    hon_2 = pp.HigherOrderNetwork(paths, k=2)
+    labels = spectral_clustering.cluster(hon_2, n_clusters=3, seed=42)
+    clusters = spectral_clustering.project_labels(hon_2, labels)
+    assert spectral_clustering.evaluate(clusters, truth) == {'ari': 1.0, 'nmi': 1.0, 'purity': 1.0}
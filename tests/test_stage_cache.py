@@ -0,0 +1,67 @@
+import os
+import warnings
+
+import pathpy as pp
+import pytest
+
+from conftest import DATA
+from solutions import stage_cache
+
+
+def toy_paths(frequency):
+    paths = pp.Paths()
+    paths.add_path(('a', 'c', 'd'), frequency=frequency)
+    paths.add_path(('b', 'c', 'e'), frequency=frequency)
+    return paths
+
+
+def test_hit_and_miss(tmp_path):
+    calls = []
+
+    @stage_cache.cached(files=['file'], cache_dir=str(tmp_path))
+    def count_lines(file, offset=0):
+        calls.append(file)
+        with open(file) as f:
+            return len(f.readlines()) + offset
+
+    file = os.path.join(DATA, 'toy_paths.ngram')
+    assert count_lines(file) == 2
+    assert count_lines(file) == 2
+    assert len(calls) == 1
+    assert count_lines(file, offset=1) == 3
+    assert len(calls) == 2
+
+
+def test_higher_order_networks_are_keyed_on_content(tmp_path):
+    calls = []
+
+    @stage_cache.cached(cache_dir=str(tmp_path))
+    def total_weight(network):
+        calls.append(network)
+        return float(sum(attr['weight'].sum() for attr in network.edges.values()))
+
+    for frequency in [1, 2, 1]:
+        # the network of the previous iteration is freed, so that its address may be reused
+        assert total_weight(pp.HigherOrderNetwork(toy_paths(frequency), k=2)) == 2 * frequency
+    assert len(calls) == 2
+    assert stage_cache.fingerprint(pp.HigherOrderNetwork(toy_paths(1), k=2)) != \
+        stage_cache.fingerprint(pp.HigherOrderNetwork(toy_paths(1), k=1))
+    assert stage_cache.fingerprint(pp.MultiOrderModel(toy_paths(1), 2)) == \
+        stage_cache.fingerprint(pp.MultiOrderModel(toy_paths(1), 2))
+
+
+def test_default_repr_is_not_cached(tmp_path):
+    class Opaque:
+        pass
+
+    @stage_cache.cached(cache_dir=str(tmp_path))
+    def identity(x):
+        return 1
+
+    with pytest.raises(TypeError):
+        stage_cache.fingerprint(Opaque())
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        assert identity(Opaque()) == 1
+    assert any('not cached' in str(x.message) for x in w)
+    assert os.listdir(str(tmp_path)) == []
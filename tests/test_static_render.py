@@ -0,0 +1,21 @@
+import pytest
+
+from solutions import static_render
+
+
+@pytest.mark.parametrize('color, rgb', [('steelblue', (70, 130, 180)), (' SteelBlue ', (70, 130, 180)),
+                                        ('#f00', (255, 0, 0)), ('#4682b4', (70, 130, 180)),
+                                        ('rgb(1, 2, 3)', (1, 2, 3)), ('rebeccapurple', (102, 51, 153))])
+def test_to_rgb(color, rgb):
+    assert static_render.to_rgb(color) == rgb
+
+
+def test_all_css_names():
+    assert len(static_render.COLORS) == 148
+    for name in static_render.COLORS:
+        assert len(static_render.to_rgb(name)) == 3
+
+
+def test_unknown_colour():
+    with pytest.raises(ValueError):
+        static_render.to_rgb('not-a-colour')
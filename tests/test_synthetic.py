@@ -0,0 +1,34 @@
+import subprocess
+import sys
+
+import pathpy as pp
+import pytest
+
+from conftest import ROOT
+from solutions import synthetic
+
+
+@pytest.mark.parametrize('order, num_walks, l', [(1, 5000, 4), (2, 5000, 4), (3, 10000, 5)])
+def test_planted_order_is_recovered(order, num_walks, l):
+    model = synthetic.PlantedModel(order=order, seed=1)
+    paths = synthetic.to_paths(model.walks(num_walks, l))
+    assert pp.MultiOrderModel(paths, 4).estimate_order() == order
+
+
+def test_walks_shorter_than_order():
+    model = synthetic.PlantedModel(order=3, seed=1)
+    with pytest.raises(ValueError):
+        model.walks(10, 2)
+    with pytest.raises(ValueError):
+        model.events(100, walk_length=2)
+
+
+def test_command_line_rejects_short_walks(tmp_path):
+    cmd = [sys.executable, '-m', 'solutions.synthetic', '--order', '3', '--events', '100',
+           '--tedges', str(tmp_path / 'synthetic.tedges')]
+    res = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    assert res.returncode == 2 and '--walk-length must be at least --order' in res.stderr
+    res = subprocess.run(cmd + ['--walk-length', '3', '--paths', '100', '--ngram', str(tmp_path / 'walks.npy')],
+                         cwd=ROOT, capture_output=True, text=True)
+    assert res.returncode == 0
+    assert synthetic.load_walks(str(tmp_path / 'walks.npy')).shape == (100, 11)
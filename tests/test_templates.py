@@ -0,0 +1,54 @@
+import os
+import random
+
+import pathpy as pp
+import pytest
+
+from conftest import DATA
+from solutions import templates
+
+
+def _paths():
+    paths = pp.Paths()
+    paths.add_path('a,c,d', frequency=10)
+    paths.add_path('b,c,e', frequency=10)
+    paths.add_path('a,c,e', frequency=1)
+    paths.add_path('1,c,-x', frequency=3)
+    return paths
+
+
+def _tempnet():
+    t = pp.TemporalNetwork()
+    for i, (v, w) in enumerate([('a', 'b'), ('b', '1'), ('-c', 'a'), ('_d', 'b')] * 5):
+        t.add_edge(v, w, i * 3)
+    return t
+
+
+@pytest.mark.parametrize('network, params', [
+    (pp.Network.from_paths(_paths()), {}),
+    (pp.Network.from_paths(_paths()), {'node_color': {'a': 'red'}, 'edge_width': {('a', 'c'): 3},
+                                       'edge_arrows': False, 'width': 600}),
+    (pp.HigherOrderNetwork(_paths(), k=2), {}),
+    (pp.HigherOrderNetwork(_paths(), k=2), {'plot_higher_order_nodes': False}),
+    (pp.MultiOrderModel(_paths(), max_order=2), {}),
+    (_tempnet(), {}),
+    (_tempnet(), {'ts_per_frame': 0, 'max_time': 30}),
+    (_tempnet(), {'template': os.path.join(DATA, 'custom_template.html'), 'chapter_data': '[]',
+                  'character_classes': '{}', 'look_ahead': 3, 'label_offset': [1, 2]}),
+    (_paths(), {}),
+    (_paths(), {'node': 'c', 'markov': True}),
+])
+def test_same_html_as_pathpy(network, params):
+    # the div id is the only random part of the HTML
+    random.seed(1)
+    expected = pp.visualisation.html.generate_html(network, **dict(params))
+    random.seed(1)
+    assert templates.generate_html(network, **dict(params)) == expected
+
+
+def test_given_network_data():
+    network = pp.Network.from_paths(_paths())
+    compiled = templates.load(templates.default_template(network))
+    values = templates.template_parameters(network, compiled, network_data='[]')
+    assert values['network_data'] == '[]'
+    assert values['edge_arrows'] == 'true'
@@ -0,0 +1,58 @@
+import bisect
+import os
+from collections import Counter, defaultdict
+
+import pathpy as pp
+
+from conftest import DATA
+from solutions import temporal_walks
+
+
+def test_walks_respect_time():
+    t = pp.TemporalNetwork.read_file(os.path.join(DATA, 'temporal_clusters.tedges'))
+    tedges = set(t.tedges)
+    activity = defaultdict(set)
+    for v, _, ts in t.tedges:
+        activity[v].add(ts)
+    activity = {v: sorted(ts) for v, ts in activity.items()}
+
+    index = temporal_walks.TemporalEdgeIndex(t)
+    walks, times = temporal_walks.generate_walks(index, 500, l=20, seed=1, as_arrays=True)
+    steps = 0
+    for walk, ts in zip(walks, times):
+        for i in range(1, len(walk)):
+            if walk[i] < 0:
+                # a walk only ends if there are no more edges to follow
+                prev = -1 if ts[i - 1] < 0 else index.times[ts[i - 1]]
+                assert activity.get(index.nodes[walk[i - 1]], [prev])[-1] <= prev
+                assert (walk[i:] == -1).all()
+                break
+            v, w, now = index.nodes[walk[i - 1]], index.nodes[walk[i]], index.times[ts[i]]
+            assert (v, w, now) in tedges
+            assert i == 1 or index.times[ts[i - 1]] < now
+            # walkers leave at the first time at which their node has outgoing edges
+            first = 0 if i == 1 else bisect.bisect_right(activity[v], index.times[ts[i - 1]])
+            assert activity[v][first] == now
+            steps += 1
+    assert steps > 5000
+
+
+def test_start_time():
+    t = pp.TemporalNetwork.read_file(os.path.join(DATA, 'temporal_clusters.tedges'))
+    start = t.ordered_times[len(t.ordered_times) // 2]
+    index = temporal_walks.TemporalEdgeIndex(t)
+    walks, times = temporal_walks.generate_walks(index, 200, l=5, start_time=start, seed=2, as_arrays=True)
+    assert (index.times[times[walks[:, 1] >= 0, 1]] >= start).all()
+
+
+def test_distinct_targets_are_uniform():
+    t = pp.TemporalNetwork()
+    for w in ['b', 'b', 'b', 'c', 'd']:
+        t.add_edge('a', w, 1)
+    t.add_edge('b', 'a', 2)
+    walks = temporal_walks.generate_walks(t, 30000, l=3, start_nodes=['a'] * 30000, seed=3)
+    # the walk from b back to a at time 2 is the only continuation
+    assert all(len(w) == 2 or w[2] == 'a' and len(w) == 3 for w in walks)
+    counts = Counter(w[1] for w in walks)
+    assert set(counts) == {'b', 'c', 'd'}
+    assert all(abs(c / 30000 - 1 / 3) < 0.015 for c in counts.values())